@@ -1,13 +1,15 @@
 # Admin/admin.py - Keep this file
 from django.contrib import admin
-from sqlalchemy import Result
-from Home.models import Event, StudentRegistration
-from .models import Result,Announcment
+from Home.models import ConfirmationEmail, Event, Job, StudentRegistration, WaitlistEntry
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from .models import FeaturedSlot, Result,Announcment
 
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ('event_name', 'category', 'get_category_display')
+    list_display = ('event_name', 'category', 'get_category_display', 'participants_count', 'capacity')
     list_filter = ('category',)
     search_fields = ('event_name',)
     ordering = ('category', 'event_name')
@@ -45,16 +47,57 @@ class ResultAdmin(admin.ModelAdmin):
     actions = ['make_featured', 'remove_featured']
     
     def make_featured(self, request, queryset):
-        queryset.update(featured=True)
-        self.message_user(request, f"Marked {queryset.count()} winners as featured")
+        # Save one by one so each result claims a featured slot
+        featured = 0
+        for result in queryset.filter(featured=False):
+            result.featured = True
+            try:
+                result.save()
+                featured += 1
+            except ValidationError:
+                self.message_user(request, FeaturedSlot.LIMIT_MESSAGE, level=messages.ERROR)
+                break
+        self.message_user(request, f"Marked {featured} winners as featured")
     make_featured.short_description = "Mark selected as featured"
     
     def remove_featured(self, request, queryset):
-        queryset.update(featured=False)
-        self.message_user(request, f"Removed {queryset.count()} winners from featured")
+        removed = 0
+        for result in queryset.filter(featured=True):
+            result.featured = False
+            result.save()
+            removed += 1
+        self.message_user(request, f"Removed {removed} winners from featured")
     remove_featured.short_description = "Remove selected from featured"
 
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'priority', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status', 'task']
+    readonly_fields = ['attempts', 'worker', 'locked_until', 'result', 'error', 'created_at', 'finished_at']
+    actions = ['retry_jobs']
+    
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status=Job.STATUS_FAILED).update(
+            status=Job.STATUS_QUEUED, attempts=0, run_after=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"Queued {retried} failed jobs again")
+    retry_jobs.short_description = "Retry selected failed jobs"
+
+@admin.register(ConfirmationEmail)
+class ConfirmationEmailAdmin(admin.ModelAdmin):
+    list_display = ['registration', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['registration__email', 'registration__regd_no']
+    raw_id_fields = ['registration']
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['regd_no', 'name', 'event', 'status', 'created_at', 'promoted_at']
+    list_filter = ['status', 'event']
+    search_fields = ['regd_no', 'name', 'email']
+    raw_id_fields = ['registration']
+
 
 # In admin.py
 from django.contrib import admin
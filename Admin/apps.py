@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class AdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'Admin'
\ No newline at end of file
+    name = 'Admin'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - connects signal receivers
@@ -0,0 +1,286 @@
+# Admin/exports.py
+"""
+Participant export helpers
+
+Rows are read in fixed size keyset chunks as plain value tuples, so an
+export never holds more than one chunk of registrations in memory no
+matter how many students registered.
+
+Export snapshots take the export off the request: request_snapshot()
+records the filters and format and queues a job, which reads every chunk
+inside one repeatable-read transaction (a consistent point in time) and
+writes the file to media storage under exports/. Asking again for the
+same filters and format returns the same snapshot until a registration or
+event changes (the "registrations" version in Home/cache_versions.py).
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+import csv
+import hashlib
+import json
+import tempfile
+import zlib
+
+from django.core.files import File
+from django.db import connections, transaction
+from django.utils import timezone
+
+from Home import jobs
+from Home.cache_versions import REGISTRATIONS, get_version
+from Home.models import Event, StudentRegistration
+from Home.search import search_filter
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 2000
+SNAPSHOT_MAX_AGE = timedelta(days=1)
+
+EXPORT_HEADER = [
+    'ID', 'Name', 'Registration No', 'Phone', 'Email', 'Branch', 'Year',
+    'Event', 'Event Category', 'Registered At',
+]
+
+EXPORT_FIELDS = (
+    'id', 'name', 'regd_no', 'phone', 'email', 'branch', 'year',
+    'event__event_name', 'event__category', 'registered_at',
+)
+
+
+def xlsx_available():
+    return Workbook is not None
+
+
+def filter_participants(queryset, search='', branch='', event=''):
+    """
+    Apply the dashboard search/branch/event filters to a registration queryset
+    """
+    # Full-text index over name, email, regd_no, phone, branch and event (see Home/search.py)
+    search_query = search_filter(search, using=queryset.db)
+    if search_query is not None:
+        queryset = queryset.filter(search_query)
+    
+    if branch:
+        queryset = queryset.filter(branch=branch)
+    
+    if event:
+        queryset = queryset.filter(event__event_name=event)
+    
+    return queryset
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield export rows for a registration queryset, newest first, fetching
+    chunk_size rows per query with an id keyset instead of OFFSET
+    """
+    category_labels = dict(Event.CATEGORY_CHOICES)
+    queryset = queryset.order_by('-id').values_list(*EXPORT_FIELDS)
+    last_id = None
+
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(id__lt=last_id)
+        rows = list(chunk[:chunk_size])
+
+        for row in rows:
+            registered_at = row[9]
+            yield row[:8] + (
+                category_labels.get(row[8], row[8] or ''),
+                registered_at.strftime('%Y-%m-%d %H:%M:%S') if registered_at else '',
+            )
+
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Yield CSV text for the export header and rows, with a UTF-8 BOM for Excel
+    """
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow(EXPORT_HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_encoded(chunks, batch_size=64 * 1024):
+    """
+    Encode text chunks to UTF-8 and coalesce them into roughly batch_size blocks
+    """
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= batch_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks, level=6):
+    """
+    Gzip a stream of byte chunks incrementally
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def write_xlsx(rows, fileobj):
+    """
+    Write the export header and rows to fileobj as an XLSX workbook using
+    openpyxl's write-only mode, which streams rows to disk
+    """
+    if Workbook is None:
+        raise RuntimeError("XLSX export requires the openpyxl package")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Participants')
+    sheet.append(EXPORT_HEADER)
+    for row in rows:
+        sheet.append(list(row))
+    workbook.save(fileobj)
+
+
+def export_filename(export_format, compress, when=None):
+    filename = f'participants_export_{(when or timezone.now()).strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    return filename + '.gz' if compress else filename
+
+
+def snapshot_fingerprint(search, branch, event, export_format, compress):
+    key = json.dumps([search, branch, event, export_format, bool(compress)])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def request_snapshot(user, search, branch, event, export_format, compress):
+    """
+    The snapshot for these filters at the current registrations version,
+    queueing a new one if there is none. Returns (snapshot, reused).
+    """
+    from .models import ExportSnapshot
+    from .tasks import build_export_snapshot
+
+    fingerprint = snapshot_fingerprint(search, branch, event, export_format, compress)
+    version = get_version(REGISTRATIONS)
+    snapshot = (
+        ExportSnapshot.objects.select_related('job')
+        .filter(fingerprint=fingerprint, data_version=version, created_at__gte=timezone.now() - SNAPSHOT_MAX_AGE)
+        .order_by('-created_at').first()
+    )
+    if snapshot is not None and snapshot_state(snapshot) != 'failed':
+        return snapshot, True
+
+    with transaction.atomic():
+        snapshot = ExportSnapshot.objects.create(
+            fingerprint=fingerprint, data_version=version, search=search, branch=branch, event=event,
+            export_format=export_format, compress=compress, created_by=user,
+        )
+        snapshot.job = jobs.enqueue(build_export_snapshot, snapshot_id=str(snapshot.pk))
+        snapshot.save(update_fields=['job'])
+    return snapshot, False
+
+
+def snapshot_state(snapshot):
+    """
+    'ready', 'failed' (its job gave up) or 'pending'
+    """
+    from Home.models import Job
+
+    if snapshot.status == snapshot.STATUS_READY:
+        return 'ready'
+    if snapshot.job is None or snapshot.job.status == Job.STATUS_FAILED:
+        return 'failed'
+    return 'pending'
+
+
+@contextmanager
+def consistent_read(using='default'):
+    """
+    Run the enclosed queries against one snapshot of the database
+    """
+    connection = connections[using]
+    # SET TRANSACTION must come before the transaction's first query; inside
+    # an enclosing transaction its isolation level applies
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor in ('postgresql', 'mysql'):
+            # Both run at READ COMMITTED here (Django opens MySQL sessions at READ
+            # COMMITTED unless OPTIONS['isolation_level'] says otherwise), where every
+            # query sees new commits. SQLite transactions already keep one view.
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+                else:
+                    # Applies to the transaction InnoDB starts with the next query
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        yield
+
+
+def write_snapshot(snapshot):
+    """
+    Export the snapshot's filters to a file in media storage and mark it ready
+    """
+    queryset = filter_participants(StudentRegistration.objects.all(), snapshot.search, snapshot.branch, snapshot.event)
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    with tempfile.TemporaryFile() as output:
+        with consistent_read(queryset.db):
+            rows = counted(iter_export_rows(queryset))
+            if snapshot.export_format == 'xlsx':
+                with tempfile.TemporaryFile() as workbook_file:
+                    write_xlsx(rows, workbook_file)
+                    workbook_file.seek(0)
+                    chunks = iter(lambda: workbook_file.read(64 * 1024), b'')
+                    for chunk in iter_gzip(chunks) if snapshot.compress else chunks:
+                        output.write(chunk)
+            else:
+                chunks = iter_encoded(iter_csv(rows))
+                for chunk in iter_gzip(chunks) if snapshot.compress else chunks:
+                    output.write(chunk)
+
+        output.seek(0)
+        snapshot.file.save(export_filename(snapshot.export_format, snapshot.compress, snapshot.created_at),
+                           File(output), save=False)
+    snapshot.rows = count
+    snapshot.status = snapshot.STATUS_READY
+    snapshot.finished_at = timezone.now()
+    snapshot.save(update_fields=['file', 'rows', 'status', 'finished_at'])
+    return snapshot
+
+
+def purge_snapshots(max_age=SNAPSHOT_MAX_AGE):
+    """
+    Delete snapshots older than max_age with their files
+    """
+    from .models import ExportSnapshot
+
+    count = 0
+    for snapshot in ExportSnapshot.objects.filter(created_at__lt=timezone.now() - max_age).iterator():
+        if snapshot.file:
+            snapshot.file.delete(save=False)
+        snapshot.delete()
+        count += 1
+    return count
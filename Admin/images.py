@@ -0,0 +1,92 @@
+# Admin/images.py
+"""
+Resized derivatives of result photos
+
+Uploads are phone photos of several megabytes; the public pages show them
+as 80-120px avatars. After a result is saved, its photo is resized to a
+few widths in WebP and JPEG (EXIF stripped, orientation applied) by a
+background job (Admin/tasks.py), and the generated paths are recorded on
+the result so the {% result_photo %} template tag can emit srcset/sizes.
+"""
+import io
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+DERIVATIVE_WIDTHS = (120, 240, 480, 960)
+DERIVATIVE_DIR = 'results/derivatives'
+FORMATS = {
+    # key: (Pillow format, file extension, save options)
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivative_name(source_name, width, extension):
+    # The whole storage path, extension included: storage keeps it unique, where
+    # photos in other directories or formats can share a stem (a.jpg, a.png)
+    return f'{DERIVATIVE_DIR}/{source_name}-{width}w.{extension}'
+
+
+def generate_derivatives(photo):
+    """
+    Generate resized copies of an ImageField file and return a description
+    suitable for Result.photo_derivatives
+    """
+    storage = photo.storage
+    with photo.open('rb'):
+        image = Image.open(photo)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    # Never upscale - widths above the original collapse to the original width
+    widths = sorted({min(width, image.width) for width in DERIVATIVE_WIDTHS})
+    derivatives = {'source': photo.name, 'width': image.width, 'height': image.height}
+
+    for key, (pil_format, extension, options) in FORMATS.items():
+        variants = []
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+            if pil_format == 'JPEG' and resized.mode != 'RGB':
+                resized = resized.convert('RGB')
+
+            buffer = io.BytesIO()
+            # No exif= argument, so metadata from the original is not carried over
+            resized.save(buffer, pil_format, **options)
+
+            name = derivative_name(photo.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            variants.append([width, storage.save(name, ContentFile(buffer.getvalue()))])
+        derivatives[key] = variants
+
+    return derivatives
+
+
+def needs_derivatives(result):
+    return bool(result.photo) and (result.photo_derivatives or {}).get('source') != result.photo.name
+
+
+def update_derivatives(result_id):
+    """
+    Generate derivatives for one result and store them without calling save()
+    """
+    from .models import Result
+    from .signals import invalidate_result_pages
+
+    result = Result.objects.filter(pk=result_id).first()
+    if result is None or not result.photo:
+        return None
+
+    derivatives = generate_derivatives(result.photo)
+    # Only record them if the photo wasn't replaced while we were working
+    updated = Result.objects.filter(pk=result_id, photo=result.photo.name).update(
+        photo_derivatives=derivatives
+    )
+    if updated:
+        invalidate_result_pages()
+    return derivatives
@@ -0,0 +1,263 @@
+# Admin/imports.py
+"""
+Bulk participant import
+
+An uploaded CSV or XLSX sheet is read row by row. Event names and the
+existing (regd_no, event) pairs are loaded once up front, so validating a
+row needs no queries, and valid rows are written with bulk_create in
+batches inside a single transaction. Rows that fail validation, or find
+their event's capacity already taken, are skipped and reported with their
+sheet row number. If a batch still hits a conflict committed meanwhile
+(a duplicate, or an event that filled up), its rows are inserted one by
+one and only the conflicting ones are skipped.
+
+The header matches the export (extra columns such as ID or Registered At
+are ignored), so an exported sheet can be imported again.
+"""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from Home.ingestion import bulk_insert_registrations
+from Home.models import Event, StudentRegistration
+from Home.waitlist import EventFull
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # XLSX import is optional
+    load_workbook = None
+
+IMPORT_BATCH_SIZE = 500
+
+# Field -> accepted header names (compared case-insensitively)
+IMPORT_COLUMNS = {
+    'name': ('name',),
+    'regd_no': ('registration no', 'registration number', 'regd no', 'regd_no'),
+    'phone': ('phone',),
+    'email': ('email',),
+    'branch': ('branch',),
+    'year': ('year',),
+    'event': ('event',),
+}
+
+FIELD_MAX_LENGTHS = {
+    field: StudentRegistration._meta.get_field(field).max_length
+    for field in ('name', 'regd_no', 'phone', 'email')
+}
+
+
+class ImportFileError(Exception):
+    """The uploaded file can't be imported at all (bad format or header)"""
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def xlsx_available():
+    return load_workbook is not None
+
+
+def iter_csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise ImportFileError("The CSV file must be UTF-8 encoded")
+    finally:
+        # Leave the underlying upload open for its owner
+        text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    if load_workbook is None:
+        raise ImportFileError("XLSX import requires the openpyxl package")
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError("The file is not a valid XLSX workbook")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """
+    Return an iterator over the rows of an uploaded CSV or XLSX file
+    """
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        return iter_csv_rows(fileobj)
+    if extension == 'xlsx':
+        return iter_xlsx_rows(fileobj)
+    raise ImportFileError("Upload a .csv or .xlsx file")
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    # Spreadsheet apps store phone numbers as numbers
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _column_positions(header):
+    names = [_cell_text(cell).lower() for cell in header]
+    positions = {}
+    for field, aliases in IMPORT_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+    missing = [aliases[0].title() for field, aliases in IMPORT_COLUMNS.items() if field not in positions]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+    return positions
+
+
+def _choice_lookup(choices):
+    """
+    Map both the stored value and the label of each choice to the stored value
+    """
+    lookup = {}
+    for value, label in choices:
+        lookup[value.lower()] = value
+        lookup[label.lower()] = value
+    return lookup
+
+
+def _validate(values, events, branches, years, existing):
+    """
+    Return the error message for one row, or None if it can be imported
+    """
+    empty = [field for field in IMPORT_COLUMNS if not values[field]]
+    if empty:
+        return f"missing {', '.join(empty)}"
+    for field, max_length in FIELD_MAX_LENGTHS.items():
+        if len(values[field]) > max_length:
+            return f"{field} is longer than {max_length} characters"
+    try:
+        validate_email(values['email'])
+    except ValidationError:
+        return f"invalid email {values['email']}"
+    if values['branch'].lower() not in branches:
+        return f"unknown branch {values['branch']}"
+    if values['year'].lower() not in years:
+        return f"unknown year {values['year']}"
+    event_id = events.get(values['event'].lower())
+    if event_id is None:
+        return f"unknown event {values['event']}"
+    if (values['regd_no'], event_id) in existing:
+        return f"{values['regd_no']} is already registered for {values['event']}"
+    return None
+
+
+def import_participants(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Validate and insert participant rows (the first row is the header).
+    With dry_run the rows are only validated.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("The file is empty")
+    positions = _column_positions(header)
+
+    events = {}
+    # Seats left on each event with a capacity
+    seats = {}
+    for pk, name, capacity, participants in Event.objects.order_by().values_list(
+        'id', 'event_name', 'capacity', 'participants_count'
+    ):
+        events[name.strip().lower()] = pk
+        if capacity is not None:
+            seats[pk] = capacity - participants
+    branches = _choice_lookup(StudentRegistration.BRANCH_CHOICES)
+    years = _choice_lookup(StudentRegistration.YEAR_CHOICES)
+    # Every (regd_no, event) pair already registered - also catches repeats within the file
+    existing = set(StudentRegistration.objects.order_by().values_list('regd_no', 'event_id'))
+
+    result = ImportResult()
+    batch = []
+    with transaction.atomic():
+        # Line 1 is the header
+        for line, row in enumerate(rows, start=2):
+            row = list(row)
+            values = {
+                field: _cell_text(row[position]) if position < len(row) else ''
+                for field, position in positions.items()
+            }
+            if not any(values.values()):
+                continue
+
+            error = _validate(values, events, branches, years, existing)
+            if error:
+                result.add_error(line, error)
+                continue
+
+            event_id = events[values['event'].lower()]
+            if event_id in seats:
+                if seats[event_id] <= 0:
+                    result.add_error(line, f"{values['event']} is full")
+                    continue
+                seats[event_id] -= 1
+            existing.add((values['regd_no'], event_id))
+            batch.append((line, values['event'], StudentRegistration(
+                name=values['name'],
+                regd_no=values['regd_no'],
+                phone=values['phone'],
+                email=values['email'],
+                branch=branches[values['branch'].lower()],
+                year=years[values['year'].lower()],
+                event_id=event_id,
+            )))
+            if len(batch) >= batch_size:
+                _insert(batch, dry_run, result)
+                batch = []
+
+        _insert(batch, dry_run, result)
+
+    result.errors.sort()
+    return result
+
+
+def _insert(batch, dry_run, result):
+    """
+    Insert a batch of (line, event, registration) rows and count them in result
+    """
+    if not batch:
+        return
+    if dry_run:
+        result.created += len(batch)
+        return
+    try:
+        with transaction.atomic():
+            bulk_insert_registrations([registration for line, event, registration in batch])
+        result.created += len(batch)
+        return
+    except IntegrityError:
+        pass
+
+    # Something changed since validation - find the rows that conflict
+    for line, event, registration in batch:
+        registration.pk = None
+        registration._state.adding = True
+        try:
+            with transaction.atomic():
+                registration.save()
+        except EventFull:
+            result.add_error(line, f"{event} is full")
+        except IntegrityError:
+            result.add_error(line, f"{registration.regd_no} is already registered for {event}")
+        else:
+            result.created += 1
@@ -0,0 +1,28 @@
+# Admin/management/commands/generate_result_photos.py
+from django.core.management.base import BaseCommand
+
+from Admin.images import needs_derivatives, update_derivatives
+from Admin.models import Result
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG derivatives for result photos that don't have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate derivatives for every photo")
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+
+        for result in Result.objects.exclude(photo='').only('id', 'photo', 'photo_derivatives').iterator():
+            if not options['force'] and not needs_derivatives(result):
+                continue
+            try:
+                update_derivatives(result.pk)
+                generated += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Result {result.pk} ({result.photo.name}): {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {generated} photos ({failed} failed)"))
@@ -0,0 +1,37 @@
+# Admin/management/commands/import_participants.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from Admin.imports import IMPORT_BATCH_SIZE, ImportFileError, import_participants, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import participants from a CSV or XLSX file (same columns as the export)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file to import")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help="Rows per bulk insert")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate the file without inserting anything")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_participants(
+                    read_rows(f, options['path']),
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+        except IntegrityError as e:
+            raise CommandError(f"Nothing was imported, the participants changed during the import: {e}")
+
+        for line, error in result.errors:
+            self.stderr.write(f"Row {line}: {error}")
+
+        action = "can be imported" if options['dry_run'] else "imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} participants {action}, {len(result.errors)} rows skipped"
+        ))
@@ -0,0 +1,18 @@
+# Admin/management/commands/purge_uploads.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from Admin.uploads import STALE_UPLOAD_AGE, purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked attachment uploads that were abandoned, with their partial files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=STALE_UPLOAD_AGE.total_seconds() / 3600,
+                            help="Delete uploads untouched for this many hours (default: 24)")
+
+    def handle(self, *args, **options):
+        count = purge_stale_uploads(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} stale upload(s)"))
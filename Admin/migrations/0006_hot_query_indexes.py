@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Admin", "0005_alter_announcment_attatchment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="announcment",
+            index=models.Index(fields=["created_at"], name="announcment_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(fields=["featured", "id"], name="result_featured_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(
+                fields=["position", "created_at"], name="result_position_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(fields=["created_at"], name="result_created_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Admin", "0006_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="result",
+            name="photo_derivatives",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_featured_slots(apps, schema_editor):
+    """
+    Give the newest featured results a slot each; anything beyond the limit
+    is unfeatured
+    """
+    Result = apps.get_model("Admin", "Result")
+    FeaturedSlot = apps.get_model("Admin", "FeaturedSlot")
+    featured_ids = list(
+        Result.objects.filter(featured=True)
+        .order_by("-id")
+        .values_list("id", flat=True)
+    )
+    for slot, result_id in enumerate(featured_ids[:3], start=1):
+        FeaturedSlot.objects.create(slot=slot, result_id=result_id)
+    Result.objects.filter(id__in=featured_ids[3:]).update(featured=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Admin", "0007_result_photo_derivatives"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeaturedSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField(unique=True)),
+                ("featured_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["slot"],
+            },
+        ),
+        migrations.AddField(
+            model_name="featuredslot",
+            name="result",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="featured_slot",
+                to="Admin.result",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="featuredslot",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("slot__gte", 1), ("slot__lte", 3)),
+                name="featured_slot_range",
+            ),
+        ),
+        migrations.RunPython(populate_featured_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:17
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def populate_excerpts(apps, schema_editor):
+    """Fill in the excerpt of existing announcements"""
+    Announcment = apps.get_model("Admin", "Announcment")
+    for announcement in Announcment.objects.only("id", "content").iterator():
+        Announcment.objects.filter(pk=announcement.pk).update(
+            excerpt=Truncator(announcement.content or "").chars(300)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Admin", "0009_attachmentupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="announcment",
+            name="excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:33
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Admin", "0010_announcment_excerpt"),
+        ("Home", "0009_confirmationemail"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("data_version", models.BigIntegerField()),
+                ("search", models.CharField(blank=True, max_length=200)),
+                ("branch", models.CharField(blank=True, max_length=50)),
+                ("event", models.CharField(blank=True, max_length=200)),
+                ("export_format", models.CharField(max_length=4)),
+                ("compress", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("READY", "Ready")],
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("file", models.FileField(blank=True, upload_to="exports/")),
+                ("rows", models.PositiveIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="Home.job",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["fingerprint", "data_version"],
+                        name="export_snapshot_lookup_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="export_snapshot_created_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
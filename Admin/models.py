@@ -1,5 +1,5 @@
 # Admin/models.py
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.core.exceptions import ValidationError
 
 class Result(models.Model):
@@ -14,6 +14,8 @@ class Result(models.Model):
     position = models.CharField(max_length=10, choices=POSITION_CHOICES)
     game = models.CharField(max_length=50)
     photo = models.ImageField(upload_to='results/')
+    # Resized WebP/JPEG copies of photo, filled in by Admin/images.py
+    photo_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # NEW FIELD: Featured on home page
     featured = models.BooleanField(default=False, help_text="Show on home page")
@@ -25,36 +27,130 @@ class Result(models.Model):
         return f"{self.winner} - {self.game}"
     
     def clean(self):
-        """Validate that only 3 winners can be featured"""
-        if self.featured:
-            # Count currently featured winners
-            featured_count = Result.objects.filter(featured=True).count()
-            
-            # If this is a new result being featured
-            if not self.pk:
-                if featured_count >= 3:
-                    raise ValidationError("Only 3 winners can be featured on the home page. Please unfeature another winner first.")
-            else:
-                # If this is an existing result being updated
-                current_result = Result.objects.get(pk=self.pk)
-                if not current_result.featured and featured_count >= 3:
-                    raise ValidationError("Only 3 winners can be featured on the home page. Please unfeature another winner first.")
+        """Friendly form error when all featured slots are taken"""
+        # Advisory only - FeaturedSlot.claim() is what enforces the limit
+        if self.featured and not getattr(self, '_featured_in_db', False):
+            if FeaturedSlot.objects.count() >= FeaturedSlot.MAX_SLOTS:
+                raise ValidationError(FeaturedSlot.LIMIT_MESSAGE)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored featured flag so save() knows whether it changed
+        if 'featured' in field_names:
+            instance._featured_in_db = instance.featured
+        return instance
     
     def save(self, *args, **kwargs):
         self.full_clean()  # Run validation
-        super().save(*args, **kwargs)
+        was_featured = getattr(self, '_featured_in_db', False)
+        adding = self._state.adding
+        
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                
+                # The featured slot table enforces the 3-winner limit - claiming a
+                # slot is a single conditional insert that cannot race
+                if self.featured and not was_featured:
+                    FeaturedSlot.claim(self)
+                elif was_featured and not self.featured:
+                    FeaturedSlot.release(self)
+        except ValidationError:
+            # The insert was rolled back along with the failed claim
+            if adding:
+                self.pk = None
+                self._state.adding = True
+            raise
+        
+        self._featured_in_db = self.featured
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Featured filter in the admin lists
+            models.Index(fields=['featured', 'id'], name='result_featured_idx'),
+            # Winners page filtered by position, newest first
+            models.Index(fields=['position', 'created_at'], name='result_position_created_idx'),
+            models.Index(fields=['created_at'], name='result_created_idx'),
+        ]
+
+
+class FeaturedSlot(models.Model):
+    """
+    One of the MAX_SLOTS places for featured winners on the home page.
+    Unique slot numbers, a unique result and a range check let the database
+    enforce the limit, so featuring is one INSERT that either wins a free
+    slot or fails.
+    """
+    MAX_SLOTS = 3
+    LIMIT_MESSAGE = "Only 3 winners can be featured on the home page. Please unfeature another winner first."
+    
+    slot = models.PositiveSmallIntegerField(unique=True)
+    result = models.OneToOneField(Result, on_delete=models.CASCADE, related_name='featured_slot')
+    featured_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Slot {self.slot}: {self.result_id}"
+    
+    @classmethod
+    def claim(cls, result):
+        """
+        Give result a free slot, raising ValidationError if all slots are taken
+        """
+        taken = set(cls.objects.values_list('slot', flat=True))
+        for slot in range(1, cls.MAX_SLOTS + 1):
+            if slot in taken:
+                continue
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(slot=slot, result=result)
+            except IntegrityError:
+                # Another admin took this slot (or featured this result) first
+                continue
+        
+        if cls.objects.filter(result=result).exists():
+            return None
+        raise ValidationError(cls.LIMIT_MESSAGE)
+    
+    @classmethod
+    def release(cls, result):
+        cls.objects.filter(result=result).delete()
+    
+    @classmethod
+    def featured_results(cls):
+        """Featured winners, newest first - at most MAX_SLOTS rows"""
+        return [slot.result for slot in cls.objects.select_related('result').order_by('-result_id')]
+    
+    @classmethod
+    async def afeatured_results(cls):
+        return [slot.result async for slot in cls.objects.select_related('result').order_by('-result_id')]
+    
+    class Meta:
+        ordering = ['slot']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(slot__gte=1) & models.Q(slot__lte=3),
+                name='featured_slot_range',
+            ),
+        ]
 
 
 # In models.py
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
+from django.utils.text import Truncator
 
 class Announcment(models.Model):
+    EXCERPT_LENGTH = 300
+    
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Start of content, kept in step by save() - notice lists read this, never content
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     attatchment = models.FileField(upload_to='announcements/', blank=True, null=True)  # Note: attatchment (double 't')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)  # Add this line
@@ -62,5 +158,91 @@ class Announcment(models.Model):
     def __str__(self):
         return self.title
     
+    @classmethod
+    def make_excerpt(cls, content):
+        return Truncator(content or '').chars(cls.EXCERPT_LENGTH)
+    
+    @property
+    def excerpt_truncated(self):
+        return self.excerpt.endswith('…')
+    
+    def save(self, *args, **kwargs):
+        self.excerpt = self.make_excerpt(self.content)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='announcment_created_idx'),
+        ]
+
+
+class AttachmentUpload(models.Model):
+    """
+    An announcement attachment being uploaded in chunks (see Admin/uploads.py)
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attachment_uploads')
+    filename = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    # Hex SHA-256 of the whole file as declared by the client, if it sent one
+    sha256 = models.CharField(max_length=64, blank=True)
+    received = models.PositiveBigIntegerField(default=0)
+    complete = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+    
+    class Meta:
+        indexes = [
+            # Resuming looks an unfinished upload up by its file
+            models.Index(fields=['created_by', 'filename', 'size'], name='attachment_upload_file_idx'),
+            models.Index(fields=['updated_at'], name='attachment_upload_updated_idx'),
+        ]
+
+
+class ExportSnapshot(models.Model):
+    """
+    Participant export written to media storage by a background job (see
+    Admin/exports.py). Requests with the same filters and format reuse it
+    until registrations change.
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_READY = 'READY'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_READY, 'Ready'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Hash of the filters, format and compression
+    fingerprint = models.CharField(max_length=64)
+    # Registrations version (Home/cache_versions.py) the export was requested at
+    data_version = models.BigIntegerField()
+    search = models.CharField(max_length=200, blank=True)
+    branch = models.CharField(max_length=50, blank=True)
+    event = models.CharField(max_length=200, blank=True)
+    export_format = models.CharField(max_length=4)
+    compress = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Outside MEDIA_PUBLIC_DIRS, so never served to anonymous users
+    file = models.FileField(upload_to='exports/', blank=True)
+    rows = models.PositiveIntegerField(null=True, blank=True)
+    job = models.ForeignKey('Home.Job', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.export_format} export {self.pk} ({self.status})"
+    
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        indexes = [
+            models.Index(fields=['fingerprint', 'data_version'], name='export_snapshot_lookup_idx'),
+            models.Index(fields=['created_at'], name='export_snapshot_created_idx'),
+        ]
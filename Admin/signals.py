@@ -0,0 +1,67 @@
+# Admin/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Home import jobs, live
+from Home.page_cache import NOTICES, RESULTS, invalidate_pages
+from .images import needs_derivatives
+from .models import Announcment, Result
+from .tasks import result_photo_derivatives
+
+
+def invalidate_result_pages():
+    transaction.on_commit(lambda: invalidate_pages(RESULTS))
+
+
+def invalidate_notice_pages():
+    transaction.on_commit(lambda: invalidate_pages(NOTICES))
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, **kwargs):
+    """Purge cached home and winners pages"""
+    invalidate_result_pages()
+
+
+@receiver(post_save, sender=Result)
+def result_photo_saved(sender, instance, raw=False, **kwargs):
+    """Resize a new or replaced photo in the background"""
+    if not raw and needs_derivatives(instance):
+        jobs.enqueue(result_photo_derivatives, result_id=instance.pk)
+
+
+@receiver(post_save, sender=Announcment)
+@receiver(post_delete, sender=Announcment)
+def announcment_changed(sender, **kwargs):
+    """Purge cached notice pages"""
+    invalidate_notice_pages()
+
+
+def publish_on_commit(kind, data):
+    transaction.on_commit(lambda: live.publish(kind, data))
+
+
+@receiver(post_save, sender=Result)
+def result_saved_live(sender, instance, raw=False, **kwargs):
+    """Push uploaded, edited and (un)featured results to open pages"""
+    if not raw:
+        publish_on_commit('result', live.result_event(instance))
+
+
+@receiver(post_delete, sender=Result)
+def result_deleted_live(sender, instance, **kwargs):
+    publish_on_commit('result', live.result_event(instance, deleted=True))
+
+
+@receiver(post_save, sender=Announcment)
+def announcment_saved_live(sender, instance, raw=False, **kwargs):
+    """Push new and edited notices to open pages"""
+    if not raw:
+        publish_on_commit('notice', live.notice_event(instance))
+
+
+@receiver(post_delete, sender=Announcment)
+def announcment_deleted_live(sender, instance, **kwargs):
+    publish_on_commit('notice', live.notice_event(instance, deleted=True))
@@ -0,0 +1,40 @@
+# Admin/tasks.py
+"""
+Background jobs for the admin panel (see Home/jobs.py)
+"""
+from Home.jobs import task
+
+from . import exports, uploads
+from .images import update_derivatives
+from .models import Announcment, AttachmentUpload, ExportSnapshot
+
+
+@task(priority=5)
+def result_photo_derivatives(result_id):
+    """Resize a result's photo for the public pages"""
+    derivatives = update_derivatives(result_id)
+    return {'source': derivatives['source']} if derivatives else None
+
+
+@task(priority=10)
+def attach_announcement_upload(announcement_id, upload_id):
+    """Move a finished chunked upload into the announcement's attachment"""
+    announcement = Announcment.objects.filter(pk=announcement_id).first()
+    upload = AttachmentUpload.objects.filter(pk=upload_id, complete=True).first()
+    if announcement is None or upload is None:
+        # Deleted in the meantime, or attached by an earlier attempt
+        return None
+    uploads.attach_upload(announcement, upload)
+    return {'attachment': announcement.attatchment.name}
+
+
+@task(timeout=30 * 60)
+def build_export_snapshot(snapshot_id):
+    """Write a participant export to media storage for the dashboard to download"""
+    snapshot = ExportSnapshot.objects.filter(pk=snapshot_id).first()
+    if snapshot is None or snapshot.status == ExportSnapshot.STATUS_READY:
+        return None
+    exports.write_snapshot(snapshot)
+    # Keeps exports/ from growing - older snapshots are never handed out again
+    exports.purge_snapshots()
+    return {'rows': snapshot.rows, 'file': snapshot.file.name}
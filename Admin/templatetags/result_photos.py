@@ -0,0 +1,47 @@
+# Admin/templatetags/result_photos.py
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+# Width used for the plain src attribute of browsers without srcset support
+FALLBACK_WIDTH = 480
+
+
+def _srcset(storage, variants):
+    return ', '.join(f'{storage.url(name)} {width}w' for width, name in variants)
+
+
+@register.simple_tag
+def result_photo(result, sizes='100vw', css_class='', style='', alt=None):
+    """
+    Render a result photo as a <picture> with WebP and JPEG srcsets.
+    Falls back to the original upload until its derivatives have been generated.
+
+    Usage: {% result_photo winner sizes="80px" css_class="winner-avatar" %}
+    """
+    if not result.photo:
+        return ''
+
+    alt = result.winner if alt is None else alt
+    derivatives = result.photo_derivatives or {}
+    if derivatives.get('source') != result.photo.name or not derivatives.get('jpeg'):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+            result.photo.url, alt, css_class, style,
+        )
+
+    storage = result.photo.storage
+    jpeg = derivatives['jpeg']
+    fallback = next((name for width, name in jpeg if width >= FALLBACK_WIDTH), jpeg[-1][1])
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" style="{}" '
+        'width="{}" height="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        _srcset(storage, derivatives.get('webp', [])), sizes,
+        storage.url(fallback), _srcset(storage, jpeg), sizes, alt, css_class, style,
+        derivatives.get('width', ''), derivatives.get('height', ''),
+    )
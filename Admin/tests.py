@@ -1,3 +1,848 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.exceptions import MiddlewareNotUsed, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from unittest import mock, skipUnless
+
+from django.http import HttpResponse
+from django.db import connection, connections
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch, reverse
+from django.utils import timezone
+
+from Home import jobs, sql_instrumentation
+from Home.models import Event, Job, StudentRegistration, WaitlistEntry
+
+from PIL import Image
+
+from . import exports, imports
+from .images import update_derivatives
+from .models import Announcment, AttachmentUpload, ExportSnapshot, FeaturedSlot, Result
+
+
+class ParticipantsDataTests(TestCase):
+    """Keyset-paged participant listing used by the admin dashboard"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.dance = Event.objects.create(event_name='Solo Dance', category='CULTURAL')
+        cls.chess = Event.objects.create(event_name='Chess', category='GAMES')
+        now = timezone.now()
+        for i in range(7):
+            registration = StudentRegistration.objects.create(
+                name=f'Student {i}',
+                email=f'student{i}@example.com',
+                phone=f'90000000{i:02d}',
+                regd_no=f'REG{i:03d}',
+                branch='CSE' if i % 2 else 'EE',
+                year='1st Year',
+                event=cls.dance if i < 4 else cls.chess,
+            )
+            # Two rows share a timestamp to exercise the id tie-breaker
+            StudentRegistration.objects.filter(pk=registration.pk).update(
+                registered_at=now - timedelta(minutes=min(i, 5))
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def fetch(self, **params):
+        response = self.client.get(reverse('participants_data'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.fetch(**params)
+            seen.extend(row['regd_no'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(
+            StudentRegistration.objects.order_by('-registered_at', '-id')
+            .values_list('regd_no', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_filters_match_export(self):
+        data = self.fetch(branch='CSE', event='Chess')
+        self.assertEqual({row['regd_no'] for row in data['results']}, {'REG005'})
+
+        data = self.fetch(search='chess')
+        self.assertEqual(len(data['results']), 3)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('participants_data'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_registration_stats(self):
+        data = self.client.get(reverse('registration_stats')).json()
+        self.assertEqual(data['stats']['total'], 7)
+        self.assertEqual(data['stats']['events'], 2)
+        self.assertEqual(data['by_event'], {'Chess': 3, 'Solo Dance': 4})
+        self.assertEqual(data['by_branch'], {'CSE': 3, 'EE': 4})
+
+    def test_page_query_count_is_constant(self):
+        # Session and user lookups plus a single page query
+        with self.assertNumQueries(3):
+            self.client.get(reverse('participants_data'), {'limit': 3})
+
+
+class ExportParticipantsTests(TestCase):
+    """Streamed participant export"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.event = Event.objects.create(event_name='Quiz', category='LITERARY')
+        StudentRegistration.objects.bulk_create([
+            StudentRegistration(
+                name=f'Student {i}', email=f's{i}@example.com', phone='9000000000',
+                regd_no=f'REG{i:03d}', branch='CSE', year='2nd Year', event=cls.event,
+            )
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, **data):
+        response = self.client.post(reverse('export_participants'), data)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_csv_is_streamed(self):
+        response = self.export()
+        self.assertTrue(response.streaming)
+        text = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0], exports.EXPORT_HEADER)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][8], 'LITERARY EVENTS')
+
+    def test_gzip_csv(self):
+        response = self.export(compress='gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        text = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8-sig')
+        self.assertEqual(len(text.strip().splitlines()), 6)
+
+    @skipUnless(exports.xlsx_available(), "openpyxl is not installed")
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        response = self.export(format='xlsx')
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.values)
+        self.assertEqual(list(rows[0]), exports.EXPORT_HEADER)
+        self.assertEqual(len(rows), 6)
+
+    def test_rows_are_read_in_chunks(self):
+        # One query per full chunk plus the final short chunk
+        with self.assertNumQueries(3):
+            rows = list(exports.iter_export_rows(StudentRegistration.objects.all(), chunk_size=2))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row[0] for row in rows], sorted((row[0] for row in rows), reverse=True))
+
+
+class EventManagementTests(TestCase):
+    """Event list and deletion read the stored participant counts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.quiz = Event.objects.create(event_name='Quiz', category='LITERARY')
+        cls.chess = Event.objects.create(event_name='Chess', category='GAMES')
+        for i in range(3):
+            StudentRegistration.objects.create(
+                name=f'Student {i}', email=f's{i}@example.com', phone='9000000000',
+                regd_no=f'REG{i:03d}', branch='CSE', year='2nd Year', event=cls.quiz,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_listing_does_not_count_registrations(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('event_management'))
+        self.assertContains(response, '<td class="text-visible">3</td>', html=True)
+        self.assertFalse([query for query in queries if 'studentregistration' in query['sql'].lower()])
+
+    def test_event_with_participants_is_not_deleted(self):
+        self.client.post(reverse('delete_event', args=[self.quiz.pk]))
+        self.assertTrue(Event.objects.filter(pk=self.quiz.pk).exists())
+
+        self.client.post(reverse('delete_event', args=[self.chess.pk]))
+        self.assertFalse(Event.objects.filter(pk=self.chess.pk).exists())
+
+    def test_add_event_with_capacity(self):
+        self.client.post(reverse('add_event'), {'event_name': 'Debate', 'category': 'LITERARY', 'capacity': '40'})
+        self.assertEqual(Event.objects.get(event_name='Debate').capacity, 40)
+
+        self.client.post(reverse('add_event'), {'event_name': 'Essay', 'category': 'LITERARY', 'capacity': '0'})
+        self.assertFalse(Event.objects.filter(event_name='Essay').exists())
+
+    def test_add_participant_to_full_event_joins_waitlist(self):
+        Event.objects.filter(pk=self.quiz.pk).update(capacity=3)
+        response = self.client.post(reverse('add_participant'), {
+            'name': 'Late', 'regd_no': 'REG100', 'phone': '9000000000', 'email': 'late@example.com',
+            'branch': 'EE', 'year': '1st Year', 'event': self.quiz.pk,
+        })
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ['Quiz is full - Late is number 1 on its waitlist.'],
+        )
+        self.assertFalse(StudentRegistration.objects.filter(regd_no='REG100').exists())
+
+        # Lowering the count below the capacity hands the seat over
+        StudentRegistration.objects.get(regd_no='REG000').delete()
+        self.assertTrue(StudentRegistration.objects.filter(regd_no='REG100', event=self.quiz).exists())
+        self.assertEqual(WaitlistEntry.objects.get().status, WaitlistEntry.STATUS_PROMOTED)
+
+        response = self.client.get(reverse('event_management'))
+        self.assertContains(response, '3 / 3')
+
+
+class ExportSnapshotTests(TestCase):
+    """Participant exports written by a background job"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.event = Event.objects.create(event_name='Quiz', category='LITERARY')
+        StudentRegistration.objects.bulk_create([
+            StudentRegistration(
+                name=f'Student {i}', email=f's{i}@example.com', phone='9000000000',
+                regd_no=f'REG{i:03d}', branch='CSE' if i % 2 else 'EE', year='2nd Year', event=cls.event,
+            )
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def request_export(self, **data):
+        response = self.client.post(reverse('export_participants'), {'mode': 'background', **data})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def download(self, snapshot):
+        response = self.client.get(snapshot['download_url'])
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_export_is_written_in_the_background(self):
+        data = self.request_export(branch='CSE')
+        self.assertFalse(data['reused'])
+        self.assertEqual(data['snapshot']['status'], 'pending')
+
+        jobs.run_pending()
+        snapshot = self.client.get(data['snapshot']['status_url']).json()['snapshot']
+        self.assertEqual((snapshot['status'], snapshot['rows']), ('ready', 2))
+        self.assertTrue(snapshot['filename'].endswith('.csv'))
+
+        rows = list(csv.reader(io.StringIO(self.download(snapshot).decode('utf-8-sig'))))
+        self.assertEqual(rows[0], exports.EXPORT_HEADER)
+        self.assertEqual({row[5] for row in rows[1:]}, {'CSE'})
+
+    def test_compressed_export(self):
+        data = self.request_export(compress='gzip')
+        jobs.run_pending()
+        snapshot = self.client.get(data['snapshot']['status_url']).json()['snapshot']
+        self.assertTrue(snapshot['filename'].endswith('.csv.gz'))
+        text = gzip.decompress(self.download(snapshot)).decode('utf-8-sig')
+        self.assertEqual(len(text.strip().splitlines()), 6)
+
+    def test_identical_requests_reuse_the_snapshot_until_registrations_change(self):
+        first = self.request_export(branch='CSE')
+        again = self.request_export(branch='CSE')
+        self.assertTrue(again['reused'])
+        self.assertEqual(again['snapshot']['id'], first['snapshot']['id'])
+        self.assertFalse(self.request_export(branch='EE')['reused'])
+        self.assertEqual(Job.objects.count(), 2)
+
+        jobs.run_pending()
+        self.assertEqual(self.request_export(branch='CSE')['snapshot']['status'], 'ready')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentRegistration.objects.create(
+                name='Late Student', email='late@example.com', phone='9000000000',
+                regd_no='REG999', branch='CSE', year='1st Year', event=self.event,
+            )
+        fresh = self.request_export(branch='CSE')
+        self.assertFalse(fresh['reused'])
+        jobs.run_pending()
+        snapshot = self.client.get(fresh['snapshot']['status_url']).json()['snapshot']
+        self.assertEqual(snapshot['rows'], 3)
+
+    def test_failed_snapshot_is_requested_again(self):
+        data = self.request_export()
+        Job.objects.update(status=Job.STATUS_FAILED)
+        self.assertEqual(self.client.get(data['snapshot']['status_url']).json()['snapshot']['status'], 'failed')
+        self.assertFalse(self.request_export()['reused'])
+
+    def test_files_are_private(self):
+        data = self.request_export()
+        jobs.run_pending()
+        snapshot = ExportSnapshot.objects.get(pk=data['snapshot']['id'])
+        self.assertTrue(snapshot.file.name.startswith('exports/'))
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('export_snapshot_download', args=[snapshot.pk])).status_code, 302)
+        self.assertEqual(self.client.get(f'/media/{snapshot.file.name}').status_code, 404)
+
+    def test_old_snapshots_are_purged(self):
+        data = self.request_export()
+        jobs.run_pending()
+        snapshot = ExportSnapshot.objects.get(pk=data['snapshot']['id'])
+        path = snapshot.file.path
+        ExportSnapshot.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(exports.purge_snapshots(), 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ExportSnapshot.objects.exists())
+
+
+class ConsistentReadTests(TransactionTestCase):
+    """Snapshot exports read at REPEATABLE READ on every server backend"""
+
+    def isolation_statements(self, vendor):
+        issued = []
+
+        def intercept(execute, sql, params, many, context):
+            if sql.startswith('SET TRANSACTION'):
+                issued.append(sql)
+                return None
+            return execute(sql, params, many, context)
+
+        with mock.patch.object(type(connections['default']), 'vendor', vendor), connection.execute_wrapper(intercept):
+            with exports.consistent_read():
+                list(Event.objects.all())
+        return issued
+
+    def test_isolation_level_per_backend(self):
+        self.assertEqual(
+            self.isolation_statements('mysql'), ['SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY']
+        )
+        self.assertEqual(
+            self.isolation_statements('postgresql'), ['SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY']
+        )
+        self.assertEqual(self.isolation_statements('sqlite'), [])
+
+
+@override_settings(SQL_INSTRUMENTATION=True, SQL_INSTRUMENTATION_REPEAT_THRESHOLD=3)
+class SQLInstrumentationTests(TestCase):
+    """Per-request SQL instrumentation middleware and report"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.events = [Event.objects.create(event_name=f'Event {i}', category='GAMES') for i in range(4)]
+
+    def setUp(self):
+        sql_instrumentation.reset()
+
+    def run_view(self, view_function, view_name='test_view'):
+        middleware = sql_instrumentation.SQLInstrumentationMiddleware(view_function)
+        request = RequestFactory().get('/test/')
+        request.resolver_match = ResolverMatch(view_function, (), {}, url_name=view_name)
+        return middleware(request)
+
+    def test_repeated_queries_are_flagged(self):
+        def n_plus_one(request):
+            for event in self.events:
+                Event.objects.filter(pk=event.pk).exists()
+            Event.objects.filter(pk=self.events[0].pk).exists()
+            return HttpResponse()
+
+        with self.assertLogs('Home.sql_instrumentation', 'WARNING') as logs:
+            self.run_view(n_plus_one)
+        self.assertIn('most repeated query ran 5 times', logs.output[0])
+
+        [row] = sql_instrumentation.report()
+        self.assertEqual(row['view'], 'test_view')
+        self.assertEqual(row['queries'], 5)
+        self.assertEqual(row['duplicates'], 1)
+        self.assertEqual(row['n_plus_one'], 1)
+
+    def test_placeholder_lists_share_a_shape(self):
+        self.assertEqual(
+            sql_instrumentation.query_shape('SELECT 1 WHERE id IN (%s, %s, %s)'),
+            sql_instrumentation.query_shape('SELECT 1 WHERE id IN (%s)'),
+        )
+
+    def test_requests_are_grouped_by_url_name(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('participants_data'))
+        self.client.get(reverse('participants_data'))
+
+        rows = {row['view']: row for row in sql_instrumentation.report()}
+        self.assertEqual(rows['participants_data']['requests'], 2)
+
+        response = self.client.get(reverse('sql_report'))
+        self.assertContains(response, 'participants_data')
+
+    async def test_async_views_are_recorded(self):
+        async def async_view(request):
+            for event in self.events:
+                await Event.objects.filter(pk=event.pk).aexists()
+            await Event.objects.filter(pk=self.events[0].pk).aexists()
+            return HttpResponse()
+
+        middleware = sql_instrumentation.SQLInstrumentationMiddleware(async_view)
+        request = RequestFactory().get('/test/')
+        request.resolver_match = ResolverMatch(async_view, (), {}, url_name='async_view')
+        with self.assertLogs('Home.sql_instrumentation', 'WARNING'):
+            await middleware(request)
+
+        [row] = await sync_to_async(sql_instrumentation.report)()
+        self.assertEqual(row['queries'], 5)
+        self.assertEqual(row['n_plus_one'], 1)
+
+    async def test_overlapping_async_requests_count_their_own_queries(self):
+        def make_view(count, started, release):
+            async def view(request):
+                started.set()
+                await release.wait()
+                for event in self.events[:count]:
+                    await Event.objects.filter(pk=event.pk).aexists()
+                return HttpResponse()
+            return view
+
+        first_started, second_started = asyncio.Event(), asyncio.Event()
+        first_release, second_release = asyncio.Event(), asyncio.Event()
+        first = sql_instrumentation.SQLInstrumentationMiddleware(make_view(1, first_started, first_release))
+        second = sql_instrumentation.SQLInstrumentationMiddleware(make_view(3, second_started, second_release))
+
+        def request(name):
+            request = RequestFactory().get('/test/')
+            request.resolver_match = ResolverMatch(lambda request: None, (), {}, url_name=name)
+            return request
+
+        # A enters, B enters, A leaves first, then B runs its queries
+        first_task = asyncio.ensure_future(first(request('first')))
+        await first_started.wait()
+        second_task = asyncio.ensure_future(second(request('second')))
+        await second_started.wait()
+        first_release.set()
+        await first_task
+        second_release.set()
+        await second_task
+
+        rows = {row['view']: row['queries'] for row in await sync_to_async(sql_instrumentation.report)()}
+        self.assertEqual(rows, {'first': 1, 'second': 3})
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            sql_instrumentation.SQLInstrumentationMiddleware(lambda request: HttpResponse())
+
+
+def csv_upload(rows, name='participants.csv'):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['Name', 'Registration No', 'Phone', 'Email', 'Branch', 'Year', 'Event'])
+    writer.writerows(rows)
+    return SimpleUploadedFile(name, buffer.getvalue().encode('utf-8'), content_type='text/csv')
+
+
+class ImportParticipantsTests(TestCase):
+    """Bulk participant import"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+        cls.quiz = Event.objects.create(event_name='Quiz', category='LITERARY')
+        StudentRegistration.objects.create(
+            name='Existing', email='old@example.com', phone='9000000000',
+            regd_no='REG000', branch='CSE', year='1st Year', event=cls.quiz,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def upload(self, upload, **data):
+        return self.client.post(
+            reverse('import_participants'), {'file': upload, **data},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        ).json()
+
+    def test_valid_rows_imported_and_errors_reported(self):
+        data = self.upload(csv_upload([
+            ['Asha', 'REG001', '9876543210', 'asha@example.com', 'cse', '1st Year', 'quiz'],
+            ['Ravi', 'REG002', '9876543211', 'ravi@example.com', 'Civil', '2nd Year', 'Quiz'],
+            ['Old', 'REG000', '9876543212', 'old@example.com', 'CSE', '1st Year', 'Quiz'],
+            ['Twice', 'REG001', '9876543213', 'twice@example.com', 'CSE', '1st Year', 'Quiz'],
+            ['Nope', 'REG003', '9876543214', 'not-an-email', 'CSE', '1st Year', 'Quiz'],
+            ['Lost', 'REG004', '9876543215', 'lost@example.com', 'CSE', '1st Year', 'Chess'],
+            ['', '', '', '', '', '', ''],
+            ['Blank', 'REG005', '', 'blank@example.com', 'CSE', '1st Year', 'Quiz'],
+        ]))
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['created'], 2)
+        self.assertEqual([error['line'] for error in data['errors']], [4, 5, 6, 7, 9])
+        self.assertIn('already registered', data['errors'][0]['error'])
+        self.assertEqual(StudentRegistration.objects.count(), 3)
+        self.assertEqual(StudentRegistration.objects.get(regd_no='REG002').branch, 'CIVIL')
+
+    def test_missing_columns(self):
+        upload = SimpleUploadedFile('participants.csv', b'Name,Phone\nAsha,9876543210\n')
+        response = self.client.post(
+            reverse('import_participants'), {'file': upload}, headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Registration No', response.json()['error'])
+
+    def test_rows_are_inserted_in_batches(self):
+        rows = [
+            [f'Student {i}', f'NEW{i:04d}', '9876543210', f's{i}@example.com', 'EE', '3rd Year', 'Quiz']
+            for i in range(300)
+        ]
+        # Events and existing pairs, then one batch: the bulk insert (split in
+        # three by SQLite's parameter limit), the counter bucket, the event's
+        # participant count, event names and search documents (plus savepoints,
+        # one pair of them around the batch)
+        with self.assertNumQueries(16):
+            result = imports.import_participants(imports.read_rows(csv_upload(rows), 'participants.csv'))
+        self.assertEqual(result.created, 300)
+        self.assertEqual(StudentRegistration.objects.filter(regd_no__startswith='NEW').count(), 300)
+
+    def test_rows_beyond_capacity_are_skipped(self):
+        Event.objects.filter(pk=self.quiz.pk).update(capacity=2)
+        data = self.upload(csv_upload([
+            ['Asha', 'REG001', '9876543210', 'asha@example.com', 'CSE', '1st Year', 'Quiz'],
+            ['Ravi', 'REG002', '9876543211', 'ravi@example.com', 'CSE', '1st Year', 'Quiz'],
+        ]))
+        self.assertEqual(data['created'], 1)
+        self.assertEqual(data['errors'], [{'line': 3, 'error': 'Quiz is full'}])
+        self.assertEqual(Event.objects.get(pk=self.quiz.pk).participants_count, 2)
+
+    def test_conflicts_committed_during_import_are_reported(self):
+        Event.objects.filter(pk=self.quiz.pk).update(capacity=3)
+
+        def rows():
+            yield ['Name', 'Registration No', 'Phone', 'Email', 'Branch', 'Year', 'Event']
+            yield ['Asha', 'REG001', '9876543210', 'asha@example.com', 'CSE', '1st Year', 'Quiz']
+            # Registered elsewhere after the import loaded the existing pairs and seats
+            StudentRegistration.objects.create(
+                name='Asha', email='asha@example.com', phone='9876543210',
+                regd_no='REG001', branch='CSE', year='1st Year', event=self.quiz,
+            )
+            yield ['Ravi', 'REG002', '9876543211', 'ravi@example.com', 'CSE', '1st Year', 'Quiz']
+            yield ['Mina', 'REG003', '9876543212', 'mina@example.com', 'CSE', '1st Year', 'Quiz']
+
+        result = imports.import_participants(rows())
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors, [(2, 'REG001 is already registered for Quiz'), (4, 'Quiz is full')])
+        self.assertEqual(Event.objects.get(pk=self.quiz.pk).participants_count, 3)
+
+    def test_dry_run_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(csv_upload([
+                ['Asha', 'REG001', '9876543210', 'asha@example.com', 'CSE', '1st Year', 'Quiz'],
+            ]).read())
+            f.flush()
+            out = io.StringIO()
+            call_command('import_participants', f.name, '--dry-run', stdout=out)
+        self.assertIn('1 participants can be imported', out.getvalue())
+        self.assertEqual(StudentRegistration.objects.count(), 1)
+
+    @skipUnless(imports.xlsx_available(), "openpyxl is not installed")
+    def test_exported_xlsx_can_be_imported(self):
+        export = self.client.post(reverse('export_participants'), {'format': 'xlsx'})
+        content = b''.join(export.streaming_content)
+        StudentRegistration.objects.all().delete()
+
+        data = self.upload(SimpleUploadedFile('participants.xlsx', content))
+        self.assertEqual(data['created'], 1)
+        self.assertEqual(StudentRegistration.objects.get().regd_no, 'REG000')
+
+
+def jpeg_upload(name='winner.jpg', size=(1200, 800)):
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'  # Make
+    Image.new('RGB', size, (200, 30, 60)).save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ResultPhotoDerivativeTests(TestCase):
+    """Resized WebP/JPEG copies of result photos"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_result(self, **kwargs):
+        # The post_save hook only queues a job, which nothing runs here
+        return Result.objects.create(
+            winner='Meera', branch='EE', position='1st', game='Quiz',
+            photo=kwargs.pop('photo', None) or jpeg_upload(), **kwargs
+        )
+
+    def test_derivatives_are_resized_and_stripped(self):
+        result = self.create_result()
+        derivatives = update_derivatives(result.pk)
+
+        self.assertEqual(derivatives['source'], result.photo.name)
+        self.assertEqual([width for width, _ in derivatives['webp']], [120, 240, 480, 960])
+        for width, name in derivatives['jpeg']:
+            with result.photo.storage.open(name) as f:
+                image = Image.open(f)
+                self.assertEqual(image.width, width)
+                self.assertEqual(dict(image.getexif()), {})
+
+        result.refresh_from_db()
+        self.assertEqual(result.photo_derivatives, derivatives)
+
+    def test_small_photos_are_not_upscaled(self):
+        result = self.create_result(photo=jpeg_upload('small.jpg', (300, 300)))
+        derivatives = update_derivatives(result.pk)
+        self.assertEqual([width for width, _ in derivatives['jpeg']], [120, 240, 300])
+
+    def test_photos_sharing_a_stem_keep_their_own_derivatives(self):
+        first = self.create_result(photo=jpeg_upload('team.jpg', (300, 200)))
+        second = self.create_result(photo=jpeg_upload('team.png', (200, 100)))
+        first_derivatives = update_derivatives(first.pk)
+        second_derivatives = update_derivatives(second.pk)
+
+        first_names = {name for _, name in first_derivatives['jpeg'] + first_derivatives['webp']}
+        second_names = {name for _, name in second_derivatives['jpeg'] + second_derivatives['webp']}
+        self.assertFalse(first_names & second_names)
+        storage = first.photo.storage
+        for width, name in first_derivatives['jpeg']:
+            with storage.open(name) as f:
+                self.assertEqual(Image.open(f).size, (width, round(200 * width / 300)))
+
+    def test_template_tag(self):
+        result = self.create_result()
+        template = Template('{% load result_photos %}{% result_photo result sizes="80px" %}')
+
+        html = template.render(Context({'result': result}))
+        self.assertIn(result.photo.url, html)
+        self.assertNotIn('srcset', html)
+
+        update_derivatives(result.pk)
+        result.refresh_from_db()
+        html = template.render(Context({'result': result}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('-120w.webp 120w', html)
+        self.assertIn('sizes="80px"', html)
+
+    def test_saving_a_photo_queues_a_job(self):
+        result = self.create_result()
+        job = Job.objects.get(task='Admin.tasks.result_photo_derivatives')
+        self.assertEqual(job.kwargs, {'result_id': result.pk})
+
+        jobs.run_pending()
+        result.refresh_from_db()
+        self.assertEqual(result.photo_derivatives['source'], result.photo.name)
+
+        # Saving again without a new photo queues nothing
+        result.save()
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_backfill_command(self):
+        result = self.create_result()
+        call_command('generate_result_photos', stdout=io.StringIO())
+        result.refresh_from_db()
+        self.assertEqual(result.photo_derivatives['source'], result.photo.name)
+
+
+class FeaturedSlotTests(TestCase):
+    """Database-enforced limit of three featured winners"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+
+    def create_result(self, name, featured=False):
+        return Result.objects.create(
+            winner=name, branch='CSE', position='1st', game='Chess',
+            photo='results/x.jpg', featured=featured,
+        )
+
+    def test_fourth_feature_is_rejected(self):
+        for i in range(3):
+            self.create_result(f'Winner {i}', featured=True)
+
+        with self.assertRaises(ValidationError):
+            self.create_result('Winner 3', featured=True)
+        self.assertEqual(Result.objects.count(), 3)
+        self.assertEqual(FeaturedSlot.objects.count(), 3)
+
+    def test_claim_cannot_exceed_limit_even_if_validation_is_stale(self):
+        results = [self.create_result(f'Winner {i}') for i in range(4)]
+        for result in results[:3]:
+            FeaturedSlot.claim(result)
+        with self.assertRaises(ValidationError):
+            FeaturedSlot.claim(results[3])
+
+    def test_unfeature_and_delete_free_slots(self):
+        first = self.create_result('First', featured=True)
+        second = self.create_result('Second', featured=True)
+
+        first.featured = False
+        first.save()
+        second.delete()
+        self.assertEqual(FeaturedSlot.objects.count(), 0)
+
+    def test_toggle_featured_view(self):
+        self.client.force_login(self.user)
+        results = [self.create_result(f'Winner {i}') for i in range(4)]
+        for result in results:
+            self.client.post(reverse('toggle-featured', args=[result.pk]))
+
+        self.assertEqual(
+            [r.pk for r in FeaturedSlot.featured_results()],
+            [r.pk for r in reversed(results[:3])],
+        )
+        results[3].refresh_from_db()
+        self.assertFalse(results[3].featured)
+
+    def test_home_page_reads_at_most_three_rows(self):
+        for i in range(5):
+            self.create_result(f'Winner {i}', featured=i < 3)
+        with self.assertNumQueries(1):
+            winners = FeaturedSlot.featured_results()
+        self.assertEqual(len(winners), 3)
+
+
+@override_settings(ATTACHMENT_CHUNK_SIZE=4)
+class AttachmentUploadTests(TestCase):
+    """Chunked, resumable announcement attachment uploads"""
+
+    data = b'circular-2025.pdf contents'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='secret')
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def start(self, data=None, **overrides):
+        data = self.data if data is None else data
+        fields = {'filename': 'circular.pdf', 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+        fields.update(overrides)
+        return self.client.post(reverse('start_attachment_upload'), fields).json()
+
+    def put(self, upload_id, offset, chunk, **headers):
+        return self.client.put(
+            reverse('attachment_upload_chunk', args=[upload_id]), chunk,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset), **headers},
+        )
+
+    def upload(self, data=None, stop_at=None):
+        data = self.data if data is None else data
+        status = self.start(data)
+        while not status['complete'] and status['offset'] != stop_at:
+            offset = status['offset']
+            status = self.put(status['upload_id'], offset, data[offset:offset + status['chunk_size']]).json()
+        return status
+
+    def test_upload_and_attach(self):
+        status = self.upload()
+        self.assertTrue(status['complete'])
+
+        response = self.client.post(reverse('announcment'), {
+            'title': 'Circular', 'body': 'See attached', 'post_announcement': '',
+            'attachment_upload': status['upload_id'],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        # The file is moved into place by a background job
+        announcement = Announcment.objects.get()
+        self.assertFalse(announcement.attatchment)
+        jobs.run_pending()
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.attatchment.name, 'announcements/circular.pdf')
+        with announcement.attatchment.open() as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial-uploads')), [])
+
+    def test_restarting_resumes_at_the_received_offset(self):
+        first = self.upload(stop_at=12)
+        resumed = self.start()
+        self.assertEqual(resumed['upload_id'], first['upload_id'])
+        self.assertEqual(resumed['offset'], 12)
+
+        # A chunk repeated after a lost response is refused with the current offset
+        response = self.put(first['upload_id'], 8, self.data[8:12])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 12)
+
+        self.assertTrue(self.upload()['complete'])
+
+    def test_checksums_are_verified(self):
+        status = self.start()
+        response = self.put(status['upload_id'], 0, b'circ', **{'Upload-Checksum': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+
+        status = self.start(self.data, sha256=hashlib.sha256(b'something else').hexdigest())
+        for offset in range(0, len(self.data), 4):
+            response = self.put(status['upload_id'], offset, self.data[offset:offset + 4])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('attachment_upload_chunk', args=[status['upload_id']])).json()['offset'], 0)
+
+    def test_unfinished_upload_cannot_be_attached(self):
+        status = self.upload(stop_at=8)
+        self.client.post(reverse('announcment'), {
+            'title': 'Circular', 'body': 'See attached', 'post_announcement': '',
+            'attachment_upload': status['upload_id'],
+        })
+        self.assertFalse(Announcment.objects.exists())
+
+    def test_other_users_uploads_are_hidden(self):
+        status = self.start()
+        self.client.force_login(User.objects.create_user('other', password='secret'))
+        self.assertEqual(self.put(status['upload_id'], 0, b'circ').status_code, 404)
+
+    def test_purge_stale_uploads(self):
+        status = self.upload(stop_at=8)
+        AttachmentUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        call_command('purge_uploads', stdout=io.StringIO())
+        self.assertFalse(AttachmentUpload.objects.filter(pk=status['upload_id']).exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial-uploads')), [])
 
-# Create your tests here.
@@ -0,0 +1,214 @@
+# Admin/uploads.py
+"""
+Chunked, resumable announcement attachment uploads
+
+Instead of one multipart POST that Django buffers whole, the announcement
+page sends the attachment in chunks of at most ATTACHMENT_CHUNK_SIZE bytes:
+
+1. start_upload() records the file name, size and SHA-256 and returns the
+   upload. Starting the same file again (same name, size and checksum)
+   returns the unfinished upload and its offset, so a dropped connection
+   or a reloaded page resumes where it stopped.
+2. write_chunk() writes each chunk at its byte offset in a .part file. A
+   chunk that doesn't start where the received data ends is refused with
+   the current offset, and a chunk can carry its own SHA-256.
+3. After the last chunk the whole file is hashed and compared with the
+   declared checksum; on a mismatch the upload starts over.
+
+The announcement form then submits only the upload id; the announcement is
+saved straight away and a background job (Admin/tasks.py) moves the
+finished file into its attachment field with attach_upload().
+"""
+from datetime import timedelta
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AttachmentUpload
+
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+ATTACHMENT_MAX_SIZE = 25 * 1024 * 1024
+STALE_UPLOAD_AGE = timedelta(days=1)
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+HASH_READ_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """The upload request can't be accepted"""
+
+
+class OffsetMismatch(UploadError):
+    """A chunk didn't start where the received data ends"""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected the chunk at offset {offset}")
+        self.offset = offset
+
+
+def chunk_size():
+    # Each chunk is read with request.body, so it must stay under DATA_UPLOAD_MAX_MEMORY_SIZE
+    return getattr(settings, 'ATTACHMENT_CHUNK_SIZE', ATTACHMENT_CHUNK_SIZE)
+
+
+def max_size():
+    return getattr(settings, 'ATTACHMENT_MAX_SIZE', ATTACHMENT_MAX_SIZE)
+
+
+def partial_path(upload):
+    directory = getattr(settings, 'ATTACHMENT_UPLOAD_DIR', None) or os.path.join(settings.MEDIA_ROOT, 'partial-uploads')
+    return os.path.join(directory, f'{upload.pk.hex}.part')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_status(upload):
+    return {
+        'upload_id': str(upload.pk),
+        'offset': upload.received,
+        'size': upload.size,
+        'complete': upload.complete,
+        'chunk_size': chunk_size(),
+    }
+
+
+def start_upload(user, filename, size, sha256=''):
+    """
+    Begin an upload, or return the unfinished one for the same file
+    """
+    filename = os.path.basename(filename.replace('\\', '/')).strip()
+    if not filename:
+        raise UploadError("The file needs a name")
+    if len(filename) > AttachmentUpload._meta.get_field('filename').max_length:
+        raise UploadError("The file name is too long")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("Invalid file size")
+    if size <= 0:
+        raise UploadError("The file is empty")
+    if size > max_size():
+        raise UploadError(f"Attachments can be at most {max_size() // (1024 * 1024)} MB")
+    sha256 = sha256.strip().lower()
+    if sha256 and not SHA256_RE.match(sha256):
+        raise UploadError("Invalid SHA-256 checksum")
+
+    if sha256:
+        # Only a checksum says it's really the same file
+        upload = AttachmentUpload.objects.filter(
+            created_by=user, filename=filename, size=size, sha256=sha256
+        ).order_by('-updated_at').first()
+        if upload is not None:
+            path = partial_path(upload)
+            on_disk = os.path.getsize(path) if os.path.exists(path) else 0
+            if on_disk < upload.received:
+                # The partial file was cleaned up - continue from what is left
+                upload.received = on_disk
+                upload.complete = False
+                upload.save(update_fields=['received', 'complete', 'updated_at'])
+            return upload
+
+    upload = AttachmentUpload.objects.create(created_by=user, filename=filename, size=size, sha256=sha256)
+    os.makedirs(os.path.dirname(partial_path(upload)), exist_ok=True)
+    return upload
+
+
+def write_chunk(upload, offset, data, chunk_sha256=None):
+    """
+    Write data at offset and return the updated upload
+    """
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise UploadError("Missing or invalid Upload-Offset")
+    if not data:
+        raise UploadError("Empty chunk")
+    if len(data) > chunk_size():
+        raise UploadError(f"Chunks can be at most {chunk_size()} bytes")
+    if chunk_sha256 and hashlib.sha256(data).hexdigest() != chunk_sha256.strip().lower():
+        raise UploadError("The chunk was corrupted in transit")
+
+    with transaction.atomic():
+        # One writer per upload - a retried chunk racing the original waits here
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.complete or offset != upload.received:
+            raise OffsetMismatch(upload.received)
+        if offset + len(data) > upload.size:
+            raise UploadError("The chunk runs past the end of the file")
+
+        path = partial_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(offset)
+            f.write(data)
+            # Drop anything left over from a write whose row update was lost
+            f.truncate()
+        upload.received = offset + len(data)
+
+        verified = True
+        if upload.received == upload.size:
+            verified = not upload.sha256 or file_sha256(path) == upload.sha256
+            if verified:
+                upload.complete = True
+            else:
+                upload.received = 0
+                os.remove(path)
+        upload.save(update_fields=['received', 'complete', 'updated_at'])
+
+    if not verified:
+        raise UploadError("The file's checksum doesn't match - upload it again")
+    return upload
+
+
+def completed_upload(upload_id, user):
+    """
+    The finished upload named by a form's attachment_upload field, or None if empty
+    """
+    if not upload_id:
+        return None
+    try:
+        return AttachmentUpload.objects.get(pk=upload_id, created_by=user, complete=True)
+    except (AttachmentUpload.DoesNotExist, ValidationError):
+        raise UploadError("The attachment upload wasn't finished - choose the file again")
+
+
+def attach_upload(announcement, upload):
+    """
+    Store the finished upload as a saved announcement's attachment
+    """
+    with open(partial_path(upload), 'rb') as f:
+        announcement.attatchment.save(upload.filename, File(f), save=False)
+    # Only the attachment - an edit made while the job waited must not be undone
+    announcement.save(update_fields=['attatchment', 'updated_at'])
+    discard(upload)
+
+
+def discard(upload):
+    path = partial_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    upload.delete()
+
+
+def purge_stale_uploads(max_age=STALE_UPLOAD_AGE):
+    """
+    Delete uploads untouched for max_age, with their partial files
+    """
+    stale = AttachmentUpload.objects.filter(updated_at__lt=timezone.now() - max_age)
+    count = 0
+    for upload in stale.iterator():
+        discard(upload)
+        count += 1
+    return count
@@ -10,7 +10,13 @@ urlpatterns = [
     path('add-participant/', views.add_participant, name='add_participant'),
     path('edit-participant/<int:participant_id>/', views.edit_participant, name='edit_participant'),
     path('delete-participant/<int:participant_id>/', views.delete_participant, name='delete_participant'),
+    path('participants/', views.participants_data, name='participants_data'),
+    path('stats/', views.registration_stats, name='registration_stats'),
+    path('sql-report/', views.sql_report, name='sql_report'),
     path('export-participants/', views.export_participants, name='export_participants'),
+    path('exports/<uuid:snapshot_id>/', views.export_snapshot, name='export_snapshot'),
+    path('exports/<uuid:snapshot_id>/download/', views.export_snapshot_download, name='export_snapshot_download'),
+    path('import-participants/', views.import_participants, name='import_participants'),
     
     # Event management
     path('event-management/', views.event_management, name='event_management'),
@@ -33,5 +39,7 @@ urlpatterns = [
 path('edit-announcement/<int:announcement_id>/', views.edit_announcement, name='edit_announcement'),
 path('delete-announcement/<int:announcement_id>/', views.delete_announcement, name='delete_announcement'),
 path('clear-all-announcements/', views.clear_all_announcements, name='clear-all-announcements'),
+path('attachment-uploads/', views.start_attachment_upload, name='start_attachment_upload'),
+path('attachment-uploads/<uuid:upload_id>/', views.attachment_upload_chunk, name='attachment_upload_chunk'),
 path('announcment/', views.announcment_view, name='announcment'),
 ]
\ No newline at end of file
@@ -3,35 +3,169 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.cache import never_cache
 from django.contrib.auth import logout
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse, FileResponse
 from django.contrib import messages
-from Home.models import StudentRegistration, Event
-from django.db.models import Q, Count
-import csv
-from django.utils import timezone
+from Home.models import StudentRegistration, Event, WaitlistEntry
+from Home import counters, jobs, sql_instrumentation
+from Home.media import file_response
+from Home.waitlist import EventFull, join_waitlist, waitlist_position
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+import base64
+import tempfile
+from datetime import datetime
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 import json
-from .models import Result  # Import Result model from Admin app
+import os
+from .models import AttachmentUpload, ExportSnapshot, FeaturedSlot, Result  # Import Result model from Admin app
+from . import exports, imports, tasks, uploads
+from .exports import filter_participants
 from django.core.exceptions import ValidationError
 
+# Number of participants returned per page by the dashboard listing
+PARTICIPANTS_PAGE_SIZE = 50
+PARTICIPANTS_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(registered_at, participant_id):
+    """
+    Encode a (registered_at, id) keyset position as an opaque cursor string
+    """
+    raw = f"{registered_at.isoformat()}|{participant_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if invalid
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        registered_at, participant_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(registered_at), int(participant_id)
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 @never_cache
 @login_required(login_url='admin_login')
 def admin_dashboard(request):
     """
-    Admin dashboard view showing all participants
+    Admin dashboard view - participants are loaded page by page from participants_data
     """
-    # Get all participants with event information
-    all_data = StudentRegistration.objects.all().select_related('event')
-    
     # Get all events for dropdowns
     events = Event.objects.all()
     
     context = {
-        'all_data': all_data,
         'events': events,
+        'branches': StudentRegistration.BRANCH_CHOICES,
+        # Header totals come from the counter table (see Home/counters.py)
+        'stats': counters.dashboard_stats(),
     }
     return render(request, 'Admin/admin.html', context)
 
+
+@never_cache
+@login_required(login_url='admin_login')
+def sql_report(request):
+    """
+    Per-view query counts, database time and N+1 suspects recorded by the
+    SQL instrumentation middleware
+    """
+    if request.method == 'POST':
+        sql_instrumentation.reset()
+        messages.success(request, 'SQL statistics cleared.')
+        return redirect('sql_report')
+    
+    context = {
+        'enabled': sql_instrumentation.instrumentation_enabled(),
+        'limits': sql_instrumentation.thresholds(),
+        'views': sql_instrumentation.report(),
+    }
+    return render(request, 'Admin/sql_report.html', context)
+
+
+@never_cache
+@login_required(login_url='admin_login')
+def registration_stats(request):
+    """
+    Registration totals and per event/branch/year/day breakdowns as JSON
+    """
+    return JsonResponse({
+        'success': True,
+        'stats': counters.dashboard_stats(),
+        'by_event': counters.breakdown('event'),
+        'by_branch': counters.breakdown('branch'),
+        'by_year': counters.breakdown('year'),
+        'by_day': counters.breakdown('day'),
+    })
+
+
+@never_cache
+@login_required(login_url='admin_login')
+def participants_data(request):
+    """
+    JSON listing of participants ordered newest first, paged with a
+    keyset cursor on (registered_at, id) so every page costs the same
+    """
+    search = request.GET.get('search', '').strip()
+    branch = request.GET.get('branch', '').strip()
+    event = request.GET.get('event', '').strip()
+    cursor = request.GET.get('cursor', '').strip()
+    
+    try:
+        limit = int(request.GET.get('limit', PARTICIPANTS_PAGE_SIZE))
+    except ValueError:
+        limit = PARTICIPANTS_PAGE_SIZE
+    limit = max(1, min(limit, PARTICIPANTS_MAX_PAGE_SIZE))
+    
+    participants = filter_participants(
+        StudentRegistration.objects.all(), search, branch, event
+    ).order_by('-registered_at', '-id')
+    
+    if cursor:
+        try:
+            registered_at, participant_id = decode_cursor(cursor)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        participants = participants.filter(
+            Q(registered_at__lt=registered_at) |
+            Q(registered_at=registered_at, id__lt=participant_id)
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    rows = list(participants.values(
+        'id', 'name', 'regd_no', 'phone', 'email', 'branch', 'year',
+        'event_id', 'event__event_name', 'registered_at',
+    )[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last['registered_at'], last['id'])
+    
+    results = [{
+        'id': row['id'],
+        'name': row['name'],
+        'regd_no': row['regd_no'],
+        'phone': row['phone'],
+        'email': row['email'],
+        'branch': row['branch'],
+        'year': row['year'],
+        'event_id': row['event_id'],
+        'event_name': row['event__event_name'],
+        'registered_at': row['registered_at'].isoformat(),
+    } for row in rows]
+    
+    return JsonResponse({
+        'success': True,
+        'results': results,
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 def add_participant(request):
     """
@@ -61,16 +195,27 @@ def add_participant(request):
                 messages.error(request, f"Registration number {regd_no} already exists!")
                 return redirect('admin_dashboard')
             
-            # Create new participant
-            participant = StudentRegistration.objects.create(
-                name=name,
-                regd_no=regd_no,
-                phone=phone,
-                email=email,
-                branch=branch,
-                year=year,
-                event=event
-            )
+            # Create new participant (registration counters are updated in the same transaction)
+            try:
+                with transaction.atomic():
+                    participant = StudentRegistration.objects.create(
+                        name=name,
+                        regd_no=regd_no,
+                        phone=phone,
+                        email=email,
+                        branch=branch,
+                        year=year,
+                        event=event
+                    )
+            except EventFull:
+                entry = join_waitlist(
+                    event.id, name=name, regd_no=regd_no, phone=phone, email=email, branch=branch, year=year
+                )
+                messages.warning(
+                    request,
+                    f'{event.event_name} is full - {name} is number {waitlist_position(entry)} on its waitlist.'
+                )
+                return redirect('admin_dashboard')
             
             messages.success(request, f'Participant {name} added successfully!')
             return redirect('admin_dashboard')
@@ -106,7 +251,8 @@ def edit_participant(request, participant_id):
                 event = Event.objects.get(id=event_id)
                 participant.event = event
             
-            participant.save()
+            with transaction.atomic():
+                participant.save()
             
             messages.success(request, f'Participant {participant.name} updated successfully!')
             return redirect('admin_dashboard')
@@ -126,7 +272,8 @@ def delete_participant(request, participant_id):
         try:
             participant = get_object_or_404(StudentRegistration, id=participant_id)
             participant_name = participant.name
-            participant.delete()
+            with transaction.atomic():
+                participant.delete()
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({
@@ -146,72 +293,188 @@ def delete_participant(request, participant_id):
     
     return redirect('admin_dashboard')
 
+# Per-row errors sent back to the dashboard; the rest are only counted
+MAX_IMPORT_ERRORS = 200
+
+
+@login_required
+@require_http_methods(["POST"])
+def import_participants(request):
+    """
+    Bulk import participants from an uploaded CSV or XLSX sheet
+    """
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    upload = request.FILES.get('file')
+    dry_run = request.POST.get('dry_run') in ('on', '1', 'true')
+    
+    try:
+        if upload is None:
+            raise imports.ImportFileError("Choose a CSV or XLSX file to import")
+        result = imports.import_participants(imports.read_rows(upload, upload.name), dry_run=dry_run)
+    except IntegrityError:
+        # Conflicting rows are skipped one by one, so this is unexpected - the whole import rolled back
+        error = 'The participants changed during the import, nothing was imported. Please try again.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': error}, status=409)
+        messages.error(request, f'Import failed: {error}')
+        return redirect('admin_dashboard')
+    except imports.ImportFileError as e:
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        messages.error(request, f'Import failed: {e}')
+        return redirect('admin_dashboard')
+    
+    action = 'can be imported' if dry_run else 'imported'
+    summary = f'{result.created} participant(s) {action}, {len(result.errors)} row(s) skipped.'
+    if is_ajax:
+        return JsonResponse({
+            'success': True,
+            'dry_run': dry_run,
+            'created': result.created,
+            'error_count': len(result.errors),
+            'errors': [
+                {'line': line, 'error': error} for line, error in result.errors[:MAX_IMPORT_ERRORS]
+            ],
+            'message': summary,
+        })
+    
+    messages.success(request, summary)
+    for line, error in result.errors[:MAX_IMPORT_ERRORS]:
+        messages.error(request, f'Row {line}: {error}')
+    return redirect('admin_dashboard')
+
+
 @login_required
 def export_participants(request):
     """
-    Export filtered participants to CSV
+    Export filtered participants as a streamed CSV (optionally gzipped) or XLSX
     """
     # Get filter parameters from POST request
     search = request.POST.get('search', '').strip()
     branch = request.POST.get('branch', '').strip()
     event = request.POST.get('event', '').strip()
-    
-    # Start with all participants
-    participants = StudentRegistration.objects.all().select_related('event')
-    
-    # Apply filters if provided
-    if search:
-        participants = participants.filter(
-            Q(name__icontains=search) |
-            Q(regd_no__icontains=search) |
-            Q(phone__icontains=search) |
-            Q(email__icontains=search) |
-            Q(branch__icontains=search) |
-            Q(event_event_name_icontains=search)
-        )
-    
-    if branch:
-        participants = participants.filter(branch=branch)
-    
-    if event:
-        participants = participants.filter(event__event_name=event)
-    
-    # Create CSV response
-    response = HttpResponse(content_type='text/csv; charset=utf-8')
-    response['Content-Disposition'] = f'attachment; filename="participants_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    # Write CSV with UTF-8 BOM for Excel compatibility
-    response.write('\ufeff')
-    writer = csv.writer(response)
-    
-    # Write header
-    writer.writerow(['ID', 'Name', 'Registration No', 'Phone', 'Email', 'Branch', 'Year', 'Event', 'Event Category', 'Registered At'])
-    
-    # Write data
-    for participant in participants:
-        writer.writerow([
-            participant.id,
-            participant.name,
-            participant.regd_no,
-            participant.phone,
-            participant.email,
-            participant.branch,
-            participant.year,
-            participant.event.event_name,
-            participant.event.get_category_display(),
-            participant.registered_at.strftime('%Y-%m-%d %H:%M:%S') if participant.registered_at else ''
-        ])
-    
+    export_format = request.POST.get('format', 'csv').strip().lower()
+    compress = request.POST.get('compress') in ('gzip', 'on', '1')
+    
+    error = None
+    if export_format not in ('csv', 'xlsx'):
+        error = f'Unsupported export format "{export_format}"!'
+    elif export_format == 'xlsx' and not exports.xlsx_available():
+        error = 'XLSX export requires the openpyxl package to be installed.'
+    if error:
+        if request.POST.get('mode') == 'background':
+            return JsonResponse({'success': False, 'error': error}, status=400)
+        messages.error(request, error)
+        return redirect('admin_dashboard')
+    
+    if request.POST.get('mode') == 'background':
+        # Written by a background job; the dashboard polls for the download link
+        snapshot, reused = exports.request_snapshot(request.user, search, branch, event, export_format, compress)
+        return JsonResponse({'success': True, 'reused': reused, 'snapshot': snapshot_json(snapshot)})
+    
+    # Start with all participants and apply filters if provided
+    participants = filter_participants(
+        StudentRegistration.objects.all(), search, branch, event
+    )
+    rows = exports.iter_export_rows(participants)
+    filename = exports.export_filename(export_format, compress=False)
+    
+    if export_format == 'xlsx':
+        # XLSX is a zip archive, so build it in a disk-backed temp file
+        workbook_file = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+        exports.write_xlsx(rows, workbook_file)
+        workbook_file.seek(0)
+        if compress:
+            chunks = exports.iter_gzip(iter(lambda: workbook_file.read(64 * 1024), b''))
+            response = StreamingHttpResponse(chunks, content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = FileResponse(
+                workbook_file,
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+    else:
+        # Stream CSV rows to the client as they are read from the database
+        chunks = exports.iter_encoded(exports.iter_csv(rows))
+        if compress:
+            chunks = exports.iter_gzip(chunks)
+            response = StreamingHttpResponse(chunks, content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
+
+def snapshot_json(snapshot):
+    state = exports.snapshot_state(snapshot)
+    data = {
+        'id': str(snapshot.pk),
+        'status': state,
+        'format': snapshot.export_format,
+        'compress': snapshot.compress,
+        'status_url': reverse('export_snapshot', args=[snapshot.pk]),
+    }
+    if state == 'ready':
+        data['rows'] = snapshot.rows
+        data['filename'] = os.path.basename(snapshot.file.name)
+        data['download_url'] = reverse('export_snapshot_download', args=[snapshot.pk])
+    return data
+
+
+@login_required
+@require_http_methods(["GET"])
+def export_snapshot(request, snapshot_id):
+    """
+    Progress of a background export, polled by the dashboard
+    """
+    snapshot = get_object_or_404(ExportSnapshot.objects.select_related('job'), pk=snapshot_id)
+    return JsonResponse({'success': True, 'snapshot': snapshot_json(snapshot)})
+
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def export_snapshot_download(request, snapshot_id):
+    """
+    Download a finished background export
+    """
+    snapshot = get_object_or_404(ExportSnapshot, pk=snapshot_id, status=ExportSnapshot.STATUS_READY)
+    if not snapshot.file or not snapshot.file.storage.exists(snapshot.file.name):
+        raise Http404("Export file not found")
+    if snapshot.compress:
+        content_type = 'application/gzip'
+    elif snapshot.export_format == 'xlsx':
+        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        content_type = 'text/csv; charset=utf-8'
+    return file_response(
+        request, snapshot.file.path, snapshot.file.name, content_type=content_type,
+        cache_control='private, no-cache', download_name=os.path.basename(snapshot.file.name),
+    )
+
+def parse_capacity(value):
+    """
+    Event capacity from a form field: None (unlimited) when blank, else a
+    positive whole number; raises ValueError otherwise
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError('Capacity must be a positive whole number!')
+    return int(value)
+
 @never_cache
 @login_required(login_url='admin_login')
 def event_management(request):
     """
     Event management view for admin
     """
-    # Get all events with participant count
-    events = Event.objects.annotate(participants_count=Count('studentregistration'))
+    # participants_count is kept up to date by Home/counters.py - no registration scan
+    events = Event.objects.annotate(
+        waiting=Count('waitlistentry', filter=Q(waitlistentry__status=WaitlistEntry.STATUS_WAITING))
+    )
     
     context = {
         'events': events,
@@ -222,7 +485,7 @@ def event_management(request):
 @require_http_methods(["POST"])
 def add_event(request):
     """
-    Add new event - SIMPLIFIED (only name and category)
+    Add new event - name, category and optional capacity
     """
     try:
         # Get event name and category from POST data
@@ -238,15 +501,22 @@ def add_event(request):
             messages.error(request, 'Event category is required!')
             return redirect('event_management')
         
+        try:
+            capacity = parse_capacity(request.POST.get('capacity'))
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('event_management')
+        
         # Check if event already exists
         if Event.objects.filter(event_name__iexact=event_name).exists():
             messages.error(request, f'Event "{event_name}" already exists!')
             return redirect('event_management')
         
-        # Create event - ONLY name and category
+        # Create event
         event = Event.objects.create(
             event_name=event_name,
-            category=category
+            category=category,
+            capacity=capacity
         )
         
         messages.success(request, f'Event "{event_name}" added successfully!')
@@ -270,7 +540,9 @@ def edit_event(request, event_id):
                 'event': {
                     'id': event.id,
                     'event_name': event.event_name,
-                    'category': event.category
+                    'category': event.category,
+                    'capacity': event.capacity,
+                    'participants_count': event.participants_count
                 }
             })
         except Exception as e:
@@ -292,9 +564,16 @@ def edit_event(request, event_id):
                 messages.error(request, f'Event with name "{event_name}" already exists!')
                 return redirect('event_management')
             
-            # Update event
+            try:
+                capacity = parse_capacity(request.POST.get('capacity'))
+            except ValueError as e:
+                messages.error(request, str(e))
+                return redirect('event_management')
+            
+            # Update event (raising the capacity promotes students from the waitlist)
             event.event_name = event_name
             event.category = category
+            event.capacity = capacity
             event.save()
             
             messages.success(request, f'Event "{event.event_name}" updated successfully!')
@@ -315,7 +594,7 @@ def delete_event(request, event_id):
             event_name = event.event_name
             
             # Check if event has participants
-            if event.studentregistration_set.exists():
+            if event.participants_count > 0:
                 messages.error(request, f'Cannot delete event "{event_name}" because it has participants!')
                 return redirect('event_management')
             
@@ -360,19 +639,9 @@ def upload_result(request):
                 result.branch = request.POST.get("Branch")
                 result.position = request.POST.get("position")
                 
-                # Update featured status
+                # Update featured status - save() claims or releases a featured slot
                 featured = request.POST.get("featured")
-                current_featured = result.featured
-                new_featured = True if featured == "on" else False
-                
-                # Check if trying to feature and already have 3 featured
-                if not current_featured and new_featured:
-                    featured_count = Result.objects.filter(featured=True).count()
-                    if featured_count >= 3:
-                        messages.error(request, "❌ Only 3 winners can be featured on the home page! Please unfeature another winner first.")
-                        return redirect('upload-result')
-                
-                result.featured = new_featured
+                result.featured = True if featured == "on" else False
                 
                 # Update photo only if new one is provided
                 image = request.FILES.get("Image")
@@ -394,13 +663,6 @@ def upload_result(request):
                 featured = request.POST.get("featured")
                 is_featured = True if featured == "on" else False
                 
-                # Check if trying to feature and already have 3 featured
-                if is_featured:
-                    featured_count = Result.objects.filter(featured=True).count()
-                    if featured_count >= 3:
-                        messages.error(request, "❌ Only 3 winners can be featured on the home page! Please unfeature another winner first.")
-                        return redirect('upload-result')
-                
                 # Create new result
                 result = Result(
                     winner=winner,
@@ -416,7 +678,7 @@ def upload_result(request):
             return redirect('upload-result')
             
         except ValidationError as e:
-            messages.error(request, f"❌ {e}")
+            messages.error(request, f"❌ {' '.join(e.messages)}")
             return redirect('upload-result')
         except Exception as e:
             messages.error(request, f"❌ Error: {str(e)}")
@@ -424,7 +686,7 @@ def upload_result(request):
     
     # GET request - show all results
     results = Result.objects.all().order_by('-id')
-    featured_count = Result.objects.filter(featured=True).count()
+    featured_count = FeaturedSlot.objects.count()
     
     # Check if editing a specific result
     result_id = request.GET.get('edit')
@@ -472,18 +734,8 @@ def toggle_featured(request, result_id):
         try:
             result = get_object_or_404(Result, id=result_id)
             
-            # Check current status
-            current_featured = result.featured
-            
-            # If trying to feature and already have 3 featured
-            if not current_featured:
-                featured_count = Result.objects.filter(featured=True).count()
-                if featured_count >= 3:
-                    messages.error(request, "❌ Only 3 winners can be featured on the home page! Please unfeature another winner first.")
-                    return redirect('upload-result')
-            
-            # Toggle featured status
-            result.featured = not current_featured
+            # Toggle featured status - save() raises ValidationError if all slots are taken
+            result.featured = not result.featured
             result.save()
             
             if result.featured:
@@ -492,7 +744,7 @@ def toggle_featured(request, result_id):
                 messages.success(request, f'✅ {result.winner} is no longer featured.')
                 
         except ValidationError as e:
-            messages.error(request, f"❌ {e}")
+            messages.error(request, f"❌ {' '.join(e.messages)}")
         except Exception as e:
             messages.error(request, f'❌ Error toggling featured status: {str(e)}')
     
@@ -585,6 +837,8 @@ def edit_announcement(request, announcement_id):
             title = request.POST.get('title')
             content = request.POST.get('body')
             attachment = request.FILES.get('notice')
+            # Attachment sent ahead in chunks by the page's uploader
+            upload = uploads.completed_upload(request.POST.get('attachment_upload'), request.user)
             
             # Update announcement
             announcement.title = title
@@ -593,8 +847,10 @@ def edit_announcement(request, announcement_id):
             # Update attachment only if new one is provided
             if attachment:
                 announcement.attatchment = attachment
-            
             announcement.save()
+            if upload:
+                # Copying the file into place happens in the background
+                jobs.enqueue(tasks.attach_announcement_upload, announcement_id=announcement.pk, upload_id=str(upload.pk))
             
             messages.success(request, 'Announcement updated successfully!')
             return redirect('announcment')
@@ -626,6 +882,11 @@ def announcment_view(request):
             title = request.POST.get('title')
             content = request.POST.get('body')
             attachment = request.FILES.get('notice')
+            try:
+                upload = uploads.completed_upload(request.POST.get('attachment_upload'), request.user)
+            except uploads.UploadError as e:
+                messages.error(request, str(e))
+                return redirect('announcment')
             
             announcement = Announcment(
                 title=title,
@@ -633,6 +894,9 @@ def announcment_view(request):
                 attatchment=attachment
             )
             announcement.save()
+            if upload:
+                # Copying the file into place happens in the background
+                jobs.enqueue(tasks.attach_announcement_upload, announcement_id=announcement.pk, upload_id=str(upload.pk))
             
             messages.success(request, 'Announcement created successfully!')
             return redirect('announcment')
@@ -653,4 +917,47 @@ def announcment_view(request):
     return render(request, 'Admin/announcment.html', {
         'announcements': announcements,
         'edit_announcement': edit_announcement
-    })
\ No newline at end of file
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def start_attachment_upload(request):
+    """
+    Begin (or resume) a chunked announcement attachment upload
+    """
+    try:
+        upload = uploads.start_upload(
+            request.user,
+            request.POST.get('filename', ''),
+            request.POST.get('size'),
+            request.POST.get('sha256', ''),
+        )
+    except uploads.UploadError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **uploads.upload_status(upload)})
+
+
+@login_required
+@never_cache
+@require_http_methods(["GET", "PUT"])
+def attachment_upload_chunk(request, upload_id):
+    """
+    GET reports how much of the upload has arrived; PUT appends the request
+    body at the Upload-Offset header's position
+    """
+    upload = get_object_or_404(AttachmentUpload, pk=upload_id, created_by=request.user)
+    if request.method == 'PUT':
+        try:
+            upload = uploads.write_chunk(
+                upload,
+                request.headers.get('Upload-Offset'),
+                request.body,
+                request.headers.get('Upload-Checksum'),
+            )
+        except uploads.OffsetMismatch as e:
+            return JsonResponse({'success': False, 'error': str(e), 'offset': e.offset}, status=409)
+        except uploads.UploadError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **uploads.upload_status(upload)})
+
@@ -0,0 +1,366 @@
+# Home/benchmark.py
+"""
+Endpoint benchmarks
+
+Seeds a database with registrations, results and notices at a given size,
+then drives the public and admin endpoints through Django's test client
+from a pool of threads and records latency percentiles, throughput and
+query counts per endpoint. ``manage.py benchmark`` runs this against a
+throwaway database and writes the numbers to a JSON baseline that can be
+compared with an earlier run.
+
+With asgi=True the requests go through the ASGI handler instead
+(AsyncClient, all concurrent requests on one event loop in this process),
+which shows how the async public views scale with concurrent connections
+on a single process.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Admin.models import Announcment, FeaturedSlot, Result
+
+from .catalog import get_catalog
+from .ingestion import bulk_insert_registrations
+from .models import Event, StudentRegistration
+
+SEED_BATCH_SIZE = 1000
+BENCHMARK_USER = 'benchmark-admin'
+
+EVENTS_BY_CATEGORY = {
+    'LITERARY': ['Debate', 'Quiz', 'Extempore'],
+    'ATHLETICS': ['100m Sprint', 'Long Jump'],
+    'CULTURAL': ['Solo Dance', 'Group Dance', 'Solo Singing'],
+    'GAMES': ['Chess', 'Carrom'],
+    'SPORTS': ['Cricket', 'Football'],
+}
+# Only real category codes, so the register page's catalog shows every seeded event
+EVENT_NAMES = [
+    (event_name, category)
+    for category, _ in Event.CATEGORY_CHOICES
+    for event_name in EVENTS_BY_CATEGORY.get(category, [])
+]
+
+FIRST_NAMES = ['Asha', 'Ravi', 'Priya', 'Arjun', 'Sneha', 'Vikram', 'Neha', 'Rahul', 'Pooja', 'Amit']
+LAST_NAMES = ['Das', 'Mishra', 'Patra', 'Sahoo', 'Nayak', 'Behera', 'Mohanty', 'Rout']
+
+# Ratio of results and notices to registrations, with a floor for small sizes
+RESULTS_PER_1000 = 5
+NOTICES_PER_1000 = 10
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    url_name: str
+    login: bool = False
+    data: object = None
+
+    def request(self, client):
+        url = reverse(self.url_name)
+        data = self.data() if callable(self.data) else (self.data or {})
+        if self.method == 'post':
+            response = client.post(url, data)
+        else:
+            response = client.get(url, data)
+        if response.streaming:
+            # Exports are only finished once the whole body has been produced
+            for chunk in response.streaming_content:
+                pass
+        return response
+
+    async def arequest(self, client):
+        url = reverse(self.url_name)
+        # The form data may read the catalog, which can query the database
+        data = await sync_to_async(self.data)() if callable(self.data) else (self.data or {})
+        if self.method == 'post':
+            response = await client.post(url, data)
+        else:
+            response = await client.get(url, data)
+        if response.streaming:
+            if response.is_async:
+                async for chunk in response.streaming_content:
+                    pass
+            else:
+                await sync_to_async(list)(response.streaming_content)
+        return response
+
+
+_registration_numbers = itertools.count(1)
+_registration_lock = threading.Lock()
+
+
+def registration_data():
+    with _registration_lock:
+        number = next(_registration_numbers)
+    return {
+        'name': 'Bench Student',
+        'email': f'bench{number}@example.com',
+        'phone': '9000000000',
+        'regd_no': f'B{int(time.time())}{number:06d}'[-20:],
+        'branch': 'CSE',
+        'year': '1st Year',
+        # The cached catalog, so building the form data adds no queries
+        'event': min(get_catalog()['events_by_id']),
+    }
+
+
+ENDPOINTS = [
+    Endpoint('register', 'post', 'register', data=registration_data),
+    Endpoint('home', 'get', 'home'),
+    Endpoint('all_winners', 'get', 'all-winners'),
+    Endpoint('notices', 'get', 'notices'),
+    Endpoint('admin_dashboard', 'get', 'admin_dashboard', login=True),
+    Endpoint('participants_data', 'get', 'participants_data', login=True, data={'limit': 50}),
+    Endpoint('participants_search', 'get', 'participants_data', login=True,
+             data={'limit': 50, 'search': 'asha'}),
+    Endpoint('export_participants', 'post', 'export_participants', login=True),
+]
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    requests: int
+    concurrency: int
+    errors: int = 0
+    latencies: list = field(default_factory=list)
+    elapsed: float = 0.0
+    queries_cold: int = 0
+    queries_warm: int = 0
+
+    def as_dict(self):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'concurrency': self.concurrency,
+            'errors': self.errors,
+            'throughput_rps': round(len(latencies) / self.elapsed, 2) if self.elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+                'p50': percentile_ms(latencies, 50),
+                'p90': percentile_ms(latencies, 90),
+                'p95': percentile_ms(latencies, 95),
+                'p99': percentile_ms(latencies, 99),
+                'max': round(latencies[-1] * 1000, 2) if latencies else None,
+            },
+            'queries_cold': self.queries_cold,
+            'queries_warm': self.queries_warm,
+        }
+
+
+def percentile_ms(sorted_values, pct):
+    """
+    Nearest-rank percentile of sorted latencies in seconds, in milliseconds
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return round(sorted_values[rank - 1] * 1000, 2)
+
+
+def seed(size):
+    """
+    Grow the database to size registrations, with results and notices in proportion
+    """
+    events = list(Event.objects.all())
+    for event_name, category in EVENT_NAMES[len(events):]:
+        events.append(Event.objects.create(event_name=event_name, category=category))
+
+    existing = StudentRegistration.objects.count()
+    for start in range(existing, size, SEED_BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + SEED_BATCH_SIZE, size)):
+            name = f'{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}'
+            batch.append(StudentRegistration(
+                name=name,
+                email=f'student{i}@example.com',
+                phone=f'9{i:09d}',
+                regd_no=f'S{i:09d}',
+                branch=StudentRegistration.BRANCH_CHOICES[i % len(StudentRegistration.BRANCH_CHOICES)][0],
+                year=StudentRegistration.YEAR_CHOICES[i % len(StudentRegistration.YEAR_CHOICES)][0],
+                event=events[i % len(events)],
+            ))
+        bulk_insert_registrations(batch)
+
+    result_count = Result.objects.count()
+    target = max(10, size * RESULTS_PER_1000 // 1000)
+    Result.objects.bulk_create([
+        Result(
+            winner=f'Winner {i}', branch='CSE', position=Result.POSITION_CHOICES[i % 3][0],
+            game=events[i % len(events)].event_name, photo=f'results/benchmark-{i}.jpg',
+            # There is no file behind the photo - don't queue derivative generation
+            photo_derivatives={'source': f'results/benchmark-{i}.jpg'},
+        )
+        for i in range(result_count, target)
+    ], batch_size=SEED_BATCH_SIZE)
+    free_slots = FeaturedSlot.MAX_SLOTS - FeaturedSlot.objects.count()
+    for result in Result.objects.filter(featured=False).order_by('id')[:free_slots]:
+        result.featured = True
+        result.save()
+
+    notice_count = Announcment.objects.count()
+    target = max(20, size * NOTICES_PER_1000 // 1000)
+    content = 'Schedule update for the fest. ' * 20
+    Announcment.objects.bulk_create([
+        # bulk_create skips save(), which keeps the excerpt in step
+        Announcment(title=f'Notice {i}', content=content, excerpt=Announcment.make_excerpt(content))
+        for i in range(notice_count, target)
+    ], batch_size=SEED_BATCH_SIZE)
+
+
+def benchmark_user():
+    user, created = User.objects.get_or_create(
+        username=BENCHMARK_USER, defaults={'is_staff': True, 'is_superuser': True}
+    )
+    return user
+
+
+def _client(endpoint, user):
+    client = Client()
+    if endpoint.login:
+        client.force_login(user)
+    return client
+
+
+def count_queries(endpoint, user):
+    """
+    Queries for one request with empty caches, then for a repeat request
+    """
+    client = _client(endpoint, user)
+    cache.clear()
+    with CaptureQueriesContext(connection) as cold:
+        endpoint.request(client)
+    with CaptureQueriesContext(connection) as warm:
+        endpoint.request(client)
+    return len(cold), len(warm)
+
+
+def _worker(endpoint, user, count, result, lock):
+    client = _client(endpoint, user)
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                response = endpoint.request(client)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            duration = time.perf_counter() - started
+            with lock:
+                if failed:
+                    result.errors += 1
+                else:
+                    result.latencies.append(duration)
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+
+def run_endpoint(endpoint, user, requests=100, concurrency=8):
+    """
+    Send requests to endpoint from concurrency threads (in this thread if 1)
+    """
+    result = EndpointResult(endpoint.name, requests, concurrency)
+    result.queries_cold, result.queries_warm = count_queries(endpoint, user)
+
+    lock = threading.Lock()
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    if concurrency == 1:
+        _worker(endpoint, user, requests, result, lock)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(_worker, endpoint, user, share, result, lock) for share in shares if share]:
+                future.result()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def arun_endpoint(endpoint, user, requests=100, concurrency=8):
+    """
+    Send requests to endpoint through the ASGI handler, at most concurrency
+    at a time, from a single event loop
+    """
+    result = EndpointResult(endpoint.name, requests, concurrency)
+    result.queries_cold, result.queries_warm = await sync_to_async(count_queries)(endpoint, user)
+
+    client = AsyncClient()
+    if endpoint.login:
+        await client.aforce_login(user)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await endpoint.arequest(client)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            duration = time.perf_counter() - started
+            if failed:
+                result.errors += 1
+            else:
+                result.latencies.append(duration)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_benchmarks(sizes, requests=100, concurrency=8, endpoints=None, log=None, asgi=False):
+    """
+    Seed each size in turn and benchmark every endpoint against it
+    """
+    endpoints = [e for e in ENDPOINTS if endpoints is None or e.name in endpoints]
+    user = benchmark_user()
+    results = {}
+    for size in sorted(sizes):
+        seed(size)
+        results[str(size)] = {}
+        for endpoint in endpoints:
+            if asgi:
+                result = asyncio.run(arun_endpoint(endpoint, user, requests=requests, concurrency=concurrency))
+            else:
+                result = run_endpoint(endpoint, user, requests=requests, concurrency=concurrency)
+            results[str(size)][endpoint.name] = result.as_dict()
+            if log:
+                log(size, endpoint.name, results[str(size)][endpoint.name])
+    return results
+
+
+def compare(baseline, current):
+    """
+    Yield (size, endpoint, metric, before, after, change %) for metrics in both runs
+    """
+    for size, endpoints in current.items():
+        for name, numbers in endpoints.items():
+            before = baseline.get(size, {}).get(name)
+            if not before:
+                continue
+            pairs = [
+                ('p50_ms', before['latency_ms']['p50'], numbers['latency_ms']['p50']),
+                ('p95_ms', before['latency_ms']['p95'], numbers['latency_ms']['p95']),
+                ('throughput_rps', before['throughput_rps'], numbers['throughput_rps']),
+                ('queries_cold', before['queries_cold'], numbers['queries_cold']),
+            ]
+            for metric, old, new in pairs:
+                if old is None or new is None:
+                    continue
+                change = round((new - old) / old * 100, 1) if old else None
+                yield size, name, metric, old, new, change
@@ -0,0 +1,60 @@
+# Home/cache_versions.py
+"""
+Version counters for cached data
+
+Cached values are stored under keys that include a version number; bumping
+the version makes every worker miss and rebuild on its next request,
+without having to find and delete the old keys.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .db_routing import hold_replica
+
+VERSION_KEY = 'cache_version:{name}'
+
+# Registrations and the events they show; export snapshots are reused per version
+REGISTRATIONS = 'registrations'
+
+
+def _new_version():
+    # Time based, so a version key lost from the cache never reuses an old number
+    return int(time.time() * 1000)
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name):
+    key = VERSION_KEY.format(name=name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(name, hold=True):
+    # What gets rebuilt next must not be read from a replica that lags behind
+    if hold:
+        hold_replica()
+    key = VERSION_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Version key was evicted or never set - start a fresh one
+        cache.set(key, _new_version(), timeout=None)
+
+
+def registrations_changed():
+    # Exports read from the primary, so there is no need to hold the replica
+    # on every registration
+    transaction.on_commit(lambda: bump_version(REGISTRATIONS, hold=False))
@@ -0,0 +1,79 @@
+# Home/catalog.py
+"""
+Cached event catalog for the registration form
+
+The category -> events mapping is built with one query and cached under a
+version number. Saving or deleting an Event bumps the version (see
+Home/signals.py), so every worker rebuilds the catalog on its next request
+while normal registration traffic is served without touching the database.
+"""
+from django.core.cache import cache
+
+from .cache_versions import bump_version, get_version
+from .models import Event
+
+CATALOG_KEY = 'event_catalog:v{version}'
+CATALOG_TIMEOUT = 60 * 60
+
+# Per-process copy of the most recently used catalog version
+_local = {'version': None, 'catalog': None}
+
+
+def _build_catalog():
+    """
+    Build the catalog from a single ordered query
+    """
+    category_names = dict(Event.CATEGORY_CHOICES)
+    grouped = {code: [] for code, _ in Event.CATEGORY_CHOICES}
+    events_by_id = {}
+
+    rows = Event.objects.order_by('category', 'event_name').values_list('id', 'event_name', 'category')
+    for event_id, event_name, category in rows:
+        event = {'id': event_id, 'event_name': event_name, 'category': category}
+        events_by_id[event_id] = event
+        if category in grouped:
+            grouped[category].append(event)
+
+    return {
+        # Category display name -> events, in CATEGORY_CHOICES order, empty categories dropped
+        'events_by_category': {
+            category_names[code]: events for code, events in grouped.items() if events
+        },
+        'events_by_id': events_by_id,
+    }
+
+
+def get_catalog():
+    version = get_version('event_catalog')
+    if _local['version'] == version:
+        return _local['catalog']
+
+    key = CATALOG_KEY.format(version=version)
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = _build_catalog()
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+
+    _local['version'] = version
+    _local['catalog'] = catalog
+    return catalog
+
+
+def get_events_by_category():
+    return get_catalog()['events_by_category']
+
+
+def get_event(event_id):
+    """
+    Return the catalog entry for event_id, or None if it isn't a known event
+    """
+    try:
+        return get_catalog()['events_by_id'].get(int(event_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def invalidate_catalog():
+    bump_version('event_catalog')
+    _local['version'] = None
+    _local['catalog'] = None
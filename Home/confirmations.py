@@ -0,0 +1,205 @@
+# Home/confirmations.py
+"""
+Registration confirmation mail
+
+The register view never talks to the mail server. Saving a registration
+also inserts a ConfirmationEmail row in the same transaction (the outbox),
+and once it commits schedule_sender() queues a send_confirmation_emails
+job a couple of seconds ahead, unless one is already due by then. Every
+registration in that window is sent by the same job.
+
+The job claims a batch of due rows, opens one SMTP connection and sends
+the mails over it, rendered from the saved StudentRegistration and spaced
+out to at most CONFIRMATION_EMAIL_RATE per second so a rush of
+registrations doesn't trip the provider's limits. A mail the server
+refuses is retried later with exponential backoff; a dropped connection
+puts the rest of the batch back for the next run. After
+CONFIRMATION_EMAIL_MAX_ATTEMPTS tries a mail is marked failed.
+"""
+from datetime import timedelta
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Min
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import jobs
+from .models import ConfirmationEmail
+
+SCHEDULED_KEY = 'confirmations:scheduled_at'
+# Rows claimed by a sender are left alone this long, in case it dies mid-batch
+CLAIM_TIMEOUT = timedelta(minutes=10)
+RETRY_DELAY = 60
+MAX_RETRY_DELAY = 60 * 60
+
+
+def enabled():
+    return getattr(settings, 'REGISTRATION_CONFIRMATIONS', True)
+
+
+def batch_size():
+    return getattr(settings, 'CONFIRMATION_EMAIL_BATCH_SIZE', 50)
+
+
+def batch_delay():
+    return getattr(settings, 'CONFIRMATION_EMAIL_DELAY', 2)
+
+
+def send_rate():
+    return getattr(settings, 'CONFIRMATION_EMAIL_RATE', 5)
+
+
+def max_attempts():
+    return getattr(settings, 'CONFIRMATION_EMAIL_MAX_ATTEMPTS', 5)
+
+
+def queue_confirmations(registrations):
+    """
+    Owe each saved registration a confirmation mail; call inside the
+    transaction that saved them
+    """
+    if not enabled() or not registrations:
+        return
+    ConfirmationEmail.objects.bulk_create(
+        [ConfirmationEmail(registration_id=registration.pk) for registration in registrations]
+    )
+    transaction.on_commit(lambda: schedule_sender(batch_delay()))
+
+
+def schedule_sender(delay):
+    """
+    Make sure a sender job runs within delay seconds
+    """
+    from .tasks import send_confirmation_emails
+
+    run_at = time.time() + delay
+    scheduled = cache.get(SCHEDULED_KEY)
+    if scheduled is not None and scheduled <= run_at:
+        return
+    # Not atomic - at worst two senders run and the second finds nothing to claim
+    cache.set(SCHEDULED_KEY, run_at, delay + 60)
+    jobs.enqueue(send_confirmation_emails, delay=delay)
+
+
+def render_confirmation(registration):
+    context = {
+        'registration': registration,
+        'event_name': registration.event.event_name,
+    }
+    message = EmailMultiAlternatives(
+        subject=f"Registration confirmed: {registration.event.event_name}",
+        body=render_to_string('emails/registration_confirmation.txt', context),
+        to=[registration.email],
+    )
+    message.attach_alternative(render_to_string('emails/registration_confirmation.html', context), 'text/html')
+    return message
+
+
+def claim_batch(limit):
+    """
+    Lock up to limit due confirmations for this sender and return them
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            ConfirmationEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ConfirmationEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        ConfirmationEmail.objects.filter(pk__in=ids).update(
+            attempts=F('attempts') + 1, next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return list(
+        ConfirmationEmail.objects.filter(pk__in=ids).select_related('registration__event').order_by('id')
+    )
+
+
+def _retry_later(email, error):
+    now = timezone.now()
+    email.error = str(error)[:255]
+    if email.attempts >= max_attempts():
+        email.status = ConfirmationEmail.STATUS_FAILED
+    else:
+        delay = min(RETRY_DELAY * 2 ** (email.attempts - 1), MAX_RETRY_DELAY)
+        email.next_attempt_at = now + timedelta(seconds=delay)
+    email.save(update_fields=['status', 'error', 'next_attempt_at'])
+
+
+def _mark_sent(email):
+    email.status = ConfirmationEmail.STATUS_SENT
+    email.sent_at = timezone.now()
+    email.error = ''
+    email.save(update_fields=['status', 'sent_at', 'error'])
+
+
+def send_batch(limit=None, connection=None):
+    """
+    Send one batch of due confirmations over a single connection.
+    Returns (sent, failed).
+    """
+    emails = claim_batch(limit or batch_size())
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except OSError as e:  # SMTPException included
+        for email in emails:
+            _retry_later(email, f"Could not connect to the mail server: {e}")
+        return 0, len(emails)
+
+    sent = failed = 0
+    interval = 1 / send_rate() if send_rate() else 0
+    next_send = time.monotonic()
+    try:
+        for index, email in enumerate(emails):
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            next_send = time.monotonic() + interval
+            try:
+                connection.send_messages([render_confirmation(email.registration)])
+            except OSError as e:
+                # SMTPException is an OSError too, but only means this message was refused
+                if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                    _retry_later(email, e)
+                    failed += 1
+                    continue
+                # The connection is gone - leave the rest of the batch for the next run
+                for unsent in emails[index:]:
+                    _retry_later(unsent, e)
+                failed += len(emails) - index
+                break
+            else:
+                _mark_sent(email)
+                sent += 1
+    finally:
+        try:
+            connection.close()
+        except OSError:
+            pass
+    return sent, failed
+
+
+def run_sender():
+    """
+    Send a batch, then schedule the next run if more are waiting
+    """
+    # From here on new registrations need a run of their own
+    cache.delete(SCHEDULED_KEY)
+    sent, failed = send_batch()
+
+    next_due = ConfirmationEmail.objects.filter(
+        status=ConfirmationEmail.STATUS_PENDING
+    ).aggregate(next_due=Min('next_attempt_at'))['next_due']
+    if next_due is not None:
+        schedule_sender(max(0, (next_due - timezone.now()).total_seconds()))
+    return {'sent': sent, 'failed': failed}
@@ -0,0 +1,215 @@
+# Home/counters.py
+"""
+Incrementally maintained registration counts
+
+Every StudentRegistration belongs to one RegistrationCounter bucket
+(event, branch, year, day). Signals adjust the bucket on save/delete and
+bulk write paths call record_created(), always with F() increments inside
+the caller's transaction, so the dashboard can read totals from a table
+whose size depends on the number of events and days, not registrations.
+
+The same deltas keep Event.participants_count, the per-event total shown
+on the event management page, and reconcile_participant_counts() repairs
+any drift from writes that bypassed them. Adding to it is also how a
+registration takes its seat on an event with a capacity (Home/waitlist.py).
+
+Writers lock the event rows before the counter buckets, and a new
+registration reserves its seat before its row is inserted: the INSERT's
+foreign key check takes a shared lock on the event row, and upgrading that
+to the UPDATE's exclusive lock afterwards deadlocks concurrent registrations
+on InnoDB.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Event, RegistrationCounter, StudentRegistration
+from .waitlist import EventFull
+
+
+def counter_key(registration):
+    registered_at = registration.registered_at or timezone.now()
+    return (
+        registration.event_id,
+        registration.branch or '',
+        registration.year,
+        timezone.localdate(registered_at),
+    )
+
+
+def reserve_seats(event_deltas):
+    """
+    Add each delta to its event's participants_count. Raises EventFull when
+    an event lacks the seats for its increase, after which the caller's
+    transaction must roll back.
+    """
+    # Same order every time, so concurrent writers lock the event rows without deadlocking
+    for event_id, delta in sorted(event_deltas.items()):
+        if not delta:
+            continue
+        event = Event.objects.filter(pk=event_id)
+        if delta > 0:
+            # Seat reservation: the capacity check and the increment are one
+            # conditional UPDATE, so concurrent registrations can't overbook
+            event = event.filter(Q(capacity__isnull=True) | Q(capacity__gte=F('participants_count') + delta))
+        if not event.update(participants_count=F('participants_count') + delta) and delta > 0:
+            raise EventFull(event_id)
+
+
+def apply_deltas(deltas, reserved=None):
+    """
+    Add each delta to its (event_id, branch, year, day) bucket and its
+    event's seat count, less the {event_id: delta} seats already reserved
+    with reserve_seats(). Raises EventFull like reserve_seats().
+    """
+    event_deltas = Counter()
+    for (event_id, branch, year, day), delta in deltas.items():
+        event_deltas[event_id] += delta
+    event_deltas.subtract(reserved or {})
+    reserve_seats(event_deltas)
+
+    for (event_id, branch, year, day), delta in sorted(deltas.items(), key=lambda item: str(item[0])):
+        if not delta:
+            continue
+        bucket = RegistrationCounter.objects.filter(event_id=event_id, branch=branch, year=year, day=day)
+        if bucket.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                RegistrationCounter.objects.create(
+                    event_id=event_id, branch=branch, year=year, day=day, count=delta
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            bucket.update(count=F('count') + delta)
+
+
+def record_created(registrations, reserved=None):
+    """
+    Count registrations inserted without signals (bulk_create), whose
+    seats were reserved beforehand when reserved is given
+    """
+    deltas = Counter(counter_key(registration) for registration in registrations)
+    apply_deltas(deltas, reserved)
+    for registration in registrations:
+        registration._counter_key = counter_key(registration)
+
+
+def registration_saving(instance):
+    """
+    Reserve the seat a registration takes before its row is written
+    """
+    if instance._state.adding:
+        reserved = {instance.event_id: 1}
+    else:
+        old_key = getattr(instance, '_counter_key', None)
+        if old_key is None or old_key[0] == instance.event_id:
+            return
+        reserved = {old_key[0]: -1, instance.event_id: 1}
+    try:
+        reserve_seats(reserved)
+    except EventFull:
+        # The seat is taken before the INSERT would hit the unique constraint,
+        # so report a student who already holds one as the duplicate it is
+        duplicate = StudentRegistration.objects.filter(event_id=instance.event_id, regd_no=instance.regd_no)
+        if duplicate.exclude(pk=instance.pk).exists():
+            raise IntegrityError(f"{instance.regd_no} is already registered for event {instance.event_id}")
+        raise
+    instance._reserved_seats = reserved
+
+
+def registration_saved(instance, created):
+    new_key = counter_key(instance)
+    old_key = None if created else getattr(instance, '_counter_key', None)
+    reserved = instance.__dict__.pop('_reserved_seats', None)
+    if created:
+        apply_deltas({new_key: 1}, reserved)
+    elif old_key is not None and old_key != new_key:
+        apply_deltas({old_key: -1, new_key: 1}, reserved)
+    instance._counter_key = new_key
+
+
+def registration_deleted(instance):
+    apply_deltas({getattr(instance, '_counter_key', None) or counter_key(instance): -1})
+
+
+def rebuild_counters():
+    """
+    Recompute every bucket from StudentRegistration with one grouped query
+    """
+    rows = (
+        StudentRegistration.objects
+        .annotate(day=TruncDate('registered_at'))
+        .values('event_id', 'branch', 'year', 'day')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        RegistrationCounter.objects.all().delete()
+        RegistrationCounter.objects.bulk_create([
+            RegistrationCounter(
+                event_id=row['event_id'], branch=row['branch'] or '', year=row['year'],
+                day=row['day'], count=row['total'],
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+def reconcile_participant_counts(dry_run=False):
+    """
+    Compare every Event.participants_count with one grouped count of
+    StudentRegistration and correct the ones that drifted. Returns
+    {event_id: (stored, actual)} for each event that was off.
+    """
+    with transaction.atomic():
+        # Every registration write updates its event row, so with the rows
+        # locked none can commit between reading the counters and counting
+        stored = dict(Event.objects.select_for_update().order_by('id').values_list('id', 'participants_count'))
+        actual = dict(
+            StudentRegistration.objects.values_list('event_id').annotate(total=Count('id')).order_by()
+        )
+        drift = {
+            event_id: (count, actual.get(event_id, 0))
+            for event_id, count in stored.items()
+            if count != actual.get(event_id, 0)
+        }
+        if not dry_run:
+            for event_id, (count, total) in drift.items():
+                Event.objects.filter(pk=event_id).update(participants_count=total)
+    return drift
+
+
+def dashboard_stats():
+    """
+    Header totals for the admin dashboard, read from the counter table
+    """
+    counters = RegistrationCounter.objects.filter(count__gt=0)
+    totals = counters.aggregate(
+        total=Sum('count'),
+        branches=Count('branch', distinct=True),
+        events=Count('event', distinct=True),
+    )
+    today = counters.filter(day=timezone.localdate()).aggregate(total=Sum('count'))['total']
+    return {
+        'total': totals['total'] or 0,
+        'branches': totals['branches'],
+        'events': totals['events'],
+        'today': today or 0,
+    }
+
+
+def breakdown(field):
+    """
+    Registration totals grouped by one of event, branch, year or day
+    """
+    group = 'event__event_name' if field == 'event' else field
+    rows = (
+        RegistrationCounter.objects.filter(count__gt=0)
+        .values(group)
+        .annotate(total=Sum('count'))
+        .order_by(group)
+    )
+    return {str(row[group]): row['total'] for row in rows}
@@ -0,0 +1,166 @@
+# Home/db_routing.py
+"""
+Read-replica routing
+
+When settings.DATABASE_REPLICA names a database alias, ReplicaRouter sends
+the reads of views decorated with @read_replica (the anonymous public
+pages and the registration form) to it, for GET and HEAD requests only.
+Everything else - writes, admin views, form submissions - stays on the
+primary ("default").
+
+Replication lags, so reads go back to the primary for a while after a
+write:
+
+* ReplicaPinningMiddleware notices a write during a request and sets a
+  short-lived cookie; that client's next requests read from the primary
+  for DATABASE_REPLICA_LAG seconds, so an admin sees their own change.
+* hold_replica() does the same for everyone when cached data is
+  invalidated (Home/cache_versions.py), so a page or catalog rebuilt right
+  after an invalidation isn't refilled from a replica that hasn't caught up.
+
+Routing state is kept in a context variable, which sync_to_async copies
+into the thread running the ORM, so it works for sync and async views.
+"""
+from contextvars import ContextVar
+from functools import wraps
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+PIN_COOKIE = 'db_primary_until'
+HOLD_KEY = 'db_routing:hold_replica'
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_alias():
+    return getattr(settings, 'DATABASE_REPLICA', None)
+
+
+def replica_lag():
+    return getattr(settings, 'DATABASE_REPLICA_LAG', 5)
+
+
+def hold_replica():
+    """
+    Send replica reads to the primary for the next DATABASE_REPLICA_LAG seconds
+    """
+    if replica_alias():
+        cache.set(HOLD_KEY, 1, replica_lag())
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.use_replica = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.use_replica and not state.pinned and not state.wrote:
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both, so objects read from either can be related
+        aliases = {'default', replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        if replica_alias() and db == replica_alias():
+            return False
+        return None
+
+
+def _pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_replica(view):
+    """
+    Let the view's reads use the replica for GET and HEAD requests
+    """
+    def enabled(request):
+        state = _state.get()
+        return state is not None and replica_alias() and request.method in ('GET', 'HEAD')
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not enabled(request) or await cache.aget(HOLD_KEY):
+                return await view(request, *args, **kwargs)
+            state = _state.get()
+            state.use_replica = True
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                state.use_replica = False
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not enabled(request) or cache.get(HOLD_KEY):
+            return view(request, *args, **kwargs)
+        state = _state.get()
+        state.use_replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.use_replica = False
+    return wrapper
+
+
+class ReplicaPinningMiddleware:
+    """
+    Tracks writes per request and pins the client to the primary after one
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = RoutingState(pinned=_pinned(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = RoutingState(pinned=_pinned(request))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    def finish(self, state, response):
+        if state.wrote and replica_alias():
+            lag = replica_lag()
+            response.set_cookie(PIN_COOKIE, str(time.time() + lag), max_age=lag, httponly=True, samesite='Lax')
+        return response
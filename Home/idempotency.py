@@ -0,0 +1,102 @@
+# Home/idempotency.py
+"""
+Idempotent form submissions
+
+Every rendering of a form carries a fresh random submission token. The
+first POST with a token claims it in the cache; once the view succeeds its
+response is cached under the token for a few minutes. A replayed POST
+(double click, browser retry, resubmitted page) gets the stored response
+back instead of running the view again, and a replay that arrives while
+the first request is still running waits briefly for its result.
+
+The unique (regd_no, event) constraint stays the last line of defence for
+replays that miss the cache.
+"""
+from functools import wraps
+import re
+import time
+import uuid
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+TOKEN_FIELD = 'submission_token'
+TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+RESPONSE_KEY = 'submission:{token}:response'
+CLAIM_KEY = 'submission:{token}:claim'
+RESPONSE_TIMEOUT = 10 * 60
+# Longer than any request should take, so a crashed worker can't pin a token
+CLAIM_TIMEOUT = 60
+
+IN_FLIGHT_WAIT = 5
+IN_FLIGHT_POLL = 0.1
+
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+def mark_succeeded(response):
+    """
+    Flag a response as the outcome to replay for its submission token
+    """
+    response.submission_succeeded = True
+    return response
+
+
+def _cached_response(token):
+    cached = cache.get(RESPONSE_KEY.format(token=token))
+    if cached is None:
+        return None
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Idempotent-Replay'] = '1'
+    return response
+
+
+def _wait_for_response(token):
+    deadline = time.monotonic() + IN_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(IN_FLIGHT_POLL)
+        response = _cached_response(token)
+        if response is not None or cache.get(CLAIM_KEY.format(token=token)) is None:
+            return response
+    return None
+
+
+def idempotent_submission(view):
+    """
+    Replay the stored successful response for POSTs that repeat a submission token
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = request.POST.get(TOKEN_FIELD, '') if request.method == 'POST' else ''
+        if not TOKEN_RE.match(token):
+            return view(request, *args, **kwargs)
+
+        response = _cached_response(token)
+        if response is not None:
+            return response
+
+        claim_key = CLAIM_KEY.format(token=token)
+        claimed = cache.add(claim_key, 1, CLAIM_TIMEOUT)
+        if not claimed:
+            # The same submission is being processed right now
+            response = _wait_for_response(token)
+            if response is not None:
+                return response
+
+        try:
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and getattr(response, 'submission_succeeded', False):
+                cache.set(
+                    RESPONSE_KEY.format(token=token),
+                    (response.content, response['Content-Type']),
+                    RESPONSE_TIMEOUT,
+                )
+        finally:
+            if claimed:
+                cache.delete(claim_key)
+        return response
+    return wrapper
@@ -0,0 +1,147 @@
+# Home/ingestion.py
+"""
+Buffered registration ingestion
+
+In buffered mode the register view only validates a submission and appends
+it to the PendingRegistration queue table. A separate writer
+(``manage.py process_registrations``) drains the queue in batches with
+bulk_create, so hundreds of concurrent submissions turn into a handful of
+multi-row inserts instead of competing single-row transactions on the
+registration table. A submission for an event that is full by the time
+its batch is written goes on the waitlist (Home/waitlist.py).
+"""
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cache_versions import registrations_changed
+from .confirmations import queue_confirmations
+from .counters import record_created, reserve_seats
+from .models import PendingRegistration, StudentRegistration
+from .search import index_registrations
+from .waitlist import DETAIL_FIELDS, EventFull, join_waitlist
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+REGISTRATION_FIELDS = ('name', 'email', 'phone', 'regd_no', 'branch', 'year', 'event_id')
+
+
+def buffered_ingestion_enabled():
+    return getattr(settings, 'REGISTRATION_INGESTION', 'direct') == 'buffered'
+
+
+def enqueue_registration(data):
+    """
+    Append a validated submission to the queue and return the pending row
+    """
+    return PendingRegistration.objects.create(**{field: data[field] for field in REGISTRATION_FIELDS})
+
+
+def _build_registration(pending):
+    return StudentRegistration(**{field: getattr(pending, field) for field in REGISTRATION_FIELDS})
+
+
+def _resolve_ids(registrations):
+    """
+    Fill in primary keys after bulk_create on backends that don't return them (MySQL)
+    """
+    missing = [r for r in registrations if r.pk is None]
+    if not missing:
+        return
+
+    ids = {}
+    rows = StudentRegistration.objects.filter(
+        regd_no__in={r.regd_no for r in missing},
+        event_id__in={r.event_id for r in missing},
+    ).order_by('id').values_list('id', 'regd_no', 'event_id')
+    for pk, regd_no, event_id in rows:
+        ids[(regd_no, event_id)] = pk
+
+    for registration in missing:
+        registration.pk = ids.get((registration.regd_no, registration.event_id))
+
+
+def bulk_insert_registrations(registrations):
+    """
+    bulk_create registrations and do the bookkeeping their post_save signals
+    would have done (dashboard counters, search documents, export version)
+    """
+    # Seats first - see Home/counters.py for the lock order
+    reserved = Counter(registration.event_id for registration in registrations)
+    reserve_seats(reserved)
+    StudentRegistration.objects.bulk_create(registrations)
+    record_created(registrations, reserved)
+    _resolve_ids(registrations)
+    # Needs the primary keys, which MySQL only has after _resolve_ids
+    index_registrations(registrations)
+    registrations_changed()
+
+
+def _insert_individually(pending_rows, registrations):
+    """
+    Fallback when a batch insert fails: insert row by row so one bad
+    submission only fails itself, and one that finds its event full waits
+    for a seat
+    """
+    for pending, registration in zip(pending_rows, registrations):
+        try:
+            with transaction.atomic():
+                registration.save()
+        except EventFull:
+            join_waitlist(pending.event_id, **{field: getattr(pending, field) for field in DETAIL_FIELDS})
+            pending.status = PendingRegistration.STATUS_WAITLISTED
+        except IntegrityError as e:
+            pending.status = PendingRegistration.STATUS_FAILED
+            pending.error = str(e)[:255]
+
+
+def flush_pending_registrations(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move up to batch_size queued submissions into StudentRegistration.
+    Returns the number of queue rows processed.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    writers can drain the queue at once without processing a row twice.
+    """
+    with transaction.atomic():
+        pending_rows = list(
+            PendingRegistration.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=PendingRegistration.STATUS_QUEUED)
+            .order_by('id')[:batch_size]
+        )
+        if not pending_rows:
+            return 0
+
+        registrations = [_build_registration(pending) for pending in pending_rows]
+        try:
+            with transaction.atomic():
+                bulk_insert_registrations(registrations)
+        except IntegrityError:
+            logger.warning("Batch insert of %d registrations failed, retrying individually", len(registrations))
+            for registration in registrations:
+                registration.pk = None
+                registration._state.adding = True
+            _insert_individually(pending_rows, registrations)
+
+        now = timezone.now()
+        for pending, registration in zip(pending_rows, registrations):
+            pending.processed_at = now
+            if pending.status == PendingRegistration.STATUS_QUEUED:
+                pending.status = PendingRegistration.STATUS_REGISTERED
+                pending.registration_id = registration.pk
+
+        PendingRegistration.objects.bulk_update(
+            pending_rows, ['status', 'registration', 'error', 'processed_at']
+        )
+        queue_confirmations([
+            registration for pending, registration in zip(pending_rows, registrations)
+            if pending.status == PendingRegistration.STATUS_REGISTERED
+        ])
+
+    return len(pending_rows)
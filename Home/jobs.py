@@ -0,0 +1,270 @@
+# Home/jobs.py
+"""
+Background jobs
+
+A small job queue kept in the database (the Job table), so heavy work can
+leave the request path without a message broker.
+
+Tasks are plain functions registered with @task in an app's tasks.py:
+
+    @task(priority=5, max_attempts=3, timeout=300)
+    def result_photo_derivatives(result_id):
+        ...
+
+and a view queues one with enqueue(result_photo_derivatives, result_id=7).
+Keyword arguments are stored as JSON, so pass ids rather than objects. The
+row is written in the caller's transaction: a job queued by a request that
+rolls back never runs.
+
+`manage.py run_jobs` runs a Worker. It claims due jobs, highest priority
+first, with SELECT ... FOR UPDATE SKIP LOCKED and hands them to a thread
+(or process) pool. A claimed job is locked until now + its task's timeout,
+the visibility timeout: if the worker dies, another takes the job over once
+that passes. A failing job is retried with exponential backoff until it has
+had max_attempts, then kept as failed with its traceback. To get through
+more work, raise --concurrency or start the command on more machines;
+several claiming processes need PostgreSQL or MySQL 8 for SKIP LOCKED.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+import logging
+import os
+import socket
+import time
+import traceback
+
+import django
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_TIMEOUT = 5 * 60
+MAX_RETRY_DELAY = 60 * 60
+FINISHED_JOB_AGE = timedelta(days=7)
+
+_tasks = {}
+_discovered = False
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS, timeout=DEFAULT_TIMEOUT):
+    """
+    Register a function as a task that enqueue() can queue
+    """
+    def register(func):
+        func.job_name = name or f'{func.__module__}.{func.__name__}'
+        func.job_options = {'priority': priority, 'max_attempts': max_attempts, 'timeout': timeout}
+        _tasks[func.job_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    global _discovered
+    if name not in _tasks and not _discovered:
+        # Workers import nothing from views - load every app's tasks.py once
+        autodiscover_modules('tasks')
+        _discovered = True
+    return _tasks.get(name)
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'JOB_RETRY_DELAY', 30)
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def enqueue(func, *, priority=None, delay=None, **kwargs):
+    """
+    Queue a call of the task func(**kwargs) and return its Job
+    """
+    if getattr(func, 'job_name', None) is None:
+        raise ValueError(f"{func!r} is not registered with @task")
+    options = func.job_options
+    return Job.objects.create(
+        task=func.job_name,
+        kwargs=kwargs,
+        priority=options['priority'] if priority is None else priority,
+        max_attempts=options['max_attempts'],
+        timeout=options['timeout'],
+        run_after=timezone.now() + timedelta(seconds=delay or 0),
+    )
+
+
+def release_expired(now=None):
+    """
+    Give up the locks of running jobs whose visibility timeout has passed.
+    Returns the number of jobs queued again.
+    """
+    now = now or timezone.now()
+    expired = Job.objects.filter(status=Job.STATUS_RUNNING, locked_until__lte=now)
+    expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED, locked_until=None, finished_at=now,
+        error="The worker running the job stopped responding",
+    )
+    return expired.update(status=Job.STATUS_QUEUED, locked_until=None, worker='')
+
+
+def claim_jobs(worker, limit):
+    """
+    Lock up to limit due jobs for worker and return them
+    """
+    now = timezone.now()
+    release_expired(now)
+    with transaction.atomic():
+        jobs = list(
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED, run_after__lte=now)
+            .order_by('-priority', 'run_after', 'id')[:limit]
+        )
+        for job in jobs:
+            job.status = Job.STATUS_RUNNING
+            job.attempts += 1
+            job.worker = worker
+            job.locked_until = now + timedelta(seconds=job.timeout)
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'worker', 'locked_until'])
+    return jobs
+
+
+def _finish(job, **fields):
+    # Only while this claim still holds - a job taken over after its timeout belongs to the new worker
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.STATUS_RUNNING, worker=job.worker, attempts=job.attempts
+    ).update(locked_until=None, **fields)
+    if not updated:
+        logger.warning("Job %s finished after its lock expired; keeping the newer attempt", job.pk)
+
+
+def run_job(job):
+    """
+    Run a claimed job and record how it went
+    """
+    func = get_task(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {job.task}")
+        result = func(**job.kwargs)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %d", job.pk, job.task, job.attempts)
+        now = timezone.now()
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            _finish(job, status=Job.STATUS_QUEUED, worker='', error=error,
+                    run_after=now + timedelta(seconds=retry_delay(job.attempts)))
+        else:
+            _finish(job, status=Job.STATUS_FAILED, error=error, finished_at=now)
+        return False
+
+    try:
+        DjangoJSONEncoder().encode(result)
+    except TypeError:
+        # The work is done - a return value the JSON field can't store is just dropped
+        result = None
+    _finish(job, status=Job.STATUS_DONE, result=result, error='', finished_at=timezone.now())
+    return True
+
+
+def execute(job_id, worker, attempts):
+    """
+    Pool entry point: load the claimed job and run it
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.filter(pk=job_id, worker=worker, attempts=attempts).first()
+        return run_job(job) if job is not None else False
+    finally:
+        close_old_connections()
+
+
+def run_pending(worker='inline', limit=None):
+    """
+    Run due jobs in this thread until none are left (or limit have run).
+    Returns the number of jobs run.
+    """
+    count = 0
+    while limit is None or count < limit:
+        jobs = claim_jobs(worker, 1)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        count += 1
+    return count
+
+
+def purge_finished(max_age=FINISHED_JOB_AGE):
+    """
+    Delete done and failed jobs that finished more than max_age ago
+    """
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED], finished_at__lt=timezone.now() - max_age
+    ).delete()
+    return deleted
+
+
+class Worker:
+    """
+    Claims jobs and runs up to concurrency of them at once in a pool
+    """
+    PURGE_INTERVAL = 60 * 60
+
+    def __init__(self, concurrency=2, processes=False, poll_interval=1.0, keep=FINISHED_JOB_AGE, name=None):
+        self.concurrency = concurrency
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def make_pool(self):
+        if self.processes:
+            # Children must not share the parent's database sockets
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=self.concurrency, initializer=django.setup)
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='jobs')
+
+    def run(self, burst=False):
+        """
+        Work until stop() is called, or until the queue is empty if burst
+        """
+        pool = self.make_pool()
+        running = set()
+        next_purge = 0
+        try:
+            while not self.stopping:
+                if time.monotonic() >= next_purge:
+                    purge_finished(self.keep)
+                    next_purge = time.monotonic() + self.PURGE_INTERVAL
+
+                free = self.concurrency - len(running)
+                jobs = claim_jobs(self.name, free) if free else []
+                for job in jobs:
+                    running.add(pool.submit(execute, job.pk, self.name, job.attempts))
+
+                if not running:
+                    if burst:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                # Wake up when a slot frees, or after a poll interval to look for new jobs
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.processed += 1
+                    if future.exception() is not None:
+                        logger.error("Job worker crashed", exc_info=future.exception())
+        finally:
+            # Let running jobs finish - their locks would otherwise hold them until the timeout
+            pool.shutdown(wait=True)
+            for future in running:
+                self.processed += 1
+        return self.processed
@@ -0,0 +1,203 @@
+# Home/live.py
+"""
+Live updates over Server-Sent Events
+
+When a result or announcement changes, Admin/signals.py publishes a
+compact event on commit: it is stored in the shared cache under the next
+number of a sequence counter. No database read is needed to publish, and
+none to deliver.
+
+Each event loop (one per process under ASGI) runs a single Broadcaster.
+While at least one client is connected it polls the sequence counter in
+the cache every LIVE_POLL_INTERVAL seconds and, when it moves, fetches the
+new events once and puts them on every subscriber's queue. Thousands of
+open /live/ connections therefore cost one cache read per interval per
+process, and a change reaches them all without anyone reloading a page.
+
+Events carry their sequence number as the SSE id, so a reconnecting
+browser sends Last-Event-ID and gets what it missed replayed from the
+cache. A client too slow to keep up with its queue is disconnected and
+catches up the same way.
+"""
+import asyncio
+import json
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+SEQUENCE_KEY = 'live:sequence'
+EVENT_KEY = 'live:event:{id}'
+EVENT_TIMEOUT = 10 * 60
+MAX_REPLAY = 100
+CLIENT_QUEUE_SIZE = 100
+RETRY_MS = 3000
+
+
+def poll_interval():
+    return getattr(settings, 'LIVE_POLL_INTERVAL', 1.0)
+
+
+def keepalive_interval():
+    return getattr(settings, 'LIVE_KEEPALIVE', 15)
+
+
+def stream_max_age():
+    # Connections are recycled now and then so proxies and workers don't hold them forever
+    return getattr(settings, 'LIVE_STREAM_MAX_AGE', 10 * 60)
+
+
+def publish(kind, data):
+    """
+    Store an event for every connected client; returns its id
+    """
+    cache.add(SEQUENCE_KEY, 0, timeout=None)
+    event_id = cache.incr(SEQUENCE_KEY)
+    cache.set(EVENT_KEY.format(id=event_id), {'id': event_id, 'event': kind, 'data': data}, EVENT_TIMEOUT)
+    return event_id
+
+
+def result_event(result, deleted=False):
+    if deleted:
+        return {'id': result.pk, 'deleted': True}
+    return {
+        'id': result.pk,
+        'winner': result.winner,
+        'branch': result.branch,
+        'position': result.position,
+        'game': result.game,
+        'featured': result.featured,
+    }
+
+
+def notice_event(notice, deleted=False):
+    if deleted:
+        return {'id': notice.pk, 'deleted': True}
+    return {
+        'id': notice.pk,
+        'title': notice.title,
+        'excerpt': notice.excerpt,
+        'truncated': notice.excerpt_truncated,
+        'attachment': notice.attatchment.url if notice.attatchment else None,
+        'created_at': notice.created_at.isoformat(),
+        'updated_at': notice.updated_at.isoformat(),
+    }
+
+
+async def aget_events(after, until):
+    """
+    Events after..until (inclusive) still in the cache, oldest first
+    """
+    first = max(after + 1, until - MAX_REPLAY + 1)
+    if first > until:
+        return []
+    keys = [EVENT_KEY.format(id=event_id) for event_id in range(first, until + 1)]
+    found = await cache.aget_many(keys)
+    return [found[key] for key in keys if key in found]
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class Broadcaster:
+    """
+    Fans events out from the cache to the subscribers of one event loop
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.last_id = None
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        queue.dropped = False
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def fan_out(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Can't keep up - it reconnects and replays from the cache
+                queue.dropped = True
+                self.subscribers.discard(queue)
+
+    async def _run(self):
+        if self.last_id is None:
+            self.last_id = await cache.aget(SEQUENCE_KEY) or 0
+        while self.subscribers:
+            await asyncio.sleep(poll_interval())
+            latest = await cache.aget(SEQUENCE_KEY) or 0
+            if latest < self.last_id:
+                # The counter was lost from the cache and started again
+                self.last_id = 0
+            if latest > self.last_id:
+                events = await aget_events(self.last_id, latest)
+                self.last_id = latest
+                for event in events:
+                    self.fan_out(event)
+        # Idle: the next subscriber starts from the current sequence again
+        self.last_id = None
+
+
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster():
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = Broadcaster()
+    return broadcaster
+
+
+def _last_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def event_stream(last_event_id=None):
+    """
+    SSE body: events missed since last_event_id, then live events until the
+    connection is recycled
+    """
+    broadcaster = get_broadcaster()
+    # Subscribe before replaying so nothing falls between the two
+    queue = broadcaster.subscribe()
+    sent = _last_event_id(last_event_id)
+    deadline = time.monotonic() + stream_max_age()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if sent is not None:
+            latest = await cache.aget(SEQUENCE_KEY) or 0
+            for event in await aget_events(sent, latest):
+                sent = event['id']
+                yield format_event(event)
+
+        while time.monotonic() < deadline:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive_interval())
+            except asyncio.TimeoutError:
+                if queue.dropped:
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if sent is not None and event['id'] <= sent:
+                continue
+            sent = event['id']
+            yield format_event(event)
+            if queue.dropped and queue.empty():
+                return
+    finally:
+        broadcaster.unsubscribe(queue)
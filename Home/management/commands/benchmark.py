@@ -0,0 +1,111 @@
+# Home/management/commands/benchmark.py
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from Home.benchmark import ENDPOINTS, compare, run_benchmarks
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the public and admin endpoints against a throwaway database "
+        "seeded at several sizes and write the results to a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000',
+                            help="Comma separated registration counts to seed (default: 1000,10000,50000)")
+        parser.add_argument('--requests', type=int, default=100, help="Requests per endpoint and size")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client threads")
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            choices=[endpoint.name for endpoint in ENDPOINTS],
+                            help="Only benchmark this endpoint (repeatable)")
+        parser.add_argument('--output', default='benchmark.json', help="Where to write the results")
+        parser.add_argument('--compare', help="Earlier results file to compare against")
+        parser.add_argument('--asgi', action='store_true',
+                            help="Send requests through the ASGI handler on one event loop instead of WSGI threads")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of numbers")
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+
+        results = self.run(sizes, options)
+        report = {
+            'commit': git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'server': 'asgi' if options['asgi'] else 'wsgi',
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline is not None:
+            self.stdout.write("\nsize      endpoint                  metric          before      after   change")
+            for size, name, metric, before, after, change in compare(baseline, results):
+                change = '' if change is None else f"{change:+.1f}%"
+                self.stdout.write(f"{size:<9} {name:<25} {metric:<15} {before:>8} {after:>10} {change:>8}")
+
+    def run(self, sizes, options):
+        """
+        Run against a test database - a temporary file for SQLite so the
+        client threads share it - and destroy it afterwards
+        """
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        temp_dir = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            temp_dir = tempfile.mkdtemp(prefix='benchmark-')
+            test_settings['NAME'] = os.path.join(temp_dir, 'benchmark.sqlite3')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            def log(size, endpoint, numbers):
+                latency = numbers['latency_ms']
+                self.stdout.write(
+                    f"{size:>7} {endpoint:<25} p50 {latency['p50']}ms  p95 {latency['p95']}ms  "
+                    f"{numbers['throughput_rps']} req/s  {numbers['queries_cold']} queries  "
+                    f"{numbers['errors']} errors"
+                )
+
+            return run_benchmarks(
+                sizes, requests=options['requests'], concurrency=options['concurrency'],
+                endpoints=options['endpoints'], log=log, asgi=options['asgi'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if temp_dir:
+                test_settings.pop('NAME', None)
+                os.rmdir(temp_dir)
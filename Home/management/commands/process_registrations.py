@@ -0,0 +1,38 @@
+# Home/management/commands/process_registrations.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from Home.ingestion import DEFAULT_BATCH_SIZE, flush_pending_registrations
+
+
+class Command(BaseCommand):
+    help = "Move queued registration submissions into StudentRegistration in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Maximum submissions inserted per batch")
+        parser.add_argument('--interval', type=float, default=0.5,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the queue once and exit instead of running continuously")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            processed = flush_pending_registrations(batch_size)
+            total += processed
+
+            if processed:
+                self.stdout.write(f"Processed {processed} queued registrations")
+                # A full batch means more are probably waiting - go again immediately
+                if processed == batch_size:
+                    continue
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done - {total} registrations processed"))
@@ -0,0 +1,12 @@
+# Home/management/commands/rebuild_registration_counters.py
+from django.core.management.base import BaseCommand
+
+from Home.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard registration counters from StudentRegistration"
+
+    def handle(self, *args, **options):
+        rebuild_counters()
+        self.stdout.write(self.style.SUCCESS("Registration counters rebuilt"))
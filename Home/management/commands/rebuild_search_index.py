@@ -0,0 +1,14 @@
+# Home/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Home.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the participant search documents from StudentRegistration"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Participant search index rebuilt"))
@@ -0,0 +1,22 @@
+# Home/management/commands/reconcile_participant_counts.py
+from django.core.management.base import BaseCommand
+
+from Home.counters import reconcile_participant_counts
+from Home.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recount Event.participants_count from StudentRegistration and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report events whose count is off")
+
+    def handle(self, *args, **options):
+        drift = reconcile_participant_counts(dry_run=options['dry_run'])
+        names = dict(Event.objects.filter(pk__in=drift).values_list('id', 'event_name'))
+        for event_id, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{names.get(event_id, event_id)}: stored {stored}, actual {actual}")
+
+        verb = "Found" if options['dry_run'] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(drift)} event(s) with a wrong participant count"))
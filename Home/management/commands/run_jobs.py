@@ -0,0 +1,39 @@
+# Home/management/commands/run_jobs.py
+from datetime import timedelta
+import signal
+
+from django.core.management.base import BaseCommand
+
+from Home.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (photo resizing, attachments, ...) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help="Jobs run at the same time")
+        parser.add_argument('--processes', action='store_true',
+                            help="Run jobs in a process pool instead of threads (for CPU-heavy work)")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument('--keep-days', type=float, default=7,
+                            help="Delete finished jobs after this many days")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once the queue is empty instead of running continuously")
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=max(1, options['concurrency']),
+            processes=options['processes'],
+            poll_interval=options['interval'],
+            keep=timedelta(days=options['keep_days']),
+        )
+        # Finish the running jobs and exit on Ctrl+C or a service stop
+        signal.signal(signal.SIGINT, worker.stop)
+        signal.signal(signal.SIGTERM, worker.stop)
+
+        pool = 'processes' if worker.processes else 'threads'
+        self.stdout.write(f"Worker {worker.name} running {worker.concurrency} jobs at a time in {pool}")
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f"Done - {processed} jobs run"))
@@ -0,0 +1,130 @@
+# Home/media.py
+"""
+File responses for uploaded media
+
+Depending on settings.MEDIA_SERVING the file is either handed to the front
+web server (nginx X-Accel-Redirect, Apache/lighttpd X-Sendfile) once Django
+has authorized the request, or streamed by Django itself with support for
+conditional requests (ETag / Last-Modified) and single byte ranges.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single "bytes=" range, None to send the whole
+    file, or False if the range can't be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Malformed or multi-range requests get the full file
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_file(path, start, length, chunk_size=STREAM_CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def file_response(request, full_path, public_path, content_type=None, cache_control='public, max-age=3600',
+                  download_name=None):
+    """
+    Build the response for a file on disk. public_path is the path relative
+    to MEDIA_ROOT, used for the X-Accel-Redirect location.
+    """
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    if content_type is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response['Cache-Control'] = cache_control
+        return response
+
+    mode = getattr(settings, 'MEDIA_SERVING', 'python')
+    if mode == 'x-accel-redirect':
+        # nginx serves the file (including ranges) from an internal location
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + public_path.lstrip('/'))
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        size = stat.st_size
+        byte_range = None
+        if request.headers.get('Range') and _if_range_matches(request, etag, last_modified):
+            byte_range = _parse_range(request.headers['Range'], size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        length = max(0, end - start + 1)
+        response = StreamingHttpResponse(_iter_file(full_path, start, length), content_type=content_type)
+        response['Content-Length'] = str(length)
+        if byte_range:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    if download_name:
+        response['Content-Disposition'] = content_disposition_header(True, download_name)
+    return response
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:39
+
+import Home.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0003_alter_studentregistration_branch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingRegistration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reference",
+                    models.CharField(
+                        default=Home.models.generate_reference,
+                        editable=False,
+                        max_length=32,
+                        unique=True,
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("email", models.EmailField(max_length=254)),
+                ("phone", models.CharField(max_length=15)),
+                ("regd_no", models.CharField(max_length=20)),
+                (
+                    "branch",
+                    models.CharField(
+                        choices=[
+                            ("CSE", "CSE"),
+                            ("EE", "EE"),
+                            ("ME", "ME"),
+                            ("CIVIL", "Civil"),
+                            ("MBA", "MBA"),
+                            ("MCA", "MCA"),
+                            ("BBA", "BBA"),
+                            ("BCA", "BCA"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "year",
+                    models.CharField(
+                        choices=[
+                            ("1st Year", "1st Year"),
+                            ("2nd Year", "2nd Year"),
+                            ("3rd Year", "3rd Year"),
+                            ("4th Year", "4th Year"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUEUED", "Queued"),
+                            ("REGISTERED", "Registered"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="QUEUED",
+                        max_length=10,
+                    ),
+                ),
+                ("error", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="Home.event"
+                    ),
+                ),
+                (
+                    "registration",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="Home.studentregistration",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="pendingreg_status_id_idx"
+                    )
+                ],
+            },
+        ),
+    ]
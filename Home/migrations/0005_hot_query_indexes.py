@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+def check_duplicate_registrations(apps, schema_editor):
+    """
+    Refuse to add the unique constraint while a student is registered twice
+    for the same event; the conflicting rows are listed so they can be
+    resolved by hand before migrating again
+    """
+    StudentRegistration = apps.get_model("Home", "StudentRegistration")
+    duplicates = list(
+        StudentRegistration.objects.values("regd_no", "event_id")
+        .annotate(ids=models.Count("id"))
+        .filter(ids__gt=1)
+        .order_by("event_id", "regd_no")
+    )
+    if not duplicates:
+        return
+    lines = []
+    for row in duplicates:
+        ids = StudentRegistration.objects.filter(
+            regd_no=row["regd_no"], event_id=row["event_id"]
+        ).order_by("id").values_list("id", flat=True)
+        lines.append(
+            f"  regd_no={row['regd_no']!r} event_id={row['event_id']}: "
+            f"registration ids {', '.join(map(str, ids))}"
+        )
+    raise RuntimeError(
+        "Cannot add unique_regd_no_per_event: these students are registered "
+        "more than once for the same event. Delete or move the extra "
+        "registrations, then run migrate again.\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0004_pendingregistration"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_registrations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="studentregistration",
+            index=models.Index(
+                fields=["registered_at", "id"], name="studentreg_registered_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentregistration",
+            index=models.Index(
+                fields=["branch", "registered_at", "id"],
+                name="studentreg_branch_reg_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentregistration",
+            index=models.Index(
+                fields=["event", "registered_at", "id"], name="studentreg_event_reg_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="studentregistration",
+            constraint=models.UniqueConstraint(
+                fields=("regd_no", "event"), name="unique_regd_no_per_event"
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def populate_counters(apps, schema_editor):
+    """Count existing registrations with one grouped query"""
+    StudentRegistration = apps.get_model("Home", "StudentRegistration")
+    RegistrationCounter = apps.get_model("Home", "RegistrationCounter")
+    rows = (
+        StudentRegistration.objects.annotate(day=TruncDate("registered_at"))
+        .values("event_id", "branch", "year", "day")
+        .annotate(total=models.Count("id"))
+        .order_by()
+    )
+    RegistrationCounter.objects.bulk_create(
+        [
+            RegistrationCounter(
+                event_id=row["event_id"],
+                branch=row["branch"] or "",
+                year=row["year"],
+                day=row["day"],
+                count=row["total"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0005_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistrationCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("branch", models.CharField(blank=True, max_length=50)),
+                ("year", models.CharField(max_length=20)),
+                ("day", models.DateField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="Home.event"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["day"], name="regcounter_day_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("event", "branch", "year", "day"),
+                        name="unique_registration_counter",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
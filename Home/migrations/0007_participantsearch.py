@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEARCH_TABLE = "Home_participantsearch"
+FTS_TABLE = "Home_participantsearch_fts"
+
+SQLITE_CREATE = [
+    # External-content FTS5 table over the document column, rowid = registration id
+    f"""CREATE VIRTUAL TABLE "{FTS_TABLE}" USING fts5(
+        document, content="{SEARCH_TABLE}", content_rowid="registration_id", prefix="2 3 4"
+    )""",
+    f"""CREATE TRIGGER "{FTS_TABLE}_ai" AFTER INSERT ON "{SEARCH_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"(rowid, document) VALUES (new.registration_id, new.document);
+    END""",
+    f"""CREATE TRIGGER "{FTS_TABLE}_ad" AFTER DELETE ON "{SEARCH_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, document)
+        VALUES ('delete', old.registration_id, old.document);
+    END""",
+    f"""CREATE TRIGGER "{FTS_TABLE}_au" AFTER UPDATE ON "{SEARCH_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, document)
+        VALUES ('delete', old.registration_id, old.document);
+        INSERT INTO "{FTS_TABLE}"(rowid, document) VALUES (new.registration_id, new.document);
+    END""",
+    f"""INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES ('rebuild')""",
+]
+
+SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_ai"',
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_ad"',
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_au"',
+    f'DROP TABLE IF EXISTS "{FTS_TABLE}"',
+]
+
+MYSQL_CREATE = [
+    f"ALTER TABLE `{SEARCH_TABLE}` ADD FULLTEXT INDEX participantsearch_document_ft (document) WITH PARSER ngram",
+]
+
+MYSQL_DROP = [
+    f"ALTER TABLE `{SEARCH_TABLE}` DROP INDEX participantsearch_document_ft",
+]
+
+
+def populate_documents(apps, schema_editor):
+    """Build search documents for existing registrations"""
+    StudentRegistration = apps.get_model("Home", "StudentRegistration")
+    ParticipantSearch = apps.get_model("Home", "ParticipantSearch")
+    fields = ("name", "email", "regd_no", "phone", "branch", "event__event_name")
+    rows = StudentRegistration.objects.order_by("id").values_list("id", *fields)
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:1000])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        ParticipantSearch.objects.bulk_create(
+            [
+                ParticipantSearch(
+                    registration_id=row[0],
+                    document=" ".join(value for value in row[1:] if value),
+                )
+                for row in batch
+            ]
+        )
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+create_fulltext_index = run_for_vendor({"sqlite": SQLITE_CREATE, "mysql": MYSQL_CREATE})
+drop_fulltext_index = run_for_vendor({"sqlite": SQLITE_DROP, "mysql": MYSQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0006_registrationcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParticipantSearch",
+            fields=[
+                (
+                    "registration",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search",
+                        serialize=False,
+                        to="Home.studentregistration",
+                    ),
+                ),
+                ("document", models.TextField()),
+            ],
+        ),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+        # Created after the documents are loaded so the index is built in one pass
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
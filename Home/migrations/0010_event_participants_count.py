@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_participants(apps, schema_editor):
+    """Fill in participants_count of existing events with one grouped query"""
+    Event = apps.get_model("Home", "Event")
+    StudentRegistration = apps.get_model("Home", "StudentRegistration")
+    totals = (
+        StudentRegistration.objects.values("event_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in totals:
+        Event.objects.filter(pk=row["event_id"]).update(participants_count=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0009_confirmationemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="participants_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
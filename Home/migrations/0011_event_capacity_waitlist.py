@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Home", "0010_event_participants_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="capacity",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="pendingregistration",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("QUEUED", "Queued"),
+                    ("REGISTERED", "Registered"),
+                    ("WAITLISTED", "Waitlisted"),
+                    ("FAILED", "Failed"),
+                ],
+                default="QUEUED",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("email", models.EmailField(max_length=254)),
+                ("phone", models.CharField(max_length=15)),
+                (
+                    "regd_no",
+                    models.CharField(max_length=20, verbose_name="Registration Number"),
+                ),
+                (
+                    "branch",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("CSE", "CSE"),
+                            ("EE", "EE"),
+                            ("ME", "ME"),
+                            ("CIVIL", "Civil"),
+                            ("MBA", "MBA"),
+                            ("MCA", "MCA"),
+                            ("BBA", "BBA"),
+                            ("BCA", "BCA"),
+                        ],
+                        max_length=50,
+                        null=True,
+                    ),
+                ),
+                (
+                    "year",
+                    models.CharField(
+                        choices=[
+                            ("1st Year", "1st Year"),
+                            ("2nd Year", "2nd Year"),
+                            ("3rd Year", "3rd Year"),
+                            ("4th Year", "4th Year"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("WAITING", "Waiting"),
+                            ("PROMOTED", "Promoted"),
+                            ("CANCELLED", "Cancelled"),
+                        ],
+                        default="WAITING",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("promoted_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="Home.event"
+                    ),
+                ),
+                (
+                    "registration",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="waitlist_entry",
+                        to="Home.studentregistration",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "waitlist entries",
+                "ordering": ["created_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["event", "status", "created_at", "id"],
+                        name="waitlist_queue_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
 # home/models.py
+import uuid
+
 from django.db import models
+from django.utils import timezone
 
 # Table 1: Event List (Pre-filled) with Categories
 class Event(models.Model):
@@ -14,10 +17,32 @@ class Event(models.Model):
     event_name = models.CharField(max_length=200)
     # ADD default='LITERARY' aur null=True
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='LITERARY', null=True, blank=True)
+    # Number of registrations, changed only by F() updates in Home/counters.py
+    participants_count = models.IntegerField(default=0, editable=False)
+    # Seats available; empty means unlimited. Further students go on the waitlist
+    capacity = models.PositiveIntegerField(null=True, blank=True)
     
     def _str_(self):
         return f"{self.event_name} ({self.get_category_display()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored name - only a rename needs the search documents rebuilt
+        if 'event_name' in field_names:
+            instance._stored_event_name = instance.event_name
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # A full save from an instance loaded earlier would overwrite the
+        # registrations counted since - leave participants_count out of it
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'participants_count'
+            ]
+        super().save(*args, **kwargs)
+    
     class Meta:
         ordering = ['category', 'event_name']
 
@@ -55,5 +80,229 @@ class StudentRegistration(models.Model):
     def _str_(self):
         return f"{self.name} - {self.event.event_name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which counter bucket the stored row belongs to (see Home/counters.py)
+        if {'event_id', 'branch', 'year', 'registered_at'} <= set(field_names):
+            from .counters import counter_key
+            instance._counter_key = counter_key(instance)
+        return instance
+    
+    class Meta:
+        ordering = ['-registered_at']
+        constraints = [
+            # One registration per student per event - also serves regd_no lookups
+            models.UniqueConstraint(fields=['regd_no', 'event'], name='unique_regd_no_per_event'),
+        ]
+        indexes = [
+            # Dashboard listing / export keyset order, optionally filtered by branch or event
+            models.Index(fields=['registered_at', 'id'], name='studentreg_registered_idx'),
+            models.Index(fields=['branch', 'registered_at', 'id'], name='studentreg_branch_reg_idx'),
+            models.Index(fields=['event', 'registered_at', 'id'], name='studentreg_event_reg_idx'),
+        ]
+
+class RegistrationCounter(models.Model):
+    """
+    Number of registrations per event, branch, year and day, kept up to date
+    by Home/counters.py so dashboard totals never scan StudentRegistration
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    # Registrations without a branch are counted under ''
+    branch = models.CharField(max_length=50, blank=True)
+    year = models.CharField(max_length=20)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.event_id} {self.branch} {self.year} {self.day}: {self.count}"
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'branch', 'year', 'day'], name='unique_registration_counter'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='regcounter_day_idx'),
+        ]
+
+
+class ParticipantSearch(models.Model):
+    """
+    Search document for one registration (name, email, regd_no, phone,
+    branch and event name), kept in sync by Home/search.py. The full-text
+    index over ``document`` is created per database backend by migration
+    0007_participantsearch.
+    """
+    registration = models.OneToOneField(
+        StudentRegistration, on_delete=models.CASCADE, primary_key=True, related_name='search'
+    )
+    document = models.TextField()
+    
+    def __str__(self):
+        return f"{self.registration_id}: {self.document}"
+
+
+def generate_reference():
+    return uuid.uuid4().hex
+
+
+class PendingRegistration(models.Model):
+    """
+    Registration submission waiting in the ingestion queue.
+    Rows are written by the register view in buffered mode and moved into
+    StudentRegistration in batches by the process_registrations command.
+    """
+    STATUS_QUEUED = 'QUEUED'
+    STATUS_REGISTERED = 'REGISTERED'
+    STATUS_WAITLISTED = 'WAITLISTED'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_REGISTERED, 'Registered'),
+        (STATUS_WAITLISTED, 'Waitlisted'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    reference = models.CharField(max_length=32, unique=True, default=generate_reference, editable=False)
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15)
+    regd_no = models.CharField(max_length=20)
+    branch = models.CharField(max_length=50, choices=StudentRegistration.BRANCH_CHOICES)
+    year = models.CharField(max_length=20, choices=StudentRegistration.YEAR_CHOICES)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    registration = models.ForeignKey(StudentRegistration, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.reference} ({self.status})"
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='pendingreg_status_id_idx'),
+        ]
+
+
+class Job(models.Model):
+    """
+    Background job queued with Home.jobs.enqueue() and run by the run_jobs
+    command. While a worker runs it, locked_until is the moment another
+    worker may assume it died and take the job over.
+    """
+    STATUS_QUEUED = 'QUEUED'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Visibility timeout in seconds
+    timeout = models.PositiveIntegerField(default=300)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+    
+    class Meta:
+        ordering = ['-priority', 'run_after', 'id']
+        indexes = [
+            # Claim order for due jobs, and finding expired locks
+            models.Index(fields=['status', '-priority', 'run_after', 'id'], name='job_claim_idx'),
+            models.Index(fields=['status', 'locked_until'], name='job_locked_idx'),
+        ]
+
+
+class ConfirmationEmail(models.Model):
+    """
+    Confirmation mail owed to a student who registered, sent in batches by
+    Home/confirmations.py
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_SENT = 'SENT'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    registration = models.OneToOneField(
+        StudentRegistration, on_delete=models.CASCADE, related_name='confirmation_email'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Due time of the next try; pushed ahead while a sender holds the row
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.registration_id} ({self.status})"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='confirmation_due_idx'),
+        ]
+
+
+class WaitlistEntry(models.Model):
+    """
+    Student who asked for a seat on a full event. Home/waitlist.py registers
+    the oldest waiting entry as soon as a seat frees up.
+    """
+    STATUS_WAITING = 'WAITING'
+    STATUS_PROMOTED = 'PROMOTED'
+    STATUS_CANCELLED = 'CANCELLED'
+    STATUS_CHOICES = [
+        (STATUS_WAITING, 'Waiting'),
+        (STATUS_PROMOTED, 'Promoted'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15)
+    regd_no = models.CharField(max_length=20, verbose_name="Registration Number")
+    branch = models.CharField(max_length=50, choices=StudentRegistration.BRANCH_CHOICES, null=True, blank=True)
+    year = models.CharField(max_length=20, choices=StudentRegistration.YEAR_CHOICES)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_WAITING)
+    # The registration made when the entry was promoted
+    registration = models.OneToOneField(
+        StudentRegistration, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entry'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.regd_no} waiting for {self.event_id} ({self.status})"
+    
     class Meta:
-        ordering = ['-registered_at']
\ No newline at end of file
+        ordering = ['created_at', 'id']
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            # Promotion order within an event
+            models.Index(fields=['event', 'status', 'created_at', 'id'], name='waitlist_queue_idx'),
+        ]
@@ -0,0 +1,153 @@
+# Home/notices.py
+"""
+Notice feed
+
+Notice lists load the stored excerpt (Announcment.excerpt) and never the
+full content, and page with a (created_at, id) keyset cursor instead of
+OFFSET, so "load more" costs the same on the tenth page as on the first.
+
+The notices page and the JSON feed answer conditional GETs. The ETag and
+Last-Modified come from the newest updated_at; the ETag also counts the
+notices, so deleting one changes it. The validators are cached under the
+notices page-cache version, which Admin/signals.py bumps on every change,
+so a phone revalidating gets its 304 without a database query.
+"""
+import base64
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from Admin.models import Announcment
+
+from .page_cache import NOTICES, PAGE_TIMEOUT, apage_version, page_version
+
+NOTICE_PAGE_SIZE = 6
+NOTICE_MAX_PAGE_SIZE = 50
+
+VALIDATORS_KEY = 'notices:validators:v{version}'
+LIST_FIELDS = ('id', 'title', 'excerpt', 'attatchment', 'created_at', 'updated_at')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(notice):
+    value = f'{notice.created_at.isoformat()}|{notice.pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = value.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _page_queryset(cursor, limit):
+    queryset = Announcment.objects.only(*LIST_FIELDS).order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    # One extra row tells whether there is a next page
+    return queryset[:limit + 1]
+
+
+def _split_page(rows, limit):
+    notices = rows[:limit]
+    next_cursor = encode_cursor(notices[-1]) if len(rows) > limit else None
+    return notices, next_cursor
+
+
+def notice_page(cursor=None, limit=NOTICE_PAGE_SIZE):
+    """
+    (notices, next cursor or None) for the page after cursor, newest first
+    """
+    return _split_page(list(_page_queryset(cursor, limit)), limit)
+
+
+async def anotice_page(cursor=None, limit=NOTICE_PAGE_SIZE):
+    return _split_page([notice async for notice in _page_queryset(cursor, limit)], limit)
+
+
+def _validators_from(stats):
+    newest = stats['newest']
+    if newest is None:
+        return '"notices-0"', None
+    return f'"notices-{stats["count"]}-{int(newest.timestamp() * 1000)}"', int(newest.timestamp())
+
+
+def notice_validators():
+    """
+    (ETag, Last-Modified timestamp) of the current set of notices
+    """
+    key = VALIDATORS_KEY.format(version=page_version(NOTICES))
+    validators = cache.get(key)
+    if validators is None:
+        validators = _validators_from(Announcment.objects.aggregate(newest=Max('updated_at'), count=Count('id')))
+        cache.set(key, validators, PAGE_TIMEOUT)
+    return validators
+
+
+async def anotice_validators():
+    key = VALIDATORS_KEY.format(version=await apage_version(NOTICES))
+    validators = await cache.aget(key)
+    if validators is None:
+        validators = _validators_from(
+            await Announcment.objects.aaggregate(newest=Max('updated_at'), count=Count('id'))
+        )
+        await cache.aset(key, validators, PAGE_TIMEOUT)
+    return validators
+
+
+def _add_validators(request, response, etag, last_modified):
+    if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Always revalidate - a 304 is cheap and notices must not go stale
+        response.headers.setdefault('Cache-Control', 'no-cache')
+    return response
+
+
+def conditional_notices(view):
+    """
+    Answer If-None-Match / If-Modified-Since for a view listing notices
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            etag, last_modified = await anotice_validators()
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return _add_validators(request, response, etag, last_modified)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        etag, last_modified = notice_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        return _add_validators(request, response, etag, last_modified)
+    return wrapper
+
+
+def notice_summary(notice):
+    return {
+        'id': notice.pk,
+        'title': notice.title,
+        'excerpt': notice.excerpt,
+        'truncated': notice.excerpt_truncated,
+        'attachment': notice.attatchment.url if notice.attatchment else None,
+        'created_at': notice.created_at.isoformat(),
+        'updated_at': notice.updated_at.isoformat(),
+    }
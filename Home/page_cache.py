@@ -0,0 +1,110 @@
+# Home/page_cache.py
+"""
+Full-page cache for anonymous visitors
+
+Public pages are grouped by the data they render ('results' for the home
+and winners pages, 'notices' for the notice board). Each cached page is
+keyed by its group's version and the full request path (query string
+included), so invalidating a group purges exactly the pages built from
+that data. Admin/signals.py invalidates the groups when results or
+announcements change.
+
+Both sync and async views can be decorated; async views use the cache's
+async API so a cache hit never leaves the event loop.
+"""
+from functools import wraps
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache_versions import aget_version, bump_version, get_version
+
+PAGE_KEY = 'page:{group}:v{version}:{path}'
+PAGE_TIMEOUT = 60 * 60
+
+RESULTS = 'results'
+NOTICES = 'notices'
+
+
+def page_version(group):
+    return get_version(f'page:{group}')
+
+
+async def apage_version(group):
+    return await aget_version(f'page:{group}')
+
+
+def _page_key(group, request, version):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(group=group, version=version, path=path)
+
+
+def _is_cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # request.user is lazy - visitors without a session cookie are
+    # resolved as anonymous without touching the database
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+async def _ais_cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if hasattr(request, 'auser'):
+        user = await request.auser()
+        return not user.is_authenticated
+    return True
+
+
+def _should_store(response):
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def cache_public_page(group, timeout=PAGE_TIMEOUT):
+    """
+    Cache the rendered response of a view for anonymous users under group
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not await _ais_cacheable(request):
+                    return await view(request, *args, **kwargs)
+
+                key = _page_key(group, request, await apage_version(group))
+                cached = await cache.aget(key)
+                if cached is not None:
+                    content, content_type = cached
+                    return HttpResponse(content, content_type=content_type)
+
+                response = await view(request, *args, **kwargs)
+                if _should_store(response):
+                    await cache.aset(key, (response.content, response['Content-Type']), timeout)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable(request):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(group, request, page_version(group))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if _should_store(response):
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_pages(group):
+    bump_version(f'page:{group}')
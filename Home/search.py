@@ -0,0 +1,151 @@
+# Home/search.py
+"""
+Indexed participant search
+
+Each StudentRegistration has a ParticipantSearch row whose ``document``
+holds the searchable text (name, email, regd_no, phone, branch and event
+name). The full-text index over it depends on the database:
+
+* MySQL - a FULLTEXT index with the ngram parser, queried with
+  MATCH ... AGAINST in boolean mode, so any part of a token matches.
+* SQLite - an external-content FTS5 table kept in sync by triggers,
+  queried with prefix terms.
+
+Signals keep documents current for single saves and deletes, bulk write
+paths call index_registrations(), and renaming an event (only a rename,
+not other edits) reindexes its registrations. The dashboard listing and the export both filter through
+search_filter(), so they always agree on what a search matches.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .catalog import get_event
+from .models import Event, ParticipantSearch, StudentRegistration
+
+SEARCH_TABLE = ParticipantSearch._meta.db_table
+FTS_TABLE = f'{SEARCH_TABLE}_fts'
+
+# Terms beyond this are ignored, each one adds work to the match
+MAX_TERMS = 8
+REINDEX_BATCH_SIZE = 1000
+
+TERM_RE = re.compile(r'\w+')
+
+DOCUMENT_FIELDS = ('name', 'email', 'regd_no', 'phone', 'branch')
+
+
+def build_document(registration, event_name):
+    values = [getattr(registration, field) for field in DOCUMENT_FIELDS] + [event_name]
+    return ' '.join(value for value in values if value)
+
+
+def index_registrations(registrations):
+    """
+    Write search documents for registrations inserted without signals (bulk_create).
+    The registrations must already have their primary keys.
+    """
+    # Read from the database rather than the catalog cache, which may lag behind a rename
+    names = dict(
+        Event.objects.filter(id__in={registration.event_id for registration in registrations})
+        .values_list('id', 'event_name')
+    )
+    ParticipantSearch.objects.bulk_create([
+        ParticipantSearch(
+            registration_id=registration.pk,
+            document=build_document(registration, names.get(registration.event_id)),
+        )
+        for registration in registrations
+    ], batch_size=REINDEX_BATCH_SIZE)
+
+
+def _event_name(registration):
+    # The event the caller loaded, else the cached catalog - no query on the register path
+    if StudentRegistration.event.is_cached(registration):
+        return registration.event.event_name
+    event = get_event(registration.event_id)
+    return event['event_name'] if event is not None else registration.event.event_name
+
+
+def registration_saved(instance, created):
+    document = build_document(instance, _event_name(instance))
+    if created or not ParticipantSearch.objects.filter(registration_id=instance.pk).update(document=document):
+        ParticipantSearch.objects.create(registration_id=instance.pk, document=document)
+
+
+def _reindex(registrations):
+    """
+    Rebuild the documents of a registration queryset in primary key batches
+    """
+    last_id = 0
+    while True:
+        batch = list(
+            registrations.filter(id__gt=last_id)
+            .select_related('event')
+            .only(*DOCUMENT_FIELDS, 'event__event_name')
+            .order_by('id')[:REINDEX_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        ids = [registration.id for registration in batch]
+        ParticipantSearch.objects.filter(registration_id__in=ids).delete()
+        ParticipantSearch.objects.bulk_create([
+            ParticipantSearch(
+                registration_id=registration.id,
+                document=build_document(registration, registration.event.event_name),
+            )
+            for registration in batch
+        ])
+
+
+def reindex_event(event_id):
+    """
+    Refresh the documents of one event's registrations after it is renamed
+    """
+    _reindex(StudentRegistration.objects.filter(event_id=event_id))
+
+
+def rebuild_index():
+    ParticipantSearch.objects.all().delete()
+    _reindex(StudentRegistration.objects.all())
+
+
+def search_terms(search):
+    return TERM_RE.findall(search or '')[:MAX_TERMS]
+
+
+def match_expression(terms, vendor):
+    """
+    Every term must match: a prefix query on SQLite, an ngram phrase on MySQL
+    """
+    if vendor == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms)
+    # Terms shorter than ngram_token_size (2 by default) only match as a prefix
+    return ' '.join(f'+{term}*' if len(term) < 2 else f'+"{term}"' for term in terms)
+
+
+def search_filter(search, using=DEFAULT_DB_ALIAS):
+    """
+    Return a Q restricting StudentRegistration to rows matching every term of
+    search, or None if search has no usable terms
+    """
+    terms = search_terms(search)
+    if not terms:
+        return None
+
+    vendor = connections[using].vendor
+    if vendor == 'sqlite':
+        sql = f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s'
+    elif vendor == 'mysql':
+        sql = f'SELECT registration_id FROM `{SEARCH_TABLE}` WHERE MATCH(document) AGAINST (%s IN BOOLEAN MODE)'
+    else:
+        # No full-text index on this backend - scan the document column instead
+        query = Q()
+        for term in terms:
+            query &= Q(search__document__icontains=term)
+        return query
+
+    return Q(pk__in=RawSQL(sql, [match_expression(terms, vendor)]))
@@ -0,0 +1,59 @@
+# Home/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, search, waitlist
+from .cache_versions import registrations_changed
+from .catalog import invalidate_catalog
+from .models import Event, StudentRegistration
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, **kwargs):
+    """Rebuild the registration form catalog once the event change is committed"""
+    transaction.on_commit(invalidate_catalog)
+    # Exports show the event name and category
+    registrations_changed()
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, created, raw=False, **kwargs):
+    """The event name is part of every registration's search document"""
+    if not created and not raw:
+        # Unknown when the instance wasn't loaded from the database - reindex to be safe
+        if getattr(instance, '_stored_event_name', None) != instance.event_name:
+            search.reindex_event(instance.pk)
+        instance._stored_event_name = instance.event_name
+        # The capacity may have been raised
+        waitlist.promote(instance.pk)
+
+
+@receiver(pre_save, sender=StudentRegistration)
+def registration_saving(sender, instance, raw=False, **kwargs):
+    """Take the registration's seat before its row is written"""
+    if not raw:
+        counters.registration_saving(instance)
+
+
+@receiver(post_save, sender=StudentRegistration)
+def registration_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep the dashboard counters in step with every saved registration"""
+    if not raw:
+        old_key = None if created else getattr(instance, '_counter_key', None)
+        counters.registration_saved(instance, created)
+        search.registration_saved(instance, created)
+        registrations_changed()
+        if old_key is not None and old_key[0] != instance.event_id:
+            # Moved to another event - its seat on the old one is free
+            waitlist.promote(old_key[0])
+
+
+@receiver(post_delete, sender=StudentRegistration)
+def registration_deleted(sender, instance, origin=None, **kwargs):
+    counters.registration_deleted(instance)
+    registrations_changed()
+    # Hand the freed seat to the waitlist, unless the event itself is being deleted
+    if not isinstance(origin, Event):
+        waitlist.promote(instance.event_id)
@@ -0,0 +1,234 @@
+# Home/sql_instrumentation.py
+"""
+Per-request SQL instrumentation
+
+When settings.SQL_INSTRUMENTATION is on, SQLInstrumentationMiddleware
+gives each request a QueryRecorder in a context variable, and one
+execute wrapper, installed once on every connection and never removed,
+hands each query's SQL, parameters and time to the recorder of the
+request that ran it. Async requests overlapping on the same sync thread
+therefore never count each other's queries. Per request it counts:
+
+* queries and total database time,
+* duplicate statements - the same SQL with the same parameters,
+* repeated shapes - the same SQL with different parameters, the usual
+  sign of an N+1 loop.
+
+Requests over the thresholds are logged, and the numbers are aggregated
+per view (by URL name) in the cache for the admin panel's SQL report.
+Queries run while a streaming response is consumed happen after the
+middleware returns and are not counted.
+"""
+from collections import Counter
+from contextvars import ContextVar
+import hashlib
+import logging
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current_recorder = ContextVar('sql_instrumentation_recorder', default=None)
+
+STATS_KEY = 'sqlstats:view:{digest}'
+VIEWS_KEY = 'sqlstats:views'
+STATS_TIMEOUT = 7 * 24 * 60 * 60
+
+# Placeholder lists (IN (...), multi-row VALUES) vary with the data, not the code
+PLACEHOLDER_LIST_RE = re.compile(r'\((?:%s, )*%s\)(?:, \((?:%s, )*%s\))*')
+
+
+def instrumentation_enabled():
+    return getattr(settings, 'SQL_INSTRUMENTATION', False)
+
+
+def thresholds():
+    return {
+        'max_queries': getattr(settings, 'SQL_INSTRUMENTATION_MAX_QUERIES', 20),
+        'slow_ms': getattr(settings, 'SQL_INSTRUMENTATION_SLOW_MS', 200),
+        'repeat': getattr(settings, 'SQL_INSTRUMENTATION_REPEAT_THRESHOLD', 5),
+    }
+
+
+def query_shape(sql):
+    return PLACEHOLDER_LIST_RE.sub('(...)', sql)
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper() callable collecting (sql, params, seconds)
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - started))
+
+    def summary(self):
+        statements = Counter((sql, repr(params)) for sql, params, duration in self.queries)
+        shapes = Counter(query_shape(sql) for sql, params, duration in self.queries)
+        shape, repeats = shapes.most_common(1)[0] if shapes else ('', 0)
+        return {
+            'queries': len(self.queries),
+            'db_ms': sum(duration for sql, params, duration in self.queries) * 1000,
+            'duplicates': sum(count - 1 for count in statements.values()),
+            'top_shape': shape,
+            'top_shape_count': repeats,
+        }
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_wrapper():
+    """
+    Put _record_query on this thread's connections, once
+    """
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if _record_query not in wrappers:
+            # First in the list: execute_wrapper() blocks pop from the end, so
+            # it can't be taken off by someone else's exit
+            wrappers.insert(0, _record_query)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+def _stats_key(view):
+    return STATS_KEY.format(digest=hashlib.md5(view.encode()).hexdigest())
+
+
+def record(view, summary, limits):
+    """
+    Add one request to the view's aggregate. Read-modify-write, so concurrent
+    requests can occasionally drop a sample - good enough for a diagnostic.
+    """
+    key = _stats_key(view)
+    stats = cache.get(key) or {
+        'view': view, 'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0,
+        'max_db_ms': 0.0, 'duplicates': 0, 'n_plus_one': 0, 'slow': 0,
+        'top_shape': '', 'top_shape_count': 0,
+    }
+    stats['requests'] += 1
+    stats['queries'] += summary['queries']
+    stats['max_queries'] = max(stats['max_queries'], summary['queries'])
+    stats['db_ms'] += summary['db_ms']
+    stats['max_db_ms'] = max(stats['max_db_ms'], summary['db_ms'])
+    stats['duplicates'] += summary['duplicates']
+    if summary['top_shape_count'] >= limits['repeat']:
+        stats['n_plus_one'] += 1
+    if summary['queries'] > limits['max_queries'] or summary['db_ms'] > limits['slow_ms']:
+        stats['slow'] += 1
+    if summary['top_shape_count'] > stats['top_shape_count']:
+        stats['top_shape'] = summary['top_shape']
+        stats['top_shape_count'] = summary['top_shape_count']
+    cache.set(key, stats, STATS_TIMEOUT)
+
+    views = cache.get(VIEWS_KEY) or set()
+    if view not in views:
+        views.add(view)
+        cache.set(VIEWS_KEY, views, STATS_TIMEOUT)
+
+
+def report():
+    """
+    Aggregated stats per view, most queries per request first
+    """
+    rows = []
+    for view in cache.get(VIEWS_KEY) or ():
+        stats = cache.get(_stats_key(view))
+        if not stats:
+            continue
+        requests = stats['requests']
+        rows.append(dict(
+            stats,
+            avg_queries=round(stats['queries'] / requests, 1),
+            avg_db_ms=round(stats['db_ms'] / requests, 2),
+            max_db_ms=round(stats['max_db_ms'], 2),
+        ))
+    return sorted(rows, key=lambda row: row['avg_queries'], reverse=True)
+
+
+def reset():
+    for view in cache.get(VIEWS_KEY) or ():
+        cache.delete(_stats_key(view))
+    cache.delete(VIEWS_KEY)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Opt-in: does nothing unless settings.SQL_INSTRUMENTATION is True.
+    Supports both sync and async requests, so enabling it doesn't push the
+    async public views back onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not instrumentation_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limits = thresholds()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        install_wrapper()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self.finish(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        # Connections are thread-local: install on the thread the async ORM
+        # sends this request's queries to, not the event loop's. The context
+        # variable travels there with each sync_to_async call.
+        await sync_to_async(install_wrapper)()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        await sync_to_async(self.finish)(request, recorder)
+        return response
+
+    def finish(self, request, recorder):
+        view = view_name(request)
+        summary = recorder.summary()
+        record(view, summary, self.limits)
+
+        if (summary['queries'] > self.limits['max_queries']
+                or summary['db_ms'] > self.limits['slow_ms']
+                or summary['top_shape_count'] >= self.limits['repeat']):
+            logger.warning(
+                "%s %s (%s): %d queries, %.1f ms in the database, %d duplicates, "
+                "most repeated query ran %d times: %s",
+                request.method, request.path, view, summary['queries'], summary['db_ms'],
+                summary['duplicates'], summary['top_shape_count'], summary['top_shape'][:300],
+            )
@@ -0,0 +1,25 @@
+// Live updates pushed from /live/ (Server-Sent Events, see Home/live.py).
+// The browser reconnects by itself and sends Last-Event-ID, so nothing is missed.
+function exoticaLive(url, handlers) {
+    if (!window.EventSource) return null;
+    const source = new EventSource(url);
+    Object.entries(handlers).forEach(([kind, handler]) => {
+        source.addEventListener(kind, e => handler(JSON.parse(e.data)));
+    });
+    return source;
+}
+
+// Small banner offering to reload the page with the new data
+function exoticaLiveBanner(text) {
+    let banner = document.getElementById('liveBanner');
+    if (!banner) {
+        banner = document.createElement('div');
+        banner.id = 'liveBanner';
+        banner.style.cssText = 'position:fixed;bottom:20px;left:50%;transform:translateX(-50%);z-index:2000;' +
+            'background:rgba(5,5,5,0.9);border:1px solid #00d4ff;border-radius:12px;padding:10px 16px;' +
+            'color:#fff;font-family:Outfit,sans-serif;box-shadow:0 5px 20px rgba(0,212,255,0.3);';
+        banner.innerHTML = '<span></span> <a href="" style="color:#ccff00;margin-left:10px;">Refresh</a>';
+        document.body.appendChild(banner);
+    }
+    banner.querySelector('span').textContent = text;
+}
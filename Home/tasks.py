@@ -0,0 +1,12 @@
+# Home/tasks.py
+"""
+Background jobs for the public site (see Home/jobs.py)
+"""
+from . import confirmations
+from .jobs import task
+
+
+@task(priority=3, timeout=15 * 60)
+def send_confirmation_emails():
+    """Send a batch of registration confirmation mails over one SMTP connection"""
+    return confirmations.run_sender()
@@ -1,3 +1,1253 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import random
+import shutil
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Admin.models import Announcment, FeaturedSlot, Result
+
+from . import benchmark, confirmations, counters, db_routing, jobs, live
+from .catalog import get_events_by_category, invalidate_catalog
+from .idempotency import new_token
+from .ingestion import flush_pending_registrations
+from .page_cache import NOTICES, RESULTS, invalidate_pages
+from .search import search_filter
+from .models import (
+    ConfirmationEmail, Event, Job, ParticipantSearch, PendingRegistration, RegistrationCounter, StudentRegistration,
+    WaitlistEntry,
+)
+
+
+def registration_form(event, **overrides):
+    data = {
+        'name': 'Asha',
+        'email': 'asha@example.com',
+        'phone': '9876543210',
+        'regd_no': 'NIT2024001',
+        'branch': 'CSE',
+        'year': '1st Year',
+        'event': event.id,
+    }
+    data.update(overrides)
+    return data
+
+
+class EventCatalogTests(TestCase):
+    """Cached category -> events mapping for the registration form"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quiz = Event.objects.create(event_name='Quiz', category='LITERARY')
+        cls.relay = Event.objects.create(event_name='Relay', category='ATHLETICS')
+
+    def setUp(self):
+        invalidate_catalog()
+
+    def test_catalog_is_built_with_one_query(self):
+        with self.assertNumQueries(1):
+            catalog = get_events_by_category()
+        self.assertEqual(list(catalog), ['LITERARY EVENTS', 'ATHLETICS EVENTS'])
+        self.assertEqual(catalog['LITERARY EVENTS'][0]['event_name'], 'Quiz')
+
+    def test_register_form_served_from_cache(self):
+        self.client.get(reverse('register'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('register'))
+        self.assertContains(response, 'Relay')
+
+    def test_event_changes_invalidate_catalog(self):
+        get_events_by_category()
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(event_name='Cricket', category='SPORTS')
+        self.assertIn('SPORTS', get_events_by_category())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relay.delete()
+        self.assertNotIn('ATHLETICS EVENTS', get_events_by_category())
+
+
+class PublicPageCacheTests(TestCase):
+    """Anonymous page cache for home, winners and notices"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.result = Result.objects.create(
+            winner='Ravi', branch='CSE', position='1st', game='Chess',
+            photo='results/ravi.jpg', featured=True,
+            # No file on disk - keep saves from scheduling derivative generation
+            photo_derivatives={'source': 'results/ravi.jpg'},
+        )
+        cls.notice = Announcment.objects.create(title='Schedule', content='Day one schedule')
+
+    def setUp(self):
+        invalidate_pages(RESULTS)
+        invalidate_pages(NOTICES)
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for url in (reverse('home'), reverse('all-winners') + '?position=1st', reverse('notices')):
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(first.content, second.content)
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get(reverse('all-winners') + '?position=1st')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('all-winners') + '?position=2nd')
+        self.assertNotContains(response, 'Ravi')
+
+    def test_result_changes_purge_result_pages_only(self):
+        self.client.get(reverse('all-winners'))
+        self.client.get(reverse('notices'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result.winner = 'Ravi Kumar'
+            self.result.save()
+
+        self.assertContains(self.client.get(reverse('all-winners')), 'Ravi Kumar')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('notices'))
+
+    def test_announcement_delete_purges_notices(self):
+        self.assertContains(self.client.get(reverse('notices')), 'Schedule')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notice.delete()
+        self.assertNotContains(self.client.get(reverse('notices')), 'Schedule')
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.get(reverse('notices'))
+        self.client.force_login(User.objects.create_user('admin', password='secret'))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('notices'))
+
+    def test_async_client_is_served_from_cache(self):
+        get = async_to_sync(self.async_client.get)
+        for url in (reverse('home'), reverse('all-winners'), reverse('notices')):
+            first = get(url)
+            self.assertEqual(first.status_code, 200)
+            with self.assertNumQueries(0):
+                second = get(url)
+            self.assertEqual(first.content, second.content)
+        self.assertContains(first, 'Schedule')
+
+
+class RegisterTests(TestCase):
+    """Direct registration through the public form"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(event_name='Debate', category='LITERARY')
+
+    def setUp(self):
+        invalidate_catalog()
+
+    def test_duplicate_registration_is_rejected(self):
+        self.client.post(reverse('register'), registration_form(self.event))
+        response = self.client.post(reverse('register'), registration_form(self.event))
+        self.assertContains(response, 'already registered')
+        self.assertEqual(StudentRegistration.objects.count(), 1)
+
+    def test_form_renders_a_new_token_each_time(self):
+        first = self.client.get(reverse('register')).context['submission_token']
+        second = self.client.get(reverse('register')).context['submission_token']
+        self.assertNotEqual(first, second)
+
+    def test_replayed_submission_returns_original_page(self):
+        data = registration_form(self.event, submission_token=new_token())
+        first = self.client.post(reverse('register'), data)
+        replay = self.client.post(reverse('register'), data)
+
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay['X-Idempotent-Replay'], '1')
+        self.assertEqual(replay.content, first.content)
+        self.assertEqual(StudentRegistration.objects.count(), 1)
+
+    def test_failed_submission_is_not_replayed(self):
+        token = new_token()
+        response = self.client.post(reverse('register'), registration_form(self.event, name='', submission_token=token))
+        self.assertContains(response, 'All fields are required')
+
+        response = self.client.post(reverse('register'), registration_form(self.event, submission_token=token))
+        self.assertNotIn('X-Idempotent-Replay', response)
+        self.assertEqual(StudentRegistration.objects.count(), 1)
+
+
+@override_settings(REGISTRATION_INGESTION='buffered')
+class BufferedRegistrationTests(TestCase):
+    """Queued registration ingestion"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(event_name='Debate', category='LITERARY')
+
+    def setUp(self):
+        invalidate_catalog()
+
+    def test_submission_is_queued_not_saved(self):
+        response = self.client.post(reverse('register'), registration_form(self.event))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StudentRegistration.objects.count(), 0)
+
+        pending = PendingRegistration.objects.get()
+        self.assertContains(response, pending.reference)
+
+        status = self.client.get(reverse('registration_status', args=[pending.reference])).json()
+        self.assertEqual(status['status'], PendingRegistration.STATUS_QUEUED)
+
+    def test_replayed_submission_is_queued_once(self):
+        data = registration_form(self.event, submission_token=new_token())
+        self.client.post(reverse('register'), data)
+        self.client.post(reverse('register'), data)
+        self.assertEqual(PendingRegistration.objects.count(), 1)
+
+    def test_flush_writes_batches(self):
+        for i in range(5):
+            self.client.post(reverse('register'), registration_form(self.event, regd_no=f'NIT{i}'))
+
+        # Claim, bulk insert, create the counter bucket, add to the event's
+        # participant count, index the batch for search (event names plus one
+        # insert), bulk update the queue rows and queue the confirmation mails
+        # (plus savepoints)
+        with self.assertNumQueries(15):
+            self.assertEqual(flush_pending_registrations(batch_size=10), 5)
+
+        self.assertEqual(StudentRegistration.objects.count(), 5)
+        self.assertEqual(ConfirmationEmail.objects.count(), 5)
+        for pending in PendingRegistration.objects.all():
+            self.assertEqual(pending.status, PendingRegistration.STATUS_REGISTERED)
+            self.assertEqual(pending.registration.regd_no, pending.regd_no)
+
+        self.assertEqual(flush_pending_registrations(), 0)
+
+    def test_command_drains_queue(self):
+        for i in range(3):
+            self.client.post(reverse('register'), registration_form(self.event, regd_no=f'NIT{i}'))
+
+        call_command('process_registrations', '--once', '--batch-size', '2', stdout=StringIO())
+        self.assertFalse(PendingRegistration.objects.filter(status=PendingRegistration.STATUS_QUEUED).exists())
+        self.assertEqual(StudentRegistration.objects.count(), 3)
+
+    def test_unknown_reference(self):
+        response = self.client.get(reverse('registration_status', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        sink = self.server
+        sink.connections += 1
+        self.reply('220 sink ready')
+        recipients = []
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == 'RCPT':
+                address = command.split(':', 1)[1].strip().strip('<>')
+                if address in sink.reject:
+                    self.reply('550 No such user')
+                    continue
+                recipients.append(address)
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                body = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                sink.messages.append((recipients, body.decode()))
+                recipients = []
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Local SMTP server that keeps what it receives"""
+    daemon_threads = True
+
+    def __init__(self, reject=()):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.reject = set(reject)
+        self.messages = []
+        self.connections = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+@override_settings(CONFIRMATION_EMAIL_RATE=0)
+class ConfirmationEmailTests(TestCase):
+    """Registration confirmations sent in batches by a background job"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(event_name='Debate', category='LITERARY')
+
+    def setUp(self):
+        invalidate_catalog()
+        cache.delete(confirmations.SCHEDULED_KEY)
+
+    def register(self, count):
+        for i in range(count):
+            self.client.post(reverse('register'), registration_form(self.event, regd_no=f'NIT{i}', email=f's{i}@example.com'))
+
+    def smtp_settings(self, sink):
+        host, port = sink.server_address
+        return override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST=host, EMAIL_PORT=port,
+        )
+
+    def test_registering_only_queues_the_mail(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.register(1)
+        self.assertEqual(mail.outbox, [])
+
+        confirmation = ConfirmationEmail.objects.get()
+        self.assertEqual(confirmation.status, ConfirmationEmail.STATUS_PENDING)
+        # A second registration in the batch window doesn't queue another sender
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('register'), registration_form(self.event, regd_no='NIT9'))
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'Home.tasks.send_confirmation_emails')
+
+        Job.objects.update(run_after=timezone.now())
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 2)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['s0@example.com'])
+        self.assertIn('Debate', message.subject)
+        self.assertIn('NIT0', message.body)
+        self.assertIn('NIT0', message.alternatives[0][0])
+        self.assertFalse(ConfirmationEmail.objects.exclude(status=ConfirmationEmail.STATUS_SENT).exists())
+
+    def test_batch_uses_one_smtp_connection(self):
+        self.register(3)
+        with SMTPSink() as sink, self.smtp_settings(sink):
+            self.assertEqual(confirmations.send_batch(), (3, 0))
+
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual(sorted(recipients[0] for recipients, _ in sink.messages),
+                         ['s0@example.com', 's1@example.com', 's2@example.com'])
+        self.assertIn('Subject: Registration confirmed: Debate', sink.messages[0][1])
+
+    def test_refused_mail_is_retried_then_failed(self):
+        self.register(2)
+        with SMTPSink(reject=['s1@example.com']) as sink, self.smtp_settings(sink):
+            self.assertEqual(confirmations.send_batch(), (1, 1))
+
+            refused = ConfirmationEmail.objects.get(registration__email='s1@example.com')
+            self.assertEqual((refused.status, refused.attempts), (ConfirmationEmail.STATUS_PENDING, 1))
+            self.assertGreater(refused.next_attempt_at, timezone.now())
+            self.assertIn('No such user', refused.error)
+
+            with override_settings(CONFIRMATION_EMAIL_MAX_ATTEMPTS=2):
+                ConfirmationEmail.objects.filter(pk=refused.pk).update(next_attempt_at=timezone.now())
+                self.assertEqual(confirmations.send_batch(), (0, 1))
+        refused.refresh_from_db()
+        self.assertEqual(refused.status, ConfirmationEmail.STATUS_FAILED)
+        self.assertEqual(len(sink.messages), 1)
+
+    def test_unreachable_server_keeps_the_batch(self):
+        self.register(2)
+        with SMTPSink() as sink:
+            host, port = sink.server_address
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                               EMAIL_HOST=host, EMAIL_PORT=port, EMAIL_TIMEOUT=1):
+            self.assertEqual(confirmations.send_batch(), (0, 2))
+        self.assertFalse(ConfirmationEmail.objects.exclude(status=ConfirmationEmail.STATUS_PENDING).exists())
+
+    @override_settings(CONFIRMATION_EMAIL_RATE=20)
+    def test_sending_is_rate_limited(self):
+        self.register(3)
+        started = time.monotonic()
+        confirmations.send_batch()
+        # Three messages at 20 per second - two gaps of 50ms
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+class RegistrationCounterTests(TestCase):
+    """Dashboard counters maintained alongside registrations"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.debate = Event.objects.create(event_name='Debate', category='LITERARY')
+        cls.chess = Event.objects.create(event_name='Chess', category='GAMES')
+
+    def create(self, regd_no, **fields):
+        data = {
+            'name': 'Asha', 'email': 'asha@example.com', 'phone': '9876543210',
+            'regd_no': regd_no, 'branch': 'CSE', 'year': '1st Year', 'event': self.debate,
+        }
+        data.update(fields)
+        return StudentRegistration.objects.create(**data)
+
+    def assertCountersMatchTable(self):
+        expected = {
+            'total': StudentRegistration.objects.count(),
+            'branches': StudentRegistration.objects.values('branch').distinct().count(),
+            'events': StudentRegistration.objects.values('event').distinct().count(),
+            'today': StudentRegistration.objects.count(),
+        }
+        self.assertEqual(counters.dashboard_stats(), expected)
+
+    def test_create_edit_and_delete(self):
+        first = self.create('NIT1')
+        self.create('NIT2', branch='EE')
+        self.assertCountersMatchTable()
+
+        # Moving a registration to another event moves it between buckets
+        first = StudentRegistration.objects.get(pk=first.pk)
+        first.event = self.chess
+        first.save()
+        self.assertEqual(counters.breakdown('event'), {'Chess': 1, 'Debate': 1})
+
+        first.delete()
+        self.assertEqual(counters.breakdown('event'), {'Debate': 1})
+        self.assertCountersMatchTable()
+
+    @override_settings(REGISTRATION_INGESTION='buffered')
+    def test_bulk_ingestion_is_counted(self):
+        invalidate_catalog()
+        for i in range(4):
+            self.client.post(reverse('register'), registration_form(self.debate, regd_no=f'NIT{i}'))
+        flush_pending_registrations()
+
+        self.assertEqual(RegistrationCounter.objects.get().count, 4)
+        self.assertCountersMatchTable()
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.create('NIT1')
+        self.create('NIT2', event=self.chess, year='2nd Year')
+        incremental = set(RegistrationCounter.objects.values_list('event', 'branch', 'year', 'day', 'count'))
+
+        RegistrationCounter.objects.update(count=0)
+        call_command('rebuild_registration_counters', stdout=StringIO())
+        rebuilt = set(RegistrationCounter.objects.values_list('event', 'branch', 'year', 'day', 'count'))
+        self.assertEqual(rebuilt, incremental)
+
+    def assertParticipantCounts(self, debate, chess):
+        counts = dict(Event.objects.values_list('event_name', 'participants_count'))
+        self.assertEqual((counts['Debate'], counts['Chess']), (debate, chess))
+
+    def test_event_participant_counts(self):
+        stale = Event.objects.get(pk=self.debate.pk)
+        first = self.create('NIT1')
+        self.create('NIT2')
+        self.assertParticipantCounts(2, 0)
+
+        first = StudentRegistration.objects.get(pk=first.pk)
+        first.event = self.chess
+        first.save()
+        self.assertParticipantCounts(1, 1)
+
+        # Saving an event loaded before the registrations doesn't reset its count
+        stale.event_name = 'Debate'
+        stale.save()
+        first.delete()
+        self.assertParticipantCounts(1, 0)
+
+    @override_settings(REGISTRATION_INGESTION='buffered')
+    def test_bulk_ingestion_updates_participant_counts(self):
+        invalidate_catalog()
+        for i in range(3):
+            self.client.post(reverse('register'), registration_form(self.chess, regd_no=f'NIT{i}'))
+        flush_pending_registrations()
+        self.assertParticipantCounts(0, 3)
+
+    def test_reconcile_participant_counts(self):
+        self.create('NIT1')
+        self.create('NIT2', event=self.chess)
+        Event.objects.filter(pk=self.debate.pk).update(participants_count=7)
+
+        out = StringIO()
+        call_command('reconcile_participant_counts', '--dry-run', stdout=out)
+        self.assertIn('Debate: stored 7, actual 1', out.getvalue())
+        self.assertParticipantCounts(7, 1)
+
+        with self.assertNumQueries(5):
+            # Lock the events, one grouped count, one fix (plus savepoints)
+            drift = counters.reconcile_participant_counts()
+        self.assertEqual(drift, {self.debate.pk: (7, 1)})
+        self.assertParticipantCounts(1, 1)
+        self.assertEqual(counters.reconcile_participant_counts(), {})
+
+    def test_stats_read_is_independent_of_table_size(self):
+        for i in range(20):
+            self.create(f'NIT{i}', branch='CSE' if i % 2 else 'EE')
+
+        # One aggregate over the counters plus one for today's total
+        with self.assertNumQueries(2):
+            stats = counters.dashboard_stats()
+        self.assertEqual(stats['total'], 20)
+
+
+class EventCapacityTests(TestCase):
+    """Seat limits and the waitlist"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.debate = Event.objects.create(event_name='Debate', category='LITERARY', capacity=1)
+        cls.chess = Event.objects.create(event_name='Chess', category='GAMES')
+
+    def setUp(self):
+        invalidate_catalog()
+
+    def register(self, regd_no, event=None):
+        return self.client.post(reverse('register'), registration_form(event or self.debate, regd_no=regd_no))
+
+    def waiting(self):
+        return list(
+            WaitlistEntry.objects.filter(status=WaitlistEntry.STATUS_WAITING).values_list('regd_no', flat=True)
+        )
+
+    def test_full_event_puts_student_on_waitlist(self):
+        self.assertContains(self.register('NIT1'), 'Registration Successful')
+        self.register('NIT2')
+        response = self.register('NIT3')
+
+        self.assertContains(response, 'on the Waitlist')
+        self.assertEqual(response.context['waitlist_position'], 2)
+        self.assertEqual(list(StudentRegistration.objects.values_list('regd_no', flat=True)), ['NIT1'])
+        self.assertEqual(Event.objects.get(pk=self.debate.pk).participants_count, 1)
+        self.assertEqual(self.waiting(), ['NIT2', 'NIT3'])
+
+        # Asking again keeps the same place
+        self.register('NIT2')
+        self.assertEqual(self.waiting(), ['NIT2', 'NIT3'])
+
+    def test_deleting_a_registration_promotes_the_oldest_waiting(self):
+        for regd_no in ('NIT1', 'NIT2', 'NIT3'):
+            self.register(regd_no)
+
+        StudentRegistration.objects.get(regd_no='NIT1').delete()
+
+        promoted = StudentRegistration.objects.get()
+        self.assertEqual(promoted.regd_no, 'NIT2')
+        self.assertEqual(promoted.waitlist_entry.status, WaitlistEntry.STATUS_PROMOTED)
+        self.assertTrue(ConfirmationEmail.objects.filter(registration=promoted).exists())
+        self.assertEqual(Event.objects.get(pk=self.debate.pk).participants_count, 1)
+        self.assertEqual(self.waiting(), ['NIT3'])
+
+    def test_moving_a_registration_frees_its_seat(self):
+        self.register('NIT1')
+        self.register('NIT2')
+
+        moved = StudentRegistration.objects.get(regd_no='NIT1')
+        moved.event = self.chess
+        moved.save()
+
+        self.assertEqual(StudentRegistration.objects.get(event=self.debate).regd_no, 'NIT2')
+        self.assertEqual(self.waiting(), [])
+
+    def test_raising_the_capacity_promotes(self):
+        for regd_no in ('NIT1', 'NIT2', 'NIT3', 'NIT4'):
+            self.register(regd_no)
+
+        event = Event.objects.get(pk=self.debate.pk)
+        event.capacity = 3
+        event.save()
+
+        self.assertEqual(Event.objects.get(pk=self.debate.pk).participants_count, 3)
+        self.assertEqual(self.waiting(), ['NIT4'])
+
+    def test_seat_is_reserved_before_the_row_is_inserted(self):
+        # The INSERT's foreign key check share-locks the event row; updating the
+        # row after it deadlocks concurrent registrations on InnoDB
+        with CaptureQueriesContext(connection) as queries:
+            self.register('NIT1')
+        statements = [query['sql'] for query in queries.captured_queries]
+
+        def first(prefix):
+            return next(i for i, sql in enumerate(statements) if sql.startswith(prefix))
+
+        self.assertLess(
+            first(f'UPDATE "{Event._meta.db_table}"'),
+            first(f'INSERT INTO "{StudentRegistration._meta.db_table}"'),
+        )
+
+    def test_resubmitting_for_a_full_event_is_not_waitlisted(self):
+        self.register('NIT1')
+        response = self.register('NIT1')
+
+        self.assertContains(response, 'already registered')
+        self.assertEqual(self.waiting(), [])
+        self.assertEqual(Event.objects.get(pk=self.debate.pk).participants_count, 1)
+
+    def test_deleting_the_event_does_not_promote(self):
+        self.register('NIT1')
+        self.register('NIT2')
+        Event.objects.get(pk=self.debate.pk).delete()
+        self.assertFalse(StudentRegistration.objects.exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    @override_settings(REGISTRATION_INGESTION='buffered')
+    def test_buffered_submissions_beyond_capacity_wait(self):
+        for regd_no in ('NIT1', 'NIT2', 'NIT3'):
+            self.register(regd_no)
+        flush_pending_registrations()
+
+        statuses = dict(PendingRegistration.objects.values_list('regd_no', 'status'))
+        self.assertEqual(statuses, {
+            'NIT1': PendingRegistration.STATUS_REGISTERED,
+            'NIT2': PendingRegistration.STATUS_WAITLISTED,
+            'NIT3': PendingRegistration.STATUS_WAITLISTED,
+        })
+        self.assertEqual(self.waiting(), ['NIT2', 'NIT3'])
+        self.assertEqual(ConfirmationEmail.objects.count(), 1)
+
+
+class SeatReservationConcurrencyTests(TransactionTestCase):
+    """
+    Parallel submissions for the last seats
+
+    Only PostgreSQL and MySQL run these side by side: a deadlock or lock
+    timeout there fails the test. The SQLite test database locks whole
+    tables, so it serialises the writes and only checks the seat accounting,
+    not hundreds of parallel submissions.
+    """
+
+    CAPACITY = 20
+    SUBMISSIONS = 200
+
+    def submit(self, event, number):
+        client = Client()
+        data = registration_form(event, regd_no=f'NIT{number:04d}', email=f's{number}@example.com')
+        try:
+            while True:
+                try:
+                    return client.post(reverse('register'), data)
+                except OperationalError:
+                    if connection.vendor != 'sqlite':
+                        raise
+                    # "table is locked" from the shared SQLite test database - try again
+                    time.sleep(random.uniform(0.001, 0.02))
+        finally:
+            connection.close()
+
+    def test_no_overbooking(self):
+        event = Event.objects.create(event_name='Debate', category='LITERARY', capacity=self.CAPACITY)
+        invalidate_catalog()
+
+        # Beyond a few threads the SQLite retries only thrash
+        workers = 4 if connection.vendor == 'sqlite' else 32
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            responses = list(pool.map(lambda number: self.submit(event, number), range(self.SUBMISSIONS)))
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        registered = set(StudentRegistration.objects.values_list('regd_no', flat=True))
+        waiting = set(
+            WaitlistEntry.objects.filter(status=WaitlistEntry.STATUS_WAITING).values_list('regd_no', flat=True)
+        )
+        self.assertEqual(len(registered), self.CAPACITY)
+        self.assertEqual(Event.objects.get(pk=event.pk).participants_count, self.CAPACITY)
+        # Everyone else is on the waitlist, once
+        self.assertEqual(WaitlistEntry.objects.count(), self.SUBMISSIONS - self.CAPACITY)
+        self.assertFalse(registered & waiting)
+        self.assertEqual(len(registered | waiting), self.SUBMISSIONS)
+
+
+class ParticipantSearchTests(TestCase):
+    """Full-text participant search shared by the dashboard and the export"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.debate = Event.objects.create(event_name='Debate', category='LITERARY')
+        cls.chess = Event.objects.create(event_name='Chess', category='GAMES')
+        people = [
+            ('Asha Verma', 'asha@example.com', '9876543210', 'NIT2024001', 'CSE', cls.debate),
+            ('Rahul Das', 'rahul@college.edu', '9123456780', 'NIT2023117', 'EE', cls.chess),
+            ('Asif Khan', 'asif@example.com', '9988776655', 'MBA2022005', 'MBA', cls.chess),
+        ]
+        for name, email, phone, regd_no, branch, event in people:
+            StudentRegistration.objects.create(
+                name=name, email=email, phone=phone, regd_no=regd_no, branch=branch, year='1st Year', event=event
+            )
+
+    def setUp(self):
+        invalidate_catalog()
+
+    def matches(self, search):
+        return set(
+            StudentRegistration.objects.filter(search_filter(search)).values_list('regd_no', flat=True)
+        )
+
+    def test_prefix_matches(self):
+        self.assertEqual(self.matches('NIT2024'), {'NIT2024001'})
+        self.assertEqual(self.matches('99887'), {'MBA2022005'})
+        self.assertEqual(self.matches('as'), {'NIT2024001', 'MBA2022005'})
+        self.assertEqual(self.matches('chess'), {'NIT2023117', 'MBA2022005'})
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.matches('asha example'), {'NIT2024001'})
+        self.assertEqual(self.matches('rahul@college.edu'), {'NIT2023117'})
+        self.assertEqual(self.matches('rahul debate'), set())
+        self.assertIsNone(search_filter(' "*- '))
+
+    def test_index_follows_writes(self):
+        registration = StudentRegistration.objects.get(regd_no='NIT2023117')
+        registration.name = 'Rohan Das'
+        registration.phone = '9000000001'
+        registration.save()
+        self.assertEqual(self.matches('rohan'), {'NIT2023117'})
+        self.assertEqual(self.matches('91234'), set())
+
+        self.chess.event_name = 'Quiz'
+        self.chess.save()
+        self.assertEqual(self.matches('quiz'), {'NIT2023117', 'MBA2022005'})
+
+        registration.delete()
+        self.assertEqual(self.matches('rohan'), set())
+
+    def test_only_a_rename_reindexes(self):
+        event = Event.objects.get(pk=self.chess.pk)
+        event.category = 'SPORTS'
+        event.capacity = 10
+        with CaptureQueriesContext(connection) as queries:
+            event.save()
+        self.assertFalse([query for query in queries if 'participantsearch' in query['sql'].lower()])
+
+        event.event_name = 'Quiz'
+        event.save()
+        self.assertEqual(self.matches('quiz'), {'NIT2023117', 'MBA2022005'})
+
+    def test_new_registration_takes_event_name_from_catalog(self):
+        get_events_by_category()
+        with CaptureQueriesContext(connection) as queries:
+            StudentRegistration.objects.create(
+                name='Meera', email='meera@example.com', phone='9000000002', regd_no='NIT2024050',
+                branch='CSE', year='1st Year', event_id=self.debate.pk,
+            )
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT') and 'home_event' in query['sql'].lower()
+        ])
+        self.assertEqual(self.matches('meera debate'), {'NIT2024050'})
+
+    def test_rebuild_command(self):
+        ParticipantSearch.objects.all().delete()
+        self.assertEqual(self.matches('asha'), set())
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.matches('asha'), {'NIT2024001'})
+
+    def test_search_uses_full_text_index(self):
+        sql = str(StudentRegistration.objects.filter(search_filter('asha')).query)
+        self.assertNotIn('LIKE', sql)
+
+
+class NoticeFeedTests(TestCase):
+    """Cursor-paged notices with excerpts and conditional GET"""
+
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=1)
+        cls.notices = []
+        for i in range(8):
+            notice = Announcment.objects.create(title=f'Notice {i}', content=f'Body {i}. ' + 'More detail. ' * 40)
+            # Distinct, ordered creation times
+            Announcment.objects.filter(pk=notice.pk).update(created_at=start + timedelta(minutes=i))
+            cls.notices.append(notice)
+
+    def setUp(self):
+        invalidate_pages(NOTICES)
+
+    def test_pages_follow_the_cursor_without_loading_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(reverse('notices_api'), {'limit': 5}).json()
+        self.assertFalse(any('"content"' in query['sql'] for query in queries))
+        self.assertEqual([n['title'] for n in first['notices']], [f'Notice {i}' for i in range(7, 2, -1)])
+
+        second = self.client.get(reverse('notices_api'), {'limit': 5, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([n['title'] for n in second['notices']], ['Notice 2', 'Notice 1', 'Notice 0'])
+        self.assertIsNone(second['next_cursor'])
+
+        self.assertEqual(self.client.get(reverse('notices_api'), {'cursor': 'bogus'}).status_code, 400)
+
+    def test_page_shows_excerpts_and_load_more(self):
+        response = self.client.get(reverse('notices'))
+        self.assertContains(response, 'Notice 7')
+        self.assertNotContains(response, 'Notice 1<')
+        self.assertContains(response, 'id="loadMore"')
+        self.assertContains(response, 'class="read-more"', count=6)
+
+        cursor = response.context['next_cursor']
+        self.assertContains(self.client.get(reverse('notices'), {'cursor': cursor}), 'Notice 1')
+
+    def test_excerpt_and_full_text(self):
+        notice = self.notices[0]
+        self.assertTrue(notice.excerpt_truncated)
+        self.assertLessEqual(len(notice.excerpt), Announcment.EXCERPT_LENGTH)
+        data = self.client.get(reverse('notice_detail_api', args=[notice.pk])).json()
+        self.assertEqual(data['notice']['content'], notice.content)
+
+        notice.content = 'Short'
+        notice.save(update_fields=['content'])
+        notice.refresh_from_db()
+        self.assertEqual(notice.excerpt, 'Short')
+
+    def test_unchanged_notices_revalidate_with_304(self):
+        first = self.client.get(reverse('notices'))
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('notices'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(reverse('notices_api'), headers={'If-Modified-Since': first['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        # Deleting an older notice leaves the newest updated_at alone but still changes the ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notices[0].delete()
+        response = self.client.get(reverse('notices'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+
+@override_settings(LIVE_POLL_INTERVAL=0.01)
+class LiveUpdatesTests(TestCase):
+    """Server-Sent Events for result and notice changes"""
+
+    def setUp(self):
+        cache.delete(live.SEQUENCE_KEY)
+
+    def test_changes_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notice = Announcment.objects.create(title='Finals moved', content='To the main stage')
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.create(
+                winner='Ravi', branch='CSE', position='1st', game='Chess', photo='results/ravi.jpg',
+                photo_derivatives={'source': 'results/ravi.jpg'},
+            )
+
+        events = async_to_sync(live.aget_events)(0, cache.get(live.SEQUENCE_KEY))
+        self.assertEqual([event['event'] for event in events], ['notice', 'result'])
+        self.assertEqual(events[0]['data']['title'], 'Finals moved')
+        self.assertEqual(events[0]['data']['id'], notice.pk)
+        self.assertEqual(events[1]['data']['winner'], 'Ravi')
+
+    async def test_broadcaster_fans_out_to_every_subscriber(self):
+        broadcaster = live.Broadcaster()
+        queues = [broadcaster.subscribe() for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        event_id = live.publish('result', {'id': 1})
+        for queue in queues:
+            event = await asyncio.wait_for(queue.get(), 1)
+            self.assertEqual(event['id'], event_id)
+
+        for queue in queues:
+            broadcaster.unsubscribe(queue)
+        await asyncio.wait_for(broadcaster._task, 1)
+
+    async def test_slow_clients_are_dropped(self):
+        broadcaster = live.Broadcaster()
+        queue = broadcaster.subscribe()
+        for event_id in range(live.CLIENT_QUEUE_SIZE + 1):
+            broadcaster.fan_out({'id': event_id, 'event': 'notice', 'data': {}})
+        self.assertTrue(queue.dropped)
+        self.assertNotIn(queue, broadcaster.subscribers)
+        await asyncio.wait_for(broadcaster._task, 1)
+
+    async def test_stream_replays_missed_events_then_pushes_new_ones(self):
+        first = live.publish('notice', {'id': 1})
+        live.publish('notice', {'id': 2})
+
+        stream = live.event_stream(last_event_id=str(first))
+        try:
+            self.assertTrue((await anext(stream)).startswith('retry:'))
+            self.assertIn('"id": 2', await anext(stream))
+
+            live.publish('result', {'id': 3})
+            pushed = await asyncio.wait_for(anext(stream), 1)
+            self.assertTrue(pushed.startswith(f'id: {first + 2}\nevent: result\n'))
+        finally:
+            await stream.aclose()
+
+    @override_settings(LIVE_STREAM_MAX_AGE=0)
+    async def test_view(self):
+        response = await self.async_client.get(reverse('live_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual(body, f'retry: {live.RETRY_MS}\n\n')
+
+
+@override_settings(DATABASE_REPLICA='replica')
+class ReplicaRoutingTests(TestCase):
+    """Routing public reads to the replica, with read-your-writes pinning"""
+
+    def setUp(self):
+        cache.delete(db_routing.HOLD_KEY)
+        self.router = db_routing.ReplicaRouter()
+
+    def route(self, method='get', cookies=None, public=True, write=False):
+        """
+        Run a view behind the pinning middleware; return (read alias, response)
+        """
+        routed = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Result)
+            routed.append(self.router.db_for_read(Result))
+            return HttpResponse()
+
+        if public:
+            view = db_routing.read_replica(view)
+        request = RequestFactory().generic(method.upper(), '/')
+        request.COOKIES.update(cookies or {})
+        response = db_routing.ReplicaPinningMiddleware(view)(request)
+        return routed[0], response
+
+    def test_only_decorated_safe_requests_use_the_replica(self):
+        self.assertEqual(self.route()[0], 'replica')
+        self.assertIsNone(self.route(method='post')[0])
+        self.assertIsNone(self.route(public=False)[0])
+
+    def test_write_pins_the_client_to_the_primary(self):
+        routed, response = self.route(write=True)
+        self.assertIsNone(routed)
+        pin = response.cookies[db_routing.PIN_COOKIE]
+
+        self.assertIsNone(self.route(cookies={db_routing.PIN_COOKIE: pin.value})[0])
+        self.assertEqual(self.route(cookies={db_routing.PIN_COOKIE: '0'})[0], 'replica')
+
+    def test_invalidation_holds_the_replica(self):
+        invalidate_pages(RESULTS)
+        self.assertIsNone(self.route()[0])
+
+    def test_async_views_route_in_orm_threads(self):
+        @db_routing.read_replica
+        async def public(request):
+            return HttpResponse(await sync_to_async(self.router.db_for_read)(Result))
+
+        middleware = db_routing.ReplicaPinningMiddleware(public)
+        response = async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'replica')
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'Home'))
+        self.assertIsNone(self.router.allow_migrate('default', 'Home'))
+
+    @override_settings(DATABASE_REPLICA=None)
+    def test_no_replica_configured(self):
+        routed, response = self.route(write=True)
+        self.assertIsNone(routed)
+        self.assertNotIn(db_routing.PIN_COOKIE, response.cookies)
+
+
+job_calls = []
+
+
+@jobs.task(name='tests.record')
+def record_call(label):
+    job_calls.append(label)
+    return label
+
+
+@jobs.task(name='tests.fail', max_attempts=2)
+def failing_task():
+    raise RuntimeError("boom")
+
+
+class BackgroundJobTests(TestCase):
+    """Database-backed job queue"""
+
+    def setUp(self):
+        job_calls.clear()
+
+    def test_jobs_run_by_priority(self):
+        jobs.enqueue(record_call, label='low')
+        jobs.enqueue(record_call, label='high', priority=5)
+        jobs.enqueue(record_call, label='later', delay=60)
+
+        self.assertEqual(jobs.run_pending(), 2)
+        self.assertEqual(job_calls, ['high', 'low'])
+        done = Job.objects.get(kwargs__label='high')
+        self.assertEqual((done.status, done.result, done.attempts), (Job.STATUS_DONE, 'high', 1))
+        self.assertEqual(Job.objects.get(kwargs__label='later').status, Job.STATUS_QUEUED)
+
+    def test_failures_are_retried_then_kept(self):
+        job = jobs.enqueue(failing_task)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('RuntimeError: boom', job.error)
+
+        # Nothing is due until the backoff passes
+        self.assertEqual(jobs.run_pending(), 0)
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_expired_lock_is_taken_over(self):
+        job = jobs.enqueue(record_call, label='crashed')
+        claimed, = jobs.claim_jobs('dead-worker', 5)
+        self.assertEqual(jobs.claim_jobs('other', 5), [])
+
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.run_pending('other'), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (Job.STATUS_DONE, 'other', 2))
+
+        # The first worker finishing late doesn't overwrite the result
+        jobs.run_job(claimed)
+        self.assertEqual(job_calls, ['crashed', 'crashed'])
+        self.assertEqual(Job.objects.get(pk=job.pk).worker, 'other')
+
+    def test_unregistered_functions_are_refused(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue(len)
+
+
+class JobWorkerCommandTests(TransactionTestCase):
+    """run_jobs drains the queue from a thread pool"""
+
+    def test_burst_run(self):
+        job_calls.clear()
+        for label in range(5):
+            jobs.enqueue(record_call, label=label)
+
+        out = StringIO()
+        # One pool thread at a time - the SQLite test database locks whole tables on write
+        call_command('run_jobs', '--burst', '--concurrency', '1', '--interval', '0.05', stdout=out)
+        self.assertIn('5 jobs run', out.getvalue())
+        self.assertEqual(sorted(job_calls), [0, 1, 2, 3, 4])
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_DONE).count(), 5)
+
+
+class BenchmarkTests(TestCase):
+    """Smoke test for the endpoint benchmark helpers"""
+
+    def test_seed_and_run(self):
+        benchmark.seed(30)
+        self.assertEqual(StudentRegistration.objects.count(), 30)
+        # Every seeded event is offered on the register page
+        invalidate_catalog()
+        catalog = get_events_by_category()
+        self.assertEqual(sum(len(events) for events in catalog.values()), len(benchmark.EVENT_NAMES))
+        self.assertEqual(FeaturedSlot.objects.count(), FeaturedSlot.MAX_SLOTS)
+
+        user = benchmark.benchmark_user()
+        endpoints = {endpoint.name: endpoint for endpoint in benchmark.ENDPOINTS}
+        for name in ('register', 'home', 'participants_data', 'export_participants'):
+            numbers = benchmark.run_endpoint(endpoints[name], user, requests=3, concurrency=1).as_dict()
+            self.assertEqual(numbers['errors'], 0, name)
+            self.assertIsNotNone(numbers['latency_ms']['p95'])
+
+        self.assertEqual(StudentRegistration.objects.count(), 35)
+
+    def test_asgi_run(self):
+        benchmark.seed(10)
+        user = benchmark.benchmark_user()
+        endpoints = {endpoint.name: endpoint for endpoint in benchmark.ENDPOINTS}
+        for name in ('home', 'notices', 'participants_data'):
+            result = async_to_sync(benchmark.arun_endpoint)(endpoints[name], user, requests=4, concurrency=2)
+            self.assertEqual(result.errors, 0, name)
+            self.assertEqual(len(result.latencies), 4)
+
+    def test_percentiles_and_compare(self):
+        self.assertEqual(benchmark.percentile_ms([0.001, 0.002, 0.003, 0.004], 50), 2.0)
+        self.assertEqual(benchmark.percentile_ms([0.001, 0.002, 0.003, 0.004], 99), 4.0)
+
+        before = {'100': {'home': {'latency_ms': {'p50': 2.0, 'p95': 4.0}, 'throughput_rps': 100, 'queries_cold': 2}}}
+        after = {'100': {'home': {'latency_ms': {'p50': 1.0, 'p95': 4.0}, 'throughput_rps': 150, 'queries_cold': 1}}}
+        changes = {metric: change for size, name, metric, old, new, change in benchmark.compare(before, after)}
+        self.assertEqual(changes, {'p50_ms': -50.0, 'p95_ms': 0.0, 'throughput_rps': 50.0, 'queries_cold': -50.0})
+
+
+class QueryPlanTests(TestCase):
+    """
+    Every view's main query must be answered from an index, not a table scan,
+    on a dataset the size of a full registration season
+    """
+    REGISTRATIONS = 100_000
+    RESULTS = 20_000
+    ANNOUNCEMENTS = 20_000
+
+    @classmethod
+    def setUpTestData(cls):
+        events = Event.objects.bulk_create([
+            Event(event_name=f'Event {i}', category=Event.CATEGORY_CHOICES[i % 5][0])
+            for i in range(40)
+        ])
+        branches = [code for code, _ in StudentRegistration.BRANCH_CHOICES]
+        StudentRegistration.objects.bulk_create((
+            StudentRegistration(
+                name=f'Student {i}', email=f's{i}@example.com', phone=f'9{i:09d}',
+                regd_no=f'REG{i:07d}', branch=branches[i % len(branches)], year='1st Year',
+                event=events[i % len(events)],
+            )
+            for i in range(cls.REGISTRATIONS)
+        ), batch_size=5000)
+        Result.objects.bulk_create((
+            Result(
+                winner=f'Winner {i}', branch='CSE', game=f'Game {i % 40}', photo='results/x.jpg',
+                position=('1st', '2nd', '3rd')[i % 3], featured=i < 3,
+            )
+            for i in range(cls.RESULTS)
+        ), batch_size=5000)
+        Announcment.objects.bulk_create((
+            Announcment(title=f'Notice {i}', content='Body')
+            for i in range(cls.ANNOUNCEMENTS)
+        ), batch_size=5000)
+
+    def full_table_scans(self, queryset, table):
+        if connection.vendor == 'mysql':
+            plan = json.loads(queryset.explain(format='JSON'))
+            scans = []
+
+            def walk(node):
+                if isinstance(node, dict):
+                    if node.get('table_name') == table and node.get('access_type') == 'ALL':
+                        scans.append(node)
+                    for value in node.values():
+                        walk(value)
+                elif isinstance(node, list):
+                    for value in node:
+                        walk(value)
+
+            walk(plan)
+            return scans
+
+        plan = queryset.explain()
+        return [
+            line for line in plan.splitlines()
+            if table in line and 'SCAN' in line and 'INDEX' not in line
+        ]
+
+    def assertUsesIndex(self, queryset, model):
+        table = model._meta.db_table
+        scans = self.full_table_scans(queryset, table)
+        self.assertEqual(scans, [], f"{table} is scanned without an index:\n{queryset.explain()}")
+
+    def test_dashboard_listing(self):
+        since = timezone.now() - timedelta(days=1)
+        listing = StudentRegistration.objects.order_by('-registered_at', '-id').values('id', 'name')
+        self.assertUsesIndex(listing[:51], StudentRegistration)
+        self.assertUsesIndex(listing.filter(registered_at__lt=since)[:51], StudentRegistration)
+        self.assertUsesIndex(listing.filter(branch='CSE')[:51], StudentRegistration)
+        self.assertUsesIndex(listing.filter(event__event_name='Event 3')[:51], StudentRegistration)
+
+    def test_export_chunks(self):
+        chunk = StudentRegistration.objects.order_by('-id').filter(id__lt=50_000).values_list('id', 'name')
+        self.assertUsesIndex(chunk[:2000], StudentRegistration)
+
+    def test_duplicate_regd_no_check(self):
+        self.assertUsesIndex(StudentRegistration.objects.filter(regd_no='REG0001234'), StudentRegistration)
+
+    def test_featured_winners(self):
+        for slot, result in enumerate(Result.objects.filter(featured=True), start=1):
+            FeaturedSlot.objects.create(slot=slot, result=result)
+        # The slot table never holds more than MAX_SLOTS rows; results are fetched by primary key
+        self.assertUsesIndex(FeaturedSlot.objects.select_related('result').order_by('-result_id'), Result)
+
+    def test_winners_by_position(self):
+        self.assertUsesIndex(Result.objects.filter(position='1st').order_by('-created_at'), Result)
+
+    def test_latest_notices(self):
+        self.assertUsesIndex(Announcment.objects.order_by('-created_at')[:6], Announcment)
+
+
+class ServeMediaTests(TestCase):
+    """Media downloads with conditional requests, ranges and offloading"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_PUBLIC_DIRS=['announcements/'])
+        self.settings_override.enable()
+        os.makedirs(os.path.join(self.media_root, 'announcements'))
+        os.makedirs(os.path.join(self.media_root, 'private'))
+        self.body = bytes(range(256)) * 40
+        for folder in ('announcements', 'private'):
+            with open(os.path.join(self.media_root, folder, 'circular.pdf'), 'wb') as f:
+                f.write(self.body)
+        self.url = reverse('media', args=['announcements/circular.pdf'])
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_byte_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.body)}')
+        self.assertEqual(b''.join(response.streaming_content), self.body[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_sends_full_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_offloaded_to_web_server(self):
+        with self.settings(MEDIA_SERVING='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/announcements/circular.pdf')
+        self.assertEqual(response.content, b'')
+
+        with self.settings(MEDIA_SERVING='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, 'announcements', 'circular.pdf'))
+
+    def test_private_files_need_staff(self):
+        url = reverse('media', args=['private/circular.pdf'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_path_traversal(self):
+        response = self.client.get(reverse('media', args=['../manage.py']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_traversal_out_of_public_dir_needs_staff(self):
+        for path in ('/media/announcements/../private/circular.pdf', '/media/announcements/%2e%2e/private/circular.pdf'):
+            self.assertEqual(self.client.get(path).status_code, 404, path)
+        self.client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        response = self.client.get('/media/announcements/../private/circular.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
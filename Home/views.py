@@ -1,11 +1,28 @@
 # Home/views.py
+import os
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.cache import never_cache
-from .models import Event, StudentRegistration
-from Admin.models import Result  # IMPORT FROM ADMIN APP
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.db import IntegrityError, transaction
+from .models import StudentRegistration, PendingRegistration
+from .catalog import get_event, get_events_by_category
+from .confirmations import queue_confirmations
+from .db_routing import read_replica
+from . import live, notices
+from .notices import conditional_notices
+from .media import file_response
+from .page_cache import NOTICES, RESULTS, cache_public_page
+from .ingestion import buffered_ingestion_enabled, enqueue_registration
+from .waitlist import EventFull, join_waitlist, waitlist_position
+from .idempotency import idempotent_submission, mark_succeeded, new_token
+from Admin.models import FeaturedSlot, Result  # IMPORT FROM ADMIN APP
 
 def home_view(request):
     # Latest 3 winners who are in 1st position
@@ -32,19 +49,25 @@ def admin_login_view(request):
     
     return render(request, "admin_login.html")
 
-def about_view(request):
+# Public read-only pages are async so slow clients don't each hold a worker
+# thread under ASGI (see exoticaa/asgi.py); the templates they render touch
+# neither the session nor the database.
+async def about_view(request):
     return render(request, 'about.html')
 
-def test_static(request):
+async def test_static(request):
     return render(request, 'test_static.html')
 
+def render_registration_form(request, events_by_category):
+    # Each rendering gets its own token, so only resubmitting this exact form is a replay
+    context = {'events_by_category': events_by_category, 'submission_token': new_token()}
+    return render(request, 'register.html', context)
+
+@idempotent_submission
+@read_replica
 def register(request):
-    # Get all events grouped by category
-    events_by_category = {}
-    for category_code, category_name in Event.CATEGORY_CHOICES:
-        events = Event.objects.filter(category=category_code).order_by('event_name')
-        if events.exists():
-            events_by_category[category_name] = events
+    # Get all events grouped by category (cached, see Home/catalog.py)
+    events_by_category = get_events_by_category()
     
     if request.method == 'POST':
         # Get form data
@@ -60,62 +83,134 @@ def register(request):
         required_fields = [name, email, phone, regd_no, branch, year, event_id]
         if not all(required_fields):
             messages.error(request, "All fields are required!")
-            return render(request, 'register.html', {'events_by_category': events_by_category})
+            return render_registration_form(request, events_by_category)
         
-        try:
-            event = Event.objects.get(id=event_id)
-            
-            # Save to database
-            registration = StudentRegistration(
-                name=name,
-                email=email,
-                phone=phone,
-                regd_no=regd_no,
-                branch=branch,
-                year=year,
-                event=event
-            )
-            registration.save()
+        event = get_event(event_id)
+        if event is None:
+            messages.error(request, "Invalid event selected!")
+            return render_registration_form(request, events_by_category)
+        
+        if buffered_ingestion_enabled():
+            # Queue the submission - process_registrations writes it in a batch
+            pending = enqueue_registration({
+                'name': name,
+                'email': email,
+                'phone': phone,
+                'regd_no': regd_no,
+                'branch': branch,
+                'year': year,
+                'event_id': event['id'],
+            })
             
-            # Prepare context for success page
             success_context = {
                 'student_name': name,
-                'event_name': event.event_name,
+                'event_name': event['event_name'],
                 'regd_no': regd_no,
-                'branch': registration.get_branch_display(),
+                'branch': pending.get_branch_display(),
                 'year': year,
                 'email': email,
                 'phone': phone,
-                'registration_id': registration.id,
-                'registered_at': registration.registered_at,
+                'reference': pending.reference,
+                'registered_at': pending.created_at,
             }
-            
-            # Render the success page with context
-            return render(request, 'registration_successfull.html', success_context)
-            
-        except Event.DoesNotExist:
-            messages.error(request, "Invalid event selected!")
-            return render(request, 'register.html', {'events_by_category': events_by_category})
+            return mark_succeeded(render(request, 'registration_successfull.html', success_context))
+        
+        # Save to database
+        registration = StudentRegistration(
+            name=name,
+            email=email,
+            phone=phone,
+            regd_no=regd_no,
+            branch=branch,
+            year=year,
+            event_id=event['id'],
+        )
+        try:
+            with transaction.atomic():
+                registration.save()
+                # Only an outbox row here - the mail goes out from a background job
+                queue_confirmations([registration])
+        except EventFull:
+            # No seat left - keep the student's place in the queue instead
+            entry = join_waitlist(
+                event['id'], name=name, email=email, phone=phone, regd_no=regd_no, branch=branch, year=year,
+            )
+            waitlist_context = {
+                'student_name': name,
+                'event_name': event['event_name'],
+                'regd_no': regd_no,
+                'branch': entry.get_branch_display(),
+                'year': year,
+                'email': email,
+                'phone': phone,
+                'waitlisted': True,
+                'waitlist_position': waitlist_position(entry),
+            }
+            return mark_succeeded(render(request, 'registration_successfull.html', waitlist_context))
+        except IntegrityError:
+            messages.error(request, f"Registration number {regd_no} is already registered for {event['event_name']}!")
+            return render_registration_form(request, events_by_category)
+        
+        # Prepare context for success page
+        success_context = {
+            'student_name': name,
+            'event_name': event['event_name'],
+            'regd_no': regd_no,
+            'branch': registration.get_branch_display(),
+            'year': year,
+            'email': email,
+            'phone': phone,
+            'registration_id': registration.id,
+            'registered_at': registration.registered_at,
+        }
+        
+        # Render the success page with context (replayed for repeated submissions)
+        return mark_succeeded(render(request, 'registration_successfull.html', success_context))
     
     # GET request - show registration form
-    return render(request, 'register.html', {'events_by_category': events_by_category})
+    return render_registration_form(request, events_by_category)
+
+def registration_status(request, reference):
+    """
+    Status of a queued registration submission, looked up by its reference
+    """
+    pending = (
+        PendingRegistration.objects
+        .filter(reference=reference)
+        .values('status', 'registration_id', 'error')
+        .first()
+    )
+    if pending is None:
+        return JsonResponse({'success': False, 'error': 'Unknown registration reference'}, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'reference': reference,
+        'status': pending['status'],
+        'registration_id': pending['registration_id'],
+        'error': pending['error'],
+    })
 
-def event_view(request):
+async def event_view(request):
     return render(request, 'events.html')
 
-def mr_miss_nit_view(request):
+async def mr_miss_nit_view(request):
     return render(request, 'mr-miss-nit.html')
 
-def home_view(request):
+@cache_public_page(RESULTS)
+@read_replica
+async def home_view(request):
     # Show ONLY 3 featured winners (admin selects which ones)
-    winners = Result.objects.filter(featured=True).order_by('-id')[:3]
+    winners = await FeaturedSlot.afeatured_results()
     
     context = {
         'winners': winners,
     }
     return render(request, 'index.html', context)
 
-def all_winners_view(request):
+@cache_public_page(RESULTS)
+@read_replica
+async def all_winners_view(request):
     # Get position filter from URL
     position_filter = request.GET.get('position', 'all')
     
@@ -126,16 +221,88 @@ def all_winners_view(request):
         winners = Result.objects.filter(position=position_filter).order_by('-created_at')
     
     context = {
-        'winners': winners,
+        # Evaluated here with the async ORM - the template must not run queries
+        'winners': [winner async for winner in winners],
         'current_filter': position_filter,
     }
     return render(request, 'all_winners.html', context)
 
-def notice_view(request):
-    from Admin.models import Announcment
-    announcements = Announcment.objects.all().order_by('-created_at')[:6]
-    # announcements = Announcment.objects.all().order_by('-created_at')[:5]
+@conditional_notices
+@cache_public_page(NOTICES)
+@read_replica
+async def notice_view(request):
+    # Excerpts only, newest first; "Load more" continues from the cursor
+    try:
+        announcements, next_cursor = await notices.anotice_page(request.GET.get('cursor'))
+    except notices.InvalidCursor:
+        announcements, next_cursor = await notices.anotice_page()
     context = {
         'announcements': announcements,
+        'next_cursor': next_cursor,
     }
-    return render(request, 'notice.html', context)
\ No newline at end of file
+    return render(request, 'notice.html', context)
+
+@conditional_notices
+@cache_public_page(NOTICES)
+@read_replica
+async def notices_api(request):
+    """
+    JSON notice feed: ?cursor= from the previous page's next_cursor, ?limit= up to 50
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', notices.NOTICE_PAGE_SIZE)), 1), notices.NOTICE_MAX_PAGE_SIZE)
+        page, next_cursor = await notices.anotice_page(request.GET.get('cursor'), limit)
+    except ValueError:
+        # Also covers InvalidCursor
+        return JsonResponse({'success': False, 'error': 'Invalid cursor or limit'}, status=400)
+    return JsonResponse({
+        'success': True,
+        'notices': [notices.notice_summary(notice) for notice in page],
+        'next_cursor': next_cursor,
+    })
+
+@cache_public_page(NOTICES)
+@read_replica
+async def notice_detail_api(request, notice_id):
+    """
+    One notice with its full content, for "Read more"
+    """
+    from Admin.models import Announcment
+    try:
+        notice = await Announcment.objects.aget(pk=notice_id)
+    except Announcment.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Notice not found'}, status=404)
+    return JsonResponse({'success': True, 'notice': {**notices.notice_summary(notice), 'content': notice.content}})
+
+async def live_events(request):
+    """
+    Server-Sent Events stream of result and notice changes (see Home/live.py)
+    """
+    stream = live.event_stream(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def serve_media(request, path):
+    """
+    Serve an uploaded file from MEDIA_ROOT. Files outside MEDIA_PUBLIC_DIRS
+    are only available to staff users.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+    
+    # Check the resolved name - "results/../exports/x.csv" is not a public file
+    name = os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+    is_public = name.startswith(tuple(getattr(settings, 'MEDIA_PUBLIC_DIRS', ())))
+    if not is_public and not request.user.is_staff:
+        raise Http404("File not found")
+    
+    cache_control = 'public, max-age=86400' if is_public else 'private, no-cache'
+    return file_response(request, full_path, name, cache_control=cache_control)
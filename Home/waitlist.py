@@ -0,0 +1,100 @@
+# Home/waitlist.py
+"""
+Event capacity and the waitlist
+
+An event with a capacity takes registrations until its participants_count
+reaches it. The check is part of the counter update every registration
+write already makes (Home/counters.py): a single conditional UPDATE of the
+event row, run before the registration row is inserted, that only matches
+while a seat is free. Of two students racing for the last seat only one
+UPDATE matches; the other raises EventFull and its transaction rolls back,
+so an event can't be overbooked whatever the isolation level.
+
+The register and add_participant views put a student who found no seat
+on the waitlist instead. When a registration is deleted or moved to
+another event, or the capacity is raised, promote() registers waiting
+students in the order they joined, inside the transaction that freed the
+seat, so nobody registering at the same moment can take it first.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .confirmations import queue_confirmations
+from .models import StudentRegistration, WaitlistEntry
+
+DETAIL_FIELDS = ('name', 'email', 'phone', 'regd_no', 'branch', 'year')
+
+
+class EventFull(IntegrityError):
+    """
+    No seat left on the event; the transaction that tried to take one must
+    roll back
+    """
+    def __init__(self, event_id):
+        self.event_id = event_id
+        super().__init__(f"Event {event_id} is full")
+
+
+def join_waitlist(event_id, **details):
+    """
+    Put a student on the event's waitlist, once; returns the waiting entry
+    """
+    entry = WaitlistEntry.objects.filter(
+        event_id=event_id, regd_no=details['regd_no'], status=WaitlistEntry.STATUS_WAITING
+    ).first()
+    if entry is None:
+        entry = WaitlistEntry.objects.create(event_id=event_id, **details)
+    return entry
+
+
+def waitlist_position(entry):
+    """
+    1-based place of a waiting entry in its event's queue
+    """
+    ahead = WaitlistEntry.objects.filter(event_id=entry.event_id, status=WaitlistEntry.STATUS_WAITING).filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lt=entry.pk)
+    )
+    return ahead.count() + 1
+
+
+def promote(event_id):
+    """
+    Register waiting students, oldest first, while the event has free
+    seats. Returns the new registrations.
+    """
+    promoted = []
+    with transaction.atomic():
+        while True:
+            entry = (
+                WaitlistEntry.objects
+                .select_for_update(skip_locked=True)
+                .filter(event_id=event_id, status=WaitlistEntry.STATUS_WAITING)
+                .order_by('created_at', 'id')
+                .first()
+            )
+            if entry is None:
+                break
+
+            registration = StudentRegistration(
+                event_id=event_id, **{field: getattr(entry, field) for field in DETAIL_FIELDS}
+            )
+            try:
+                with transaction.atomic():
+                    registration.save()
+            except EventFull:
+                break
+            except IntegrityError:
+                # Registered for the event some other way in the meantime
+                entry.status = WaitlistEntry.STATUS_CANCELLED
+                entry.save(update_fields=['status'])
+                continue
+
+            entry.status = WaitlistEntry.STATUS_PROMOTED
+            entry.registration = registration
+            entry.promoted_at = timezone.now()
+            entry.save(update_fields=['status', 'registration', 'promoted_at'])
+            promoted.append(registration)
+
+        queue_confirmations(promoted)
+    return promoted
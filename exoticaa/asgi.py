@@ -5,6 +5,21 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Deployment profile: the public pages (home, winners, notices, about,
+events, mr-miss-nit) are async views, so under ASGI one process serves many
+slow clients at once instead of tying up a sync worker per connection:
+
+    pip install "uvicorn[standard]" gunicorn
+    gunicorn exoticaa.asgi:application -k uvicorn.workers.UvicornWorker \
+        --workers 2 --timeout 60 --keep-alive 5
+
+Sync views (registration, admin panel) still work; Django runs them in a
+thread pool. Persistent connections are turned off (DB_CONN_MAX_AGE=0)
+under ASGI - each request thread opens its own connection, so they would
+pile up.
+`manage.py benchmark --asgi` drives the app through its ASGI handler to
+compare against the default WSGI numbers.
 """
 
 import os
@@ -12,5 +27,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "exoticaa.settings")
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
@@ -43,6 +43,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Disabled unless SQL_INSTRUMENTATION is True; first so it sees every query
+    "Home.sql_instrumentation.SQLInstrumentationMiddleware",
+    # Outside the session middleware so session saves count as writes
+    "Home.db_routing.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -100,12 +104,98 @@ DATABASES = {
         'PORT': '3306',
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-        }
-    }
+        },
+        # Persistent connections; exoticaa/asgi.py turns them off under ASGI
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.mysql',
+    #     'NAME': 'exotica',
+    #     'USER': 'exoticareader',
+    #     'PASSWORD': '...',
+    #     'HOST': 'replica-host',
+    #     'PORT': '3306',
+    #     'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+    #     'CONN_HEALTH_CHECKS': True,
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
 
+# Local replica setup: two SQLite files standing in for primary and replica.
+# Nothing replicates between them - migrate, then copy db.sqlite3 over
+# db-replica.sqlite3 whenever the replica should catch up.
+# DATABASES = {
+#     "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "db.sqlite3"},
+#     "replica": {
+#         "ENGINE": "django.db.backends.sqlite3",
+#         "NAME": BASE_DIR / "db-replica.sqlite3",
+#         "TEST": {"MIRROR": "default"},
+#     },
+# }
+
+# Read replica for the public pages (see Home/db_routing.py). None sends
+# everything to "default"; set to "replica" once that alias is configured.
+# After a write, reads stay on the primary for DATABASE_REPLICA_LAG seconds.
+DATABASE_ROUTERS = ["Home.db_routing.ReplicaRouter"]
+DATABASE_REPLICA = None
+DATABASE_REPLICA_LAG = 5
+
 
 
+# Cache
+# Use a shared backend (Memcached/Redis) in production so cache
+# invalidation reaches every worker process
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "exotica",
+    }
+}
+
+# Registration ingestion mode: "direct" saves each submission in the request,
+# "buffered" queues it for `manage.py process_registrations` to insert in batches
+REGISTRATION_INGESTION = "direct"
+
+# Per-request SQL instrumentation (see Home/sql_instrumentation.py). Requests
+# over these limits, or running one query shape REPEAT_THRESHOLD+ times, are
+# logged; per-view totals are shown at /admin-panel/sql-report/
+SQL_INSTRUMENTATION = False
+SQL_INSTRUMENTATION_MAX_QUERIES = 20
+SQL_INSTRUMENTATION_SLOW_MS = 200
+SQL_INSTRUMENTATION_REPEAT_THRESHOLD = 5
+
+
+# Live updates (see Home/live.py): how often each process checks the cache for
+# new events, the keepalive comment interval and how long one /live/ stream
+# stays open before the browser is told to reconnect
+LIVE_POLL_INTERVAL = 1.0
+LIVE_KEEPALIVE = 15
+LIVE_STREAM_MAX_AGE = 10 * 60
+
+
+# Background jobs (see Home/jobs.py), run by `manage.py run_jobs`. A failed job
+# is retried after JOB_RETRY_DELAY seconds, doubling with every attempt
+JOB_RETRY_DELAY = 30
+
+
+# Registration confirmation mail (see Home/confirmations.py), sent in batches by
+# the background job worker over one SMTP connection per batch, at most
+# CONFIRMATION_EMAIL_RATE messages per second. To try it locally, start a sink
+# such as `python -m aiosmtpd -n -l localhost:1025` and set EMAIL_PORT=1025.
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_TIMEOUT = 30
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'EXOTICA <no-reply@exotica.local>')
+REGISTRATION_CONFIRMATIONS = True
+CONFIRMATION_EMAIL_DELAY = 2
+CONFIRMATION_EMAIL_BATCH_SIZE = 50
+CONFIRMATION_EMAIL_RATE = 5
+CONFIRMATION_EMAIL_MAX_ATTEMPTS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,4 +248,21 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = '/media/'
 
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# How Home.views.serve_media hands files to the client after authorizing:
+#   "python"           - stream from Django (supports Range / ETag / If-Modified-Since)
+#   "x-accel-redirect" - nginx, with an internal location such as
+#                            location /protected-media/ { internal; alias /path/to/media/; }
+#   "x-sendfile"       - Apache mod_xsendfile / lighttpd
+MEDIA_SERVING = "python"
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+# Media sub-directories anyone may download; everything else needs a staff login
+MEDIA_PUBLIC_DIRS = ["results/", "announcements/", "announcments/"]
+
+# Chunked announcement attachment uploads (see Admin/uploads.py). A chunk is
+# read into memory, so keep ATTACHMENT_CHUNK_SIZE below DATA_UPLOAD_MAX_MEMORY_SIZE.
+# Unfinished uploads are kept in MEDIA_ROOT/partial-uploads until `manage.py purge_uploads`.
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+ATTACHMENT_MAX_SIZE = 25 * 1024 * 1024
\ No newline at end of file
@@ -1,6 +1,8 @@
 # exoticaa/urls.py
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from Home.views import (
@@ -9,10 +11,15 @@ from Home.views import (
     about_view, 
     test_static, 
     register, 
+    registration_status,
     event_view, 
     mr_miss_nit_view,
     all_winners_view,
     notice_view,  # Add this import
+    notices_api,
+    notice_detail_api,
+    live_events,
+    serve_media,
 )
 
 urlpatterns = [
@@ -23,16 +30,25 @@ urlpatterns = [
     path("about/", about_view, name="about"),
     path("test/", test_static, name="test_static"),
     path("register/", register, name="register"),
+    path("register/status/<str:reference>/", registration_status, name="registration_status"),
     path("events/", event_view, name="events"),
     path("mr-miss-nit/", mr_miss_nit_view, name="mr-miss-nit"),
     path("winners/", all_winners_view, name="all-winners"),  # Add this line
     path("notices/", notice_view, name="notices"),  # New notices page
+    path("api/notices/", notices_api, name="notices_api"),
+    path("api/notices/<int:notice_id>/", notice_detail_api, name="notice_detail_api"),
+    path("live/", live_events, name="live_events"),
     
     # Include Admin app URLs
     path("admin-panel/", include('Admin.urls')),
 ]
 
-# Add BOTH static and media serving
+# Static files are only served by Django in development
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+
+# Uploaded media is authorized by Django and then streamed or offloaded to the
+# front web server, depending on settings.MEDIA_SERVING
+urlpatterns += [
+    re_path(r"^%s(?P<path>.+)$" % re.escape(settings.MEDIA_URL.lstrip("/")), serve_media, name="media"),
+]
\ No newline at end of file